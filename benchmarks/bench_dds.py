@@ -0,0 +1,57 @@
+"""Throughput and error of the BC1/BC3/BC7 DDS encoders on a mip-flooded reference atlas.
+
+    python benchmarks/bench_dds.py [--size 2048] [--workers 0] [--repeat 3]
+
+RMSE is measured on the top level as decoded by Pillow (RGB for BC1, RGBA otherwise).
+"""
+import argparse
+import io
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_png import best_of, reference_atlas  # noqa: E402
+from core.dds_export import DDS_FORMATS, mip_chain, write_dds  # noqa: E402
+from core.parallel_resample import resolve_worker_count  # noqa: E402
+
+
+def encode(rgba, fmt, mips, workers):
+    out = io.BytesIO()
+    write_dds(out, rgba, fmt, mips=mips, workers=workers)
+    return out.getvalue()
+
+
+def rmse(data, rgba, fmt):
+    with Image.open(io.BytesIO(data)) as image:
+        decoded = np.asarray(image.convert("RGBA")).astype(np.float64)
+    channels = 3 if fmt == "bc1" else 4
+    diff = decoded[..., :channels] - rgba[..., :channels]
+    return float(np.sqrt((diff * diff).mean()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=2048)
+    parser.add_argument("--workers", type=int, default=0, help="encoder threads (0 = one per CPU)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    workers = resolve_worker_count(args.workers)
+
+    atlas = reference_atlas(args.size)
+    megapixels = args.size * args.size / 1e6
+    seconds, levels = best_of(args.repeat, lambda: mip_chain(atlas))
+    print(f"atlas {args.size}x{args.size}, {workers} threads; mip chain ({len(levels)} levels) {seconds:.3f}s")
+    print(f"{'format':<8} {'top':>8} {'MP/s':>7} {'+mips':>8} {'MB':>7} {'RMSE':>6}")
+    for fmt in DDS_FORMATS:
+        top_seconds, data = best_of(args.repeat, lambda: encode(atlas, fmt, False, workers))
+        chain_seconds, chain = best_of(args.repeat, lambda: encode(atlas, fmt, True, workers))
+        print(f"{fmt:<8} {top_seconds:>7.3f}s {megapixels / top_seconds:>7.1f} {chain_seconds:>7.3f}s "
+              f"{len(chain) / 2**20:>7.2f} {rmse(data, atlas, fmt):>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
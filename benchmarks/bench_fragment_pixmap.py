@@ -0,0 +1,125 @@
+"""Copy time and peak memory of turning one resampled crop into a masked AtlasItem pixmap.
+
+    python benchmarks/bench_fragment_pixmap.py [--size 4096] [--repeat 3]
+
+"before" is the old PIL -> ImageQt -> QPixmap -> QPainter clip -> QPixmap chain,
+"after" masks the crop straight into the QImage buffer that becomes the pixmap.
+Each variant runs in its own process so peak resident sizes are not shared.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return getattr(info, "peak_wset", info.rss)
+
+
+def fragment_inputs(size):
+    import numpy as np
+
+    rng = np.random.default_rng(11)
+    crop = rng.integers(0, 256, (size, size, 4), dtype=np.uint8)
+    crop[..., 3] = 255
+    points = [(3.5, 10.25), (size - 7.0, 2.0), (size - 20.5, size - 3.0), (12.0, size - 40.75)]
+    return crop, points
+
+
+def run_before(crop, points):
+    from PIL import Image
+    from PIL.ImageQt import ImageQt
+    from PySide6.QtCore import QPointF, Qt
+    from PySide6.QtGui import QImage, QPainter, QPainterPath, QPixmap, QPolygonF
+
+    height, width = crop.shape[:2]
+    src_qimage = ImageQt(Image.fromarray(crop, "RGBA")).copy()
+    src_pixmap = QPixmap.fromImage(src_qimage)
+    target_image = QImage(width, height, QImage.Format_ARGB32)
+    target_image.fill(Qt.transparent)
+    painter = QPainter(target_image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    path = QPainterPath()
+    left, top = min(x for x, _ in points) // 1, min(y for _, y in points) // 1
+    path.addPolygon(QPolygonF([QPointF(x - left, y - top) for x, y in points]))
+    painter.setClipPath(path)
+    painter.drawPixmap(0, 0, src_pixmap)
+    painter.end()
+    return QPixmap.fromImage(target_image)
+
+
+def run_after(crop, points):
+    import numpy as np
+    from PySide6.QtGui import QImage, QPixmap
+
+    from core.coverage import masked_fragment
+
+    height, width = crop.shape[:2]
+    image = QImage(width, height, QImage.Format_RGBA8888)
+    bits = np.frombuffer(image.bits(), dtype=np.uint8).reshape(height, image.bytesPerLine())
+    masked_fragment(crop, points, (width, height), out=bits[:, :width * 4].reshape(height, width, 4))
+    return QPixmap.fromImage(image)
+
+
+def measure(variant, size, repeat):
+    from PySide6.QtWidgets import QApplication
+
+    from core.coverage import shared_coverage_cache
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841 (pixmaps need an application)
+    crop, points = fragment_inputs(size)
+    shared_coverage_cache().get(points, (size, size))  # mask rasterization is cached in real use
+    fn = run_before if variant == "before" else run_after
+    baseline = peak_rss_bytes()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pixmap = fn(crop, points)
+        best = min(best, time.perf_counter() - start)
+        del pixmap
+    peak = peak_rss_bytes()
+    extra = None if baseline is None else peak - baseline
+    return {"variant": variant, "seconds": best, "extra_peak_bytes": extra}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--variant", choices=("before", "after"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(measure(args.variant, args.size, args.repeat)))
+        return
+
+    frame_mb = args.size * args.size * 4 / 2 ** 20
+    print(f"fragment {args.size}x{args.size} RGBA = {frame_mb:.0f} MiB per full-size buffer")
+    print(f"{'variant':<8} {'time':>9} {'extra peak':>12} {'buffers':>8}")
+    for variant in ("before", "after"):
+        cmd = [sys.executable, os.path.abspath(__file__), "--variant", variant, "--size", str(args.size), "--repeat", str(args.repeat)]
+        result = json.loads(subprocess.check_output(cmd).decode().strip().splitlines()[-1])
+        extra = result["extra_peak_bytes"]
+        extra_text = "n/a" if extra is None else f"{extra / 2 ** 20:.0f} MiB"
+        buffers = "n/a" if extra is None else f"{extra / 2 ** 20 / frame_mb:.1f}"
+        print(f"{variant:<8} {result['seconds'] * 1000:>7.1f}ms {extra_text:>12} {buffers:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Cost of the filtered mip chain export next to the base level, per reduction filter.
+
+    python benchmarks/bench_mips.py [--size 4096] [--preset fast] [--repeat 3]
+
+"chain" builds every level down to 1x1 in memory; "+PNGs" also encodes them the way
+write_mip_pngs does. Both are compared with encoding the base level alone.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_png import best_of, reference_atlas  # noqa: E402
+from core.mip_export import mip_filter, mip_levels, write_mip_pngs  # noqa: E402
+from core.png_writer import PNG_PRESETS, write_png  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=4096)
+    parser.add_argument("--preset", choices=tuple(PNG_PRESETS), default="fast")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    atlas = reference_atlas(args.size)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "atlas.png")
+        base, _ = best_of(args.repeat, lambda: write_png(path, atlas, args.preset))
+        print(f"atlas {args.size}x{args.size}, base level PNG ({args.preset}) {base:.3f}s")
+        print(f"{'filter':<10} {'chain':>8} {'+PNGs':>8} {'vs base':>8}")
+        for mode in ("nearest", "lanczos", "kaiser"):
+            chain = (1, 0, mip_filter(mode))
+            build, _ = best_of(args.repeat, lambda: mip_levels(atlas, chain))
+            full, _ = best_of(args.repeat, lambda: write_mip_pngs(atlas, args.size, args.size, path, chain, args.preset))
+            print(f"{chain[2].kernel:<10} {build:>7.3f}s {full:>7.3f}s {full / base:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""OBJ export of many masks: the whole text built in memory vs streamed block by block.
+
+    python benchmarks/bench_obj.py [--masks 2000] [--points 200] [--repeat 3]
+
+"text" is generate_obj plus one write of the result (what the exporters used to do);
+"stream" is write_obj. Peak is the Python heap high-water mark of one more run.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_png import best_of  # noqa: E402
+from core.obj_export import MeshMask, generate_obj, write_obj  # noqa: E402
+
+
+def random_masks(count, points, atlas_size):
+    rng = np.random.default_rng(0)
+    masks = []
+    for mask_id in range(1, count + 1):
+        angles = np.sort(rng.random(points)) * 2 * np.pi
+        radius = 50 + 30 * rng.random(points)
+        outline = np.column_stack((radius * np.cos(angles), radius * np.sin(angles)))
+        x, y = rng.uniform(0, atlas_size - 160, 2).tolist()
+        masks.append(MeshMask(tuple(map(tuple, outline.tolist())), 1.0, 100.0, x, y, mask_id))
+    return masks
+
+
+def peak_mb(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / (1 << 20)
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--masks", type=int, default=2000)
+    parser.add_argument("--points", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    atlas_size = 8192
+    masks = random_masks(args.masks, args.points, atlas_size)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "atlas.obj")
+
+        def text():
+            obj_text, _ = generate_obj(masks, atlas_size, atlas_size, 512.0)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(obj_text)
+
+        def stream():
+            write_obj(path, masks, atlas_size, atlas_size, 512.0)
+
+        print(f"{args.masks} masks x {args.points} points")
+        print(f"{'writer':<8} {'time':>8} {'peak':>9} {'file':>8}")
+        for name, fn in (("text", text), ("stream", stream)):
+            seconds, _ = best_of(args.repeat, fn)
+            peak = peak_mb(fn)
+            print(f"{name:<8} {seconds:>7.3f}s {peak:>7.1f}MB {os.path.getsize(path) / (1 << 20):>6.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
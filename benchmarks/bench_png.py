@@ -0,0 +1,82 @@
+"""Size vs time of the PNG encoder presets on a mip-flooded reference atlas.
+
+    python benchmarks/bench_png.py [--size 4096] [--workers 0] [--repeat 3]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.mip_flood import mip_flood  # noqa: E402
+from core.parallel_resample import resolve_worker_count  # noqa: E402
+from core.png_writer import PNG_PRESETS, PngStreamWriter  # noqa: E402
+
+
+def reference_atlas(size, islands=300):
+    """Photo-like fragments (smooth shading plus grain) on a transparent atlas, padded by mip flood."""
+    rng = np.random.default_rng(5)
+    yy, xx = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    rgba = np.zeros((size, size, 4), dtype=np.uint8)
+    for channel, (fy, fx) in enumerate(((7, 3), (4, 9), (11, 5))):
+        shade = 128 + 80 * np.sin(fy * 6.28 * yy) * np.cos(fx * 6.28 * xx)
+        shade += rng.normal(0, 6, (size, size))
+        rgba[..., channel] = np.clip(shade, 0, 255)
+    for _ in range(islands):
+        y, x = rng.integers(0, size, size=2)
+        h, w = rng.integers(size // 64, size // 10, size=2)
+        rgba[y:y + h, x:x + w, 3] = 255
+    return mip_flood(rgba, 1, 0)
+
+
+def encode(rgba, preset, workers):
+    out = io.BytesIO()
+    with PngStreamWriter(out, rgba.shape[1], rgba.shape[0], preset, workers) as writer:
+        writer.write_rows(rgba)
+    return out.getbuffer().nbytes
+
+
+def pillow_encode(rgba):
+    out = io.BytesIO()
+    Image.fromarray(rgba, "RGBA").save(out, "PNG")
+    return out.getbuffer().nbytes
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=4096)
+    parser.add_argument("--workers", type=int, default=0, help="threads for the parallel rows (0 = one per CPU)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    workers = resolve_worker_count(args.workers)
+
+    atlas = reference_atlas(args.size)
+    megapixels = args.size * args.size / 1e6
+    print(f"atlas {args.size}x{args.size}, {atlas.nbytes / 2**20:.0f} MB raw, {workers} threads")
+    print(f"{'encoder':<22} {'size MB':>8} {'time':>8} {'MP/s':>7}")
+    runs = [("pillow default", lambda: pillow_encode(atlas))]
+    for name in PNG_PRESETS:
+        for threads in sorted({1, workers}):
+            runs.append((f"{name} x{threads}", lambda name=name, threads=threads: encode(atlas, name, threads)))
+    for name, fn in runs:
+        seconds, size = best_of(args.repeat, fn)
+        print(f"{name:<22} {size / 2**20:>8.2f} {seconds:>7.3f}s {megapixels / seconds:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Time direct vs pyramid resampling of large downscales from one big source.
+
+    python benchmarks/bench_source_pyramid.py [--size 8192] [--target 256] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.resample import resample_crop  # noqa: E402
+from core.source_pyramid import build_levels, resample_from_levels  # noqa: E402
+
+
+def synthetic_source(size):
+    rng = np.random.default_rng(7)
+    noise = rng.integers(0, 256, (size // 8, size // 8, 4), dtype=np.uint8)
+    noise[..., 3] = 255
+    return Image.fromarray(noise, mode="RGBA").resize((size, size), Image.BILINEAR)
+
+
+def psnr(a, b):
+    diff = np.asarray(a, dtype=np.float64) - np.asarray(b, dtype=np.float64)
+    mse = np.mean(diff ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=8192)
+    parser.add_argument("--target", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    source = synthetic_source(args.size)
+    start = time.perf_counter()
+    levels = [source] + build_levels(source)
+    print(f"pyramid build: {time.perf_counter() - start:.3f}s ({len(levels) - 1} levels)")
+
+    crop = args.size * 3 // 4
+    rect = (args.size // 16, args.size // 16, crop, crop)
+    target = (args.target, args.target)
+    print(f"{'mode':<8} {'direct':>9} {'pyramid':>9} {'speedup':>8} {'psnr':>7}")
+    for mode in ("lanczos", "kaiser"):
+        direct_t, direct = best_of(args.repeat, lambda: resample_crop(source, rect, target, mode))
+        pyr_t, pyr = best_of(args.repeat, lambda: resample_from_levels(levels, rect, target, mode))
+        print(f"{mode:<8} {direct_t:>8.3f}s {pyr_t:>8.3f}s {direct_t / pyr_t:>7.1f}x {psnr(pyr, direct):>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Ear-clipping cost on large mask outlines, and the OBJ export options built on it.
+
+    python benchmarks/bench_triangulate.py [--vertices 10000] [--repeat 3]
+
+Outlines: a circle (all convex), a star with long thin spikes, a noisy blob (every
+other vertex reflex) and a comb of rectangular teeth (long collinear runs). "obj"
+generates the OBJ text of the outline as one mask with triangulate and weld on.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_png import best_of  # noqa: E402
+from core.obj_export import MeshMask, generate_obj  # noqa: E402
+from core.triangulate import triangulate_polygon  # noqa: E402
+
+
+def outlines(n):
+    angles = np.linspace(0.0, 2 * np.pi, n, endpoint=False)
+    circle = np.column_stack((np.cos(angles), np.sin(angles)))
+    star = circle * (1 + 0.5 * np.sin(angles * (n // 25 + 1)))[:, None]
+    blob = circle * (1 + 0.3 * np.random.default_rng(0).random(n))[:, None]
+    teeth = max(1, (n - 3) // 7)
+    comb = [(0, 0)]
+    for k in range(teeth):
+        x = 4 * k
+        comb += [(x + 1, 0), (x + 1, 10), (x + 2, 10), (x + 2, 5), (x + 3, 5), (x + 3, 0), (x + 4, 0)]
+    comb += [(4 * teeth, -3), (2 * teeth, -3), (0, -3)]
+    return {"circle": circle, "star": star, "blob": blob, "comb": np.array(comb, dtype=np.float64)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vertices", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'outline':<8} {'vertices':>9} {'triangles':>10} {'clip':>8} {'obj':>8}")
+    for name, points in outlines(args.vertices).items():
+        clip, triangles = best_of(args.repeat, lambda: triangulate_polygon(points))
+        span = np.ptp(points, axis=0)
+        pixels = (points - points.min(axis=0)) * (2000 / span.max())
+        mask = MeshMask(tuple(map(tuple, pixels.tolist())), 1.0, 2000.0)
+        obj, _ = best_of(args.repeat, lambda: generate_obj([mask], 2048, 2048, 1024.0, triangulate=True, weld=True))
+        print(f"{name:<8} {len(points):>9} {len(triangles):>10} {clip:>7.3f}s {obj:>7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
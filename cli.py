@@ -0,0 +1,156 @@
+"""Headless exports for build pipelines; never creates Qt objects.
+
+    python cli.py export project.json --png atlas.png --obj atlas.obj
+    python cli.py export project.json --dds atlas.dds --dds-format bc7
+    python cli.py export project.json --glb atlas.glb
+    python cli.py batch "levels/**/*.json" --workers 8 --out-dir build/atlases
+
+Exit codes: 0 success, 1 export failed, 2 bad arguments, 3 sources missing
+(the export still runs without them; --allow-missing turns this into 0).
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+from core.batch_export import batch_tasks, expand_projects, run_batch
+from core.dds_export import DDS_FORMATS
+from core.disk_cache import ResampleDiskCache, default_cache_dir
+from core.path_aliases import load_aliases
+from core.png_writer import PNG_PRESETS
+from core.project_export import export_project
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2  # argparse's own exit code
+EXIT_MISSING_SOURCES = 3
+
+
+def _disk_cache(args):
+    if args.no_cache:
+        return None
+    return ResampleDiskCache(args.cache_dir) if args.cache_dir else ResampleDiskCache()
+
+
+def _budget_bytes(args):
+    return args.budget_mb * 1024 * 1024 if args.budget_mb else None
+
+
+def print_report(report, out=sys.stdout):
+    steps = " ".join(f"{name} {seconds:.3f}s" for name, seconds in report.timings.items())
+    cached = f" (cached: {', '.join(report.cached)})" if report.cached else ""
+    print(f"{report.project}: {report.fragments} fragments, {steps}, total {report.total:.3f}s{cached}", file=out)
+    for path in report.missing:
+        print(f"  missing source: {path}", file=out)
+
+
+def cmd_export(args):
+    try:
+        report = export_project(args.project, args.png, args.obj, load_aliases(args.aliases),
+                                _disk_cache(args), _budget_bytes(args), args.incremental, args.force, args.png_preset,
+                                args.dds, args.dds_format, args.glb)
+    except Exception as e:
+        print(f"error: {args.project}: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    print_report(report)
+    return EXIT_MISSING_SOURCES if report.missing and not args.allow_missing else EXIT_OK
+
+
+def print_batch_table(results, wall_seconds, out=sys.stdout):
+    names = [os.path.basename(r.task.project) for r in results]
+    width = max([len("project")] + [len(name) for name in names])
+    print(f"{'project':<{width}}  {'status':<7} {'frags':>5} {'load':>8} {'png':>8} {'dds':>8} {'obj':>8} {'glb':>8} {'total':>8}", file=out)
+    for name, result in zip(names, results):
+        timings = result.report.timings if result.report else {}
+        cells = " ".join(f"{timings[step]:>7.3f}s" if step in timings else f"{'-':>8}" for step in ("load", "png", "dds", "obj", "glb"))
+        fragments = result.report.fragments if result.report else "-"
+        total = f"{result.seconds:>7.3f}s" if result.report or result.error else f"{'-':>8}"
+        print(f"{name:<{width}}  {result.status:<7} {fragments:>5} {cells} {total}", file=out)
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    summary = ", ".join(f"{counts[status]} {status}" for status in ("ok", "cached", "missing", "failed", "skipped") if status in counts)
+    busy = sum(r.seconds for r in results)
+    speedup = busy / wall_seconds if wall_seconds > 0 else 0.0
+    print(f"{len(results)} projects: {summary}; wall {wall_seconds:.3f}s, export time {busy:.3f}s ({speedup:.1f}x)", file=out)
+
+
+def cmd_batch(args):
+    projects = expand_projects(args.projects)
+    if not projects:
+        print("error: no project files", file=sys.stderr)
+        return EXIT_FAILED
+    cache_dir = None if args.no_cache else (args.cache_dir or default_cache_dir())
+    try:
+        tasks = batch_tasks(projects, args.format or ("png", "obj"), args.out_dir, aliases=load_aliases(args.aliases),
+                            cache_dir=cache_dir, budget_bytes=_budget_bytes(args), incremental=args.incremental,
+                            force=args.force, png_preset=args.png_preset, dds_format=args.dds_format)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    if args.out_dir:
+        for task in tasks:
+            for path in (task.png_path, task.dds_path, task.obj_path, task.glb_path):
+                if path:
+                    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def on_result(result):
+        if result.error:
+            print(f"error: {result.task.project}: {result.error}", file=sys.stderr)
+
+    start = time.perf_counter()
+    results = run_batch(tasks, args.workers, args.keep_going, on_result)
+    print_batch_table(results, time.perf_counter() - start)
+    if any(r.status in ("failed", "skipped") for r in results):
+        return EXIT_FAILED
+    if any(r.status == "missing" for r in results) and not args.allow_missing:
+        return EXIT_MISSING_SOURCES
+    return EXIT_OK
+
+
+def add_export_options(parser):
+    parser.add_argument("--aliases", help="path alias JSON (default ~/.texture_processor_aliases.json)")
+    parser.add_argument("--cache-dir", help="resampled crop cache directory (default ~/.texture_processor_cache/resample)")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the crop cache")
+    parser.add_argument("--budget-mb", type=int, default=0, help="export memory budget, overrides the project's export_budget_mb")
+    parser.add_argument("--allow-missing", action="store_true", help="exit 0 even if some sources are missing")
+    parser.add_argument("--incremental", action="store_true", help="reuse <png>.cache from the previous export and redo only changed tiles")
+    parser.add_argument("--png-preset", choices=tuple(PNG_PRESETS), help="PNG compression preset, overrides the project's png_preset")
+    parser.add_argument("--dds-format", choices=DDS_FORMATS, help="DDS block compression, overrides the project's dds_format")
+    parser.add_argument("--force", action="store_true", help="export even if <output>.manifest.json says the inputs are unchanged")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="export one project to PNG, DDS, OBJ and/or GLB")
+    export.add_argument("project", help="project JSON")
+    export.add_argument("--png", help="atlas PNG output")
+    export.add_argument("--dds", help="block-compressed DDS output (with mip chain)")
+    export.add_argument("--obj", help="mesh OBJ output (n-gons, or per the project's obj_triangulate, obj_weld, merge_meshes)")
+    export.add_argument("--glb", help="binary glTF mesh output (one mesh per mask, or merged with the project's merge_meshes)")
+    add_export_options(export)
+    export.set_defaults(run=cmd_export)
+    batch = commands.add_parser("batch", help="export many projects in parallel")
+    batch.add_argument("projects", nargs="+", help="project JSON files or glob patterns (quote them; ** recurses)")
+    batch.add_argument("--out-dir", help="where <project>.png/.dds/.obj/.glb go, in the projects' folder layout (default: next to each project)")
+    batch.add_argument("--format", action="append", choices=("png", "dds", "obj", "glb"), help="output format, repeatable (default: png and obj)")
+    batch.add_argument("--workers", type=int, default=0, help="worker processes (0 = one per CPU)")
+    batch.add_argument("--keep-going", action="store_true", help="export every project even after a failure (default: stop at the first)")
+    add_export_options(batch)
+    batch.set_defaults(run=cmd_batch)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "export" and not (args.png or args.obj or args.dds or args.glb):
+        parser.error("export needs --png, --dds, --obj and/or --glb")
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support() # Resample workers in frozen builds
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from core.disk_cache import ResampleDiskCache
+from core.image_cache import shared_decode_cache
+from core.parallel_resample import resolve_worker_count
+from core.project_export import ExportReport, export_project
+
+
+def expand_projects(patterns):
+    """Project paths from file names and glob patterns, in the given order without duplicates.
+
+    A pattern that matches nothing is kept as is, so it is reported as a failed export
+    instead of silently vanishing.
+    """
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for path in matches or [pattern]:
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+@dataclass(frozen=True)
+class BatchTask:
+    project: str
+    png_path: Optional[str] = None
+    obj_path: Optional[str] = None
+    dds_path: Optional[str] = None
+    aliases: Dict[str, str] = field(default_factory=dict)
+    cache_dir: Optional[str] = None  # shared by all workers; None disables the crop cache
+    budget_bytes: Optional[int] = None
+    incremental: bool = False
+    force: bool = False  # export even when the outputs' manifests match
+    png_preset: Optional[str] = None  # None: the project's png_preset
+    dds_format: Optional[str] = None  # None: the project's dds_format
+    glb_path: Optional[str] = None
+
+
+def batch_tasks(projects, formats=("png", "obj"), out_dir=None, **options):
+    """One BatchTask per project; outputs are <project stem>.<format> next to the project, or in out_dir.
+
+    Under out_dir each project's folder is mirrored relative to the folder all projects
+    share, so levels/a/atlas.json and levels/b/atlas.json go to <out_dir>/a/atlas.png and
+    <out_dir>/b/atlas.png. Raises ValueError if two projects would still write the same file.
+    """
+    projects = list(projects)
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in projects]) if out_dir and projects else None
+    tasks, owners = [], {}
+    for project in projects:
+        stem = os.path.splitext(os.path.basename(project))[0]
+        if out_dir:
+            folder = os.path.normpath(os.path.join(out_dir, os.path.relpath(os.path.dirname(os.path.abspath(project)), root)))
+        else:
+            folder = os.path.dirname(project)
+        outputs = {fmt: os.path.join(folder, f"{stem}.{fmt}") for fmt in formats}
+        for path in outputs.values():
+            other = owners.setdefault(os.path.normcase(os.path.abspath(path)), project)
+            if other != project:
+                raise ValueError(f"{other} and {project} would both write {path}")
+        tasks.append(BatchTask(project, outputs.get("png"), outputs.get("obj"), outputs.get("dds"), glb_path=outputs.get("glb"),
+                               **options))
+    return tasks
+
+
+@dataclass
+class BatchResult:
+    task: BatchTask
+    report: Optional[ExportReport] = None
+    error: Optional[str] = None  # None with no report: skipped after a fail-fast stop
+    seconds: float = 0.0
+
+    @property
+    def status(self):
+        if self.error is not None:
+            return "failed"
+        if self.report is None:
+            return "skipped"
+        if self.report.missing:
+            return "missing"
+        outputs = [fmt for fmt, path in (("png", self.task.png_path), ("dds", self.task.dds_path), ("obj", self.task.obj_path),
+                                         ("glb", self.task.glb_path)) if path]
+        return "cached" if outputs and set(outputs) <= set(self.report.cached) else "ok"
+
+
+def run_task(task):
+    """Export one project (in a worker process); never raises, errors come back in the result."""
+    start = time.perf_counter()
+    cache = ResampleDiskCache(task.cache_dir) if task.cache_dir else None
+    try:
+        report = export_project(task.project, task.png_path, task.obj_path, task.aliases, cache, task.budget_bytes,
+                                task.incremental, task.force, task.png_preset, task.dds_path, task.dds_format, task.glb_path)
+    except Exception as e:
+        return BatchResult(task, error=f"{type(e).__name__}: {e}", seconds=time.perf_counter() - start)
+    return BatchResult(task, report, seconds=time.perf_counter() - start)
+
+
+def _init_worker(decode_budget_bytes):
+    # A worker keeps its decoded sources between projects, within its share of the budget
+    shared_decode_cache().set_budget(decode_budget_bytes)
+
+
+def run_batch(tasks, workers=0, keep_going=False, on_result=None):
+    """Export tasks across a process pool; returns BatchResults in task order.
+
+    Without keep_going the first failure stops the batch: queued projects are not
+    started and come back as skipped. on_result(result) is called as projects finish.
+    """
+    tasks = list(tasks)
+    results = [BatchResult(task) for task in tasks]
+    workers = min(resolve_worker_count(workers), max(1, len(tasks)))
+
+    def finish(index, result):
+        results[index] = result
+        if on_result:
+            on_result(result)
+        return result.error is None or keep_going
+
+    if workers <= 1:
+        for index, task in enumerate(tasks):
+            if not finish(index, run_task(task)):
+                break
+        return results
+
+    budget = shared_decode_cache().budget_bytes // workers
+    # spawn, like ParallelResampler: workers start clean and never inherit Qt state
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(budget,)) as pool:
+        pending = {pool.submit(run_task, task): index for index, task in enumerate(tasks)}
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            stop = False
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:  # the worker process died
+                    result = BatchResult(tasks[index], error=f"{type(e).__name__}: {e}")
+                stop |= not finish(index, result)
+            if stop:
+                # Queued projects are dropped; ones already running finish and are reported
+                for future in list(pending):
+                    if future.cancel():
+                        pending.pop(future)
+    return results
@@ -0,0 +1,213 @@
+import math
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+from core.coverage import aligned_bounds, masked_fragment
+from core.parallel_resample import ResampleJob, run_job
+
+
+@dataclass(frozen=True)
+class FragmentPlacement:
+    """One atlas item: a mask of a source texture and the atlas position of its top-left corner."""
+    image_path: str
+    points: Tuple[Tuple[float, float], ...]
+    real_width: float
+    original_width: float
+    x: float = 0.0
+    y: float = 0.0
+
+
+def fragment_geometry(points, real_width, original_width, density):
+    """((left, top, width, height) source bbox, scale, (target_w, target_h)) of a mask, or None if degenerate."""
+    left, top, width, height = aligned_bounds(points)
+    if width <= 0 or height <= 0:
+        return None
+    scale = (density * real_width) / original_width
+    target_w = max(1, int(round(width * scale)))
+    target_h = max(1, int(round(height * scale)))
+    return (left, top, width, height), scale, (target_w, target_h)
+
+
+def _div255(t):
+    # Exact round(t / 255) for t <= 255 * 255, the same rounding Qt's raster engine uses
+    return (t + (t >> 8) + 128) >> 8
+
+
+def _conversion_tables():
+    alpha = np.arange(256, dtype=np.uint32)[:, None]
+    color = np.arange(256, dtype=np.uint32)[None, :]
+    premul = _div255(color * alpha)
+    inverse = np.zeros_like(alpha)
+    inverse[1:] = 0x00FF00FF // alpha[1:]
+    unpremul = np.minimum((color * inverse + 0x8000) >> 16, 255)
+    unpremul[255] = color[0]
+    # Indexed by alpha << 8 | color
+    return premul.astype(np.uint8).ravel(), unpremul.astype(np.uint8).ravel()
+
+
+_PREMULTIPLY, _UNPREMULTIPLY = _conversion_tables()
+
+
+def _convert_colors(rgba, table):
+    out = np.empty_like(rgba)
+    index = rgba[..., :3].astype(np.uint16)
+    index |= rgba[..., 3:4].astype(np.uint16) << 8
+    np.take(table, index, out=out[..., :3])
+    out[..., 3] = rgba[..., 3]
+    return out
+
+
+def premultiply(rgba):
+    """Straight-alpha (h, w, 4) uint8 to premultiplied, rounded like QImage's conversion."""
+    return _convert_colors(rgba, _PREMULTIPLY)
+
+
+def unpremultiply(rgba):
+    """Premultiplied (h, w, 4) uint8 back to straight alpha (qUnpremultiply's integer rounding)."""
+    return _convert_colors(rgba, _UNPREMULTIPLY)
+
+
+def shift_subpixel(premul, fx, fy):
+    """Bilinearly move a premultiplied fragment by (fx, fy) in [0, 1); the result is one pixel larger."""
+    h, w = premul.shape[:2]
+    src = premul.astype(np.float32)
+    out = np.zeros((h + 1, w + 1, 4), dtype=np.float32)
+    out[:h, :w] += src * ((1 - fx) * (1 - fy))
+    out[:h, 1:] += src * (fx * (1 - fy))
+    out[1:, :w] += src * ((1 - fx) * fy)
+    out[1:, 1:] += src * (fx * fy)
+    out += 0.5
+    return out.astype(np.uint8)
+
+
+def blend_over(dst, src, x, y):
+    """Source-over a premultiplied fragment onto a premultiplied atlas at integer (x, y), clipped."""
+    dst_h, dst_w = dst.shape[:2]
+    src_h, src_w = src.shape[:2]
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(dst_w, x + src_w), min(dst_h, y + src_h)
+    if x0 >= x1 or y0 >= y1:
+        return
+    region = dst[y0:y1, x0:x1]
+    fragment = src[y0 - y:y1 - y, x0 - x:x1 - x]
+    inv_alpha = (255 - fragment[..., 3:4]).astype(np.uint16)
+    region[...] = fragment + _div255(region * inv_alpha)
+
+
+class AtlasCompositor:
+    """Builds the exported atlas from fragment placements with numpy only (no Qt, no live scene).
+
+    Placements are blended bottom to top. Integer positions reproduce the scene render
+    exactly; fractional ones are placed with bilinear subpixel weights instead of being
+    snapped. fetch_crop(job) supplies resampled crops (e.g. from the canvas caches) and
+    defaults to resampling in this process, through disk_cache when one is given.
+    """
+
+    def __init__(self, size, density, mode="lanczos", beta=3.0, radius=2, use_pyramid=False, fetch_crop=None, disk_cache=None):
+        self.width, self.height = (size, size) if isinstance(size, int) else size
+        self.density = float(density)
+        self.mode = mode
+        self.beta = beta
+        self.radius = radius
+        self.use_pyramid = use_pyramid
+        self.disk_cache = disk_cache
+        self.fetch_crop = fetch_crop or self._fetch_crop
+
+    def job(self, placement):
+        """(ResampleJob, geometry) for a placement, or None if its mask is degenerate."""
+        geometry = fragment_geometry(placement.points, placement.real_width, placement.original_width, self.density)
+        if geometry is None:
+            return None
+        rect, _scale, target_size = geometry
+        job = ResampleJob(placement.image_path, rect, target_size, self.mode, self.beta, int(self.radius), self.use_pyramid)
+        return job, geometry
+
+    def _fetch_crop(self, job):
+        if self.disk_cache is not None:
+            cached = self.disk_cache.get(job.cache_key())
+            if cached is not None:
+                return np.asarray(cached)
+        arr = run_job(job)
+        if self.disk_cache is not None:
+            self.disk_cache.put(job.cache_key(), arr)
+        return arr
+
+    def fragment(self, placement):
+        """Masked straight-alpha RGBA array of one placement, or None if it cannot be built."""
+        resolved = self.job(placement)
+        if resolved is None:
+            return None
+        job, geometry = resolved
+        try:
+            crop = self.fetch_crop(job)
+        except OSError:
+            return None
+        if crop is None:
+            return None
+        return masked_fragment(crop, placement.points, geometry[2])
+
+    def bounds(self, placement):
+        """(left, top, right, bottom) atlas pixels a placement can touch (unclipped), or None if degenerate."""
+        geometry = fragment_geometry(placement.points, placement.real_width, placement.original_width, self.density)
+        if geometry is None:
+            return None
+        target_w, target_h = geometry[2]
+        x, y = math.floor(placement.x), math.floor(placement.y)
+        extra = 1 if (placement.x - x or placement.y - y) else 0  # shift_subpixel grows the fragment
+        return x, y, x + target_w + extra, y + target_h + extra
+
+    def placed_fragment(self, placement):
+        """(premultiplied fragment, x, y) ready for blend_over at integer (x, y), or None."""
+        fragment = self.fragment(placement)
+        if fragment is None:
+            return None
+        premul = premultiply(fragment)
+        x, y = math.floor(placement.x), math.floor(placement.y)
+        fx, fy = placement.x - x, placement.y - y
+        if fx or fy:
+            premul = shift_subpixel(premul, fx, fy)
+        return premul, x, y
+
+    def composite_into(self, placements, rows):
+        """Blend placements into a premultiplied atlas exposed as rows(top, bottom) -> writable (n, width, 4) view.
+
+        Only the rows a fragment covers are requested, so the atlas may live in a file.
+        """
+        for placement in placements:
+            placed = self.placed_fragment(placement)
+            if placed is None:
+                continue
+            premul, x, y = placed
+            top, bottom = max(0, y), min(self.height, y + premul.shape[0])
+            if top < bottom:
+                blend_over(rows(top, bottom), premul, x, y - top)
+
+    def composite_regions(self, placements, boxes):
+        """Straight-alpha arrays of atlas regions (left, top, right, bottom), equal to the same pixels of composite().
+
+        Every placement is fetched at most once, however many regions it overlaps.
+        """
+        regions = [np.zeros((bottom - top, right - left, 4), dtype=np.uint8) for left, top, right, bottom in boxes]
+        for placement in placements:
+            bounds = self.bounds(placement)
+            if bounds is None:
+                continue
+            hits = [i for i, box in enumerate(boxes)
+                    if bounds[0] < box[2] and box[0] < bounds[2] and bounds[1] < box[3] and box[1] < bounds[3]]
+            if not hits:
+                continue
+            placed = self.placed_fragment(placement)
+            if placed is None:
+                continue
+            premul, x, y = placed
+            for i in hits:
+                blend_over(regions[i], premul, x - boxes[i][0], y - boxes[i][1])
+        return [unpremultiply(region) for region in regions]
+
+    def composite(self, placements):
+        """(height, width, 4) uint8 straight-alpha atlas of placements over transparency."""
+        atlas = np.zeros((self.height, self.width, 4), dtype=np.uint8)
+        self.composite_into(placements, lambda top, bottom: atlas[top:bottom])
+        return unpremultiply(atlas)
@@ -0,0 +1,156 @@
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_SAMPLES = 8  # sub-scanlines per pixel row; coverage along x is exact
+BAND_ROWS = 256  # rows per pass when applying coverage
+
+
+def aligned_bounds(points):
+    """(left, top, width, height) of the integer rect enclosing points (floor min, ceil max)."""
+    xs = [float(x) for x, _ in points]
+    ys = [float(y) for _, y in points]
+    left, top = math.floor(min(xs)), math.floor(min(ys))
+    return left, top, math.ceil(max(xs)) - left, math.ceil(max(ys)) - top
+
+
+def polygon_coverage(points, size, samples=DEFAULT_SAMPLES):
+    """Antialiased even-odd coverage of a polygon in pixel coordinates as an (h, w) float32 array.
+
+    Each pixel row is split into `samples` sub-scanlines; along every sub-scanline the
+    covered length of each pixel is exact, so vertical edges are anti-aliased exactly
+    and horizontal ones in 1/samples steps. All edges and scanlines are handled at once.
+    """
+    width, height = max(0, int(size[0])), max(0, int(size[1]))
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if width == 0 or height == 0 or len(pts) < 3:
+        return np.zeros((height, width), dtype=np.float32)
+
+    x0, y0 = pts[:, 0], pts[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    y_lo, y_hi = np.minimum(y0, y1), np.maximum(y0, y1)
+    # Sub-scanline k samples y = (k + 0.5) / samples; an edge crosses it if y_lo <= y < y_hi
+    first = np.clip(np.ceil(y_lo * samples - 0.5), 0, height * samples).astype(np.int64)
+    stop = np.clip(np.ceil(y_hi * samples - 0.5), 0, height * samples).astype(np.int64)
+    counts = np.maximum(stop - first, 0)
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros((height, width), dtype=np.float32)
+
+    edge = np.repeat(np.arange(len(pts)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    sub = first[edge] + offsets
+    y = (sub + 0.5) / samples
+    slope = (x1 - x0)[edge] / (y1 - y0)[edge]
+    x = np.clip(x0[edge] + (y - y0[edge]) * slope, 0.0, width)
+
+    # Even-odd: crossings sorted along each sub-scanline alternately open and close a span
+    order = np.lexsort((x, sub))
+    sub, x = sub[order], x[order]
+    starts = np.searchsorted(sub, sub, side="left")
+    sign = np.where((np.arange(total) - starts) % 2 == 0, -1.0, 1.0)
+
+    # Span [a, b) covers clip(b - c, 0, 1) - clip(a - c, 0, 1) of column c: each crossing
+    # adds sign to every column left of floor(x) and sign * frac(x) to column floor(x).
+    # The signs of a sub-scanline sum to zero, so the first part is a negated prefix sum.
+    col = np.floor(x).astype(np.int64)
+    flat = (sub // samples) * (width + 1) + col
+    acc = np.zeros((height, width + 1), dtype=np.float32)
+    np.add.at(acc.ravel(), flat, -sign.astype(np.float32))
+    np.cumsum(acc, axis=1, out=acc)
+    np.add.at(acc.ravel(), flat, (sign * (x - col)).astype(np.float32))
+    coverage = acc[:, :width]
+    coverage *= 1.0 / samples
+    np.clip(coverage, 0.0, 1.0, out=coverage)
+    return coverage
+
+
+def fragment_coverage(points, target_size, samples=DEFAULT_SAMPLES):
+    """Coverage of a source-space mask once its bounding rect is resampled to target_size."""
+    left, top, width, height = aligned_bounds(points)
+    sx = target_size[0] / max(1, width)
+    sy = target_size[1] / max(1, height)
+    mapped = [((float(x) - left) * sx, (float(y) - top) * sy) for x, y in points]
+    return polygon_coverage(mapped, target_size, samples)
+
+
+def apply_coverage(rgba, coverage, out=None, band_rows=BAND_ROWS):
+    """Scale the alpha of an (h, w, 4) uint8 straight-alpha image by coverage.
+
+    The result goes to out (a new array by default), which may be any writable
+    (h, w, 4) uint8 view such as the bits of a QImage, so the masked fragment is
+    written once into its final buffer. Rows are processed in bands to keep the
+    float temporaries small.
+    """
+    if out is None:
+        out = np.empty(rgba.shape, dtype=np.uint8)
+    if out is not rgba:
+        np.copyto(out, rgba)
+    for top in range(0, rgba.shape[0], band_rows):
+        rows = slice(top, top + band_rows)
+        alpha = rgba[rows, :, 3] * coverage[rows]
+        alpha += 0.5
+        out[rows, :, 3] = alpha  # truncation of x + 0.5 rounds
+    return out
+
+
+class CoverageCache:
+    """LRU of read-only coverage masks keyed by mask points and target size."""
+
+    def __init__(self, limit=128, samples=DEFAULT_SAMPLES):
+        self.limit = max(1, int(limit))
+        self.samples = int(samples)
+        self._masks = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, points, target_size):
+        key = (tuple((float(x), float(y)) for x, y in points), int(target_size[0]), int(target_size[1]))
+        with self._lock:
+            mask = self._masks.get(key)
+            if mask is not None:
+                self._masks.move_to_end(key)
+                self.hits += 1
+                return mask
+            self.misses += 1
+
+        mask = fragment_coverage(key[0], key[1:], self.samples)
+        mask.setflags(write=False)
+        with self._lock:
+            self._masks[key] = mask
+            while len(self._masks) > self.limit:
+                self._masks.popitem(last=False)
+                self.evictions += 1
+        return mask
+
+    def clear(self):
+        with self._lock:
+            self._masks.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._masks),
+                "limit": self.limit,
+                "bytes": sum(mask.nbytes for mask in self._masks.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_shared_coverage = CoverageCache()
+
+
+def shared_coverage_cache():
+    return _shared_coverage
+
+
+def masked_fragment(rgba, points, target_size, out=None):
+    """Resampled crop with its mask applied as antialiased alpha (Qt-free, safe in worker processes)."""
+    return apply_coverage(rgba, _shared_coverage.get(points, target_size), out)
+
@@ -0,0 +1,327 @@
+import contextlib
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core.mip_flood import downsample_level, level_sizes
+from core.parallel_resample import resolve_worker_count
+
+DDS_FORMATS = ("bc1", "bc3", "bc7")
+DEFAULT_DDS_FORMAT = "bc3"
+BLOCK_BYTES = {"bc1": 8, "bc3": 16, "bc7": 16}
+CHUNK_BLOCKS = 8192  # 4x4 blocks encoded per thread task
+
+# DDS header flags (DDS_HEADER / DDS_PIXELFORMAT)
+_DDSD_CAPS, _DDSD_HEIGHT, _DDSD_WIDTH, _DDSD_PIXELFORMAT = 0x1, 0x2, 0x4, 0x1000
+_DDSD_MIPMAPCOUNT, _DDSD_LINEARSIZE = 0x20000, 0x80000
+_DDPF_FOURCC = 0x4
+_DDSCAPS_COMPLEX, _DDSCAPS_TEXTURE, _DDSCAPS_MIPMAP = 0x8, 0x1000, 0x400000
+_DXGI_FORMAT_BC7_UNORM = 98
+_D3D10_RESOURCE_DIMENSION_TEXTURE2D = 3
+
+_BC7_WEIGHTS = np.array([0, 4, 9, 13, 17, 21, 26, 30, 34, 38, 43, 47, 51, 55, 60, 64], dtype=np.float32)  # 4-bit index ramp / 64
+_BC7_MIDPOINTS = (_BC7_WEIGHTS[:-1] + _BC7_WEIGHTS[1:]) / 2
+
+
+def box_level(color, alpha, mask, unit=False):
+    """One step of mip_chain: (color, alpha, covered, uint8 RGBA) of the level below the given rows.
+
+    color (h, w, 3) and alpha (h, w, 1) are uint8 with unit=True (the atlas) or the float
+    results of the previous step; mask marks covered texels. Only pairs of rows are
+    combined, so a band starting on an even row gives the same rows as the whole level.
+    """
+    h2, w2 = (color.shape[0] + 1) // 2, (color.shape[1] + 1) // 2
+    weighted = np.zeros((h2, w2, 3), dtype=np.float32)
+    covered = np.empty((h2, w2), dtype=np.uint8)
+    downsample_level(color, mask, weighted, covered, unit=unit)
+    ones = np.ones(mask.shape, dtype=np.uint8)
+    plain = np.zeros((h2, w2, 3), dtype=np.float32)
+    next_alpha = np.zeros((h2, w2, 1), dtype=np.float32)
+    scratch = np.empty((h2, w2), dtype=np.uint8)
+    downsample_level(color, ones, plain, scratch, unit=unit)
+    downsample_level(alpha, ones, next_alpha, scratch, unit=unit)
+    np.copyto(weighted, plain, where=covered[..., None] == 0)
+    level = np.empty((h2, w2, 4), dtype=np.uint8)
+    level[..., :3] = np.rint(np.clip(weighted, 0.0, 1.0) * 255.0)
+    level[..., 3] = np.rint(np.clip(next_alpha[..., 0], 0.0, 1.0) * 255.0)
+    return weighted, next_alpha, covered, level
+
+
+def mip_chain(rgba, alpha_threshold=1):
+    """Every mip level of an (h, w, 4) uint8 atlas down to 1x1, full size first.
+
+    Color uses mip_flood's coverage-weighted 2x2 mean (texels with alpha above the
+    threshold); blocks without any fall back to the plain mean, so padding prepared by
+    mip flood or dilation carries down. Alpha is the plain mean. Levels are built from
+    the float level above and rounded to uint8 only for output.
+    """
+    h, w = rgba.shape[:2]
+    levels = [rgba]
+    if h == 0 or w == 0:
+        return levels
+    color, alpha = rgba[..., :3], rgba[..., 3:]
+    mask = (rgba[..., 3] > alpha_threshold).view(np.uint8)
+    for _ in level_sizes(h, w, 0)[1:]:
+        color, alpha, mask, level = box_level(color, alpha, mask, unit=len(levels) == 1)
+        levels.append(level)
+    return levels
+
+
+def to_blocks(rgba):
+    """(N, 16, 4) uint8 4x4 blocks in row-major block order; edges are padded by repeating the last texel."""
+    h, w = rgba.shape[:2]
+    bh, bw = max(1, -(-h // 4)), max(1, -(-w // 4))
+    rows = np.minimum(np.arange(bh * 4), h - 1)
+    cols = np.minimum(np.arange(bw * 4), w - 1)
+    padded = rgba if (bh * 4, bw * 4) == (h, w) else rgba[rows[:, None], cols[None, :]]
+    return padded.reshape(bh, 4, bw, 4, 4).transpose(0, 2, 1, 3, 4).reshape(-1, 16, 4)
+
+
+def _planes(blocks, channels):
+    """(channels, 16, N) float32 planes of (N, 16, 4) blocks.
+
+    Texels of all blocks side by side, so per-block sums over 16 texels add whole rows
+    instead of reducing tiny inner axes.
+    """
+    return np.ascontiguousarray(blocks[..., :channels].transpose(2, 1, 0), dtype=np.float32)
+
+
+def _principal_endpoints(planes):
+    """Endpoints (C, N) of the segment spanned by each block's texels along its principal axis."""
+    channels = len(planes)
+    mean = planes.mean(axis=1)
+    centered = planes - mean[:, None, :]
+    cov = np.empty((channels, channels, planes.shape[2]), dtype=np.float32)
+    for i in range(channels):
+        for j in range(i + 1):
+            cov[i, j] = cov[j, i] = (centered[i] * centered[j]).sum(axis=0)
+    axis = planes.max(axis=1) - planes.min(axis=1)  # start from the bounding-box diagonal
+    for _ in range(4):  # power iteration
+        axis = (cov * axis[None]).sum(axis=1)
+        axis /= np.maximum(np.abs(axis).max(axis=0), 1e-12)
+    axis /= np.maximum(np.sqrt((axis * axis).sum(axis=0)), 1e-12)
+    t = (centered * axis[:, None, :]).sum(axis=0)
+    high = mean + axis * t.max(axis=0)
+    low = mean + axis * t.min(axis=0)
+    return np.clip(high, 0, 255), np.clip(low, 0, 255)
+
+
+def _to_565(color):
+    r = np.rint(color[0] * (31 / 255)).astype(np.uint16)
+    g = np.rint(color[1] * (63 / 255)).astype(np.uint16)
+    b = np.rint(color[2] * (31 / 255)).astype(np.uint16)
+    return (r << 11) | (g << 5) | b
+
+
+def _from_565(packed):
+    r, g, b = (packed >> 11) & 31, (packed >> 5) & 63, packed & 31
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)]).astype(np.float32)
+
+
+def _bc1_fit(planes, c0, c1):
+    """Indices and squared error of the texels against the 4-color palette of 565 endpoints c0 > c1."""
+    e0, e1 = _from_565(c0), _from_565(c1)
+    palette = (e0, e1, (2 * e0 + e1) / 3, (e0 + 2 * e1) / 3)  # codes 0..3
+    best = indices = None
+    for code, entry in enumerate(palette):
+        dist = ((planes - entry[:, None, :]) ** 2).sum(axis=0)
+        if best is None:
+            best, indices = dist, np.zeros(dist.shape, dtype=np.int32)
+        else:
+            closer = dist < best
+            np.copyto(best, dist, where=closer)
+            indices[closer] = code
+    return indices, best.sum(axis=0)
+
+
+def _ordered_565(high, low):
+    c0, c1 = _to_565(high), _to_565(low)
+    swap = c0 < c1
+    return np.where(swap, c1, c0), np.where(swap, c0, c1)
+
+
+def encode_bc1_colors(blocks):
+    """(N, 8) BC1 color blocks of (N, 16, 4) uint8 blocks (alpha ignored, always 4-color mode)."""
+    planes = _planes(blocks, 3)
+    c0, c1 = _ordered_565(*_principal_endpoints(planes))
+    indices, error = _bc1_fit(planes, c0, c1)
+    # One least-squares refit of the endpoints to the chosen indices; kept where it helps
+    a = np.array([1.0, 0.0, 2 / 3, 1 / 3], dtype=np.float32)[indices]  # share of endpoint 0
+    b = 1.0 - a
+    aa, bb, ab = (a * a).sum(axis=0), (b * b).sum(axis=0), (a * b).sum(axis=0)
+    det = aa * bb - ab * ab
+    ok = np.abs(det) > 1e-6
+    det = np.where(ok, det, 1.0)
+    ax, bx = (planes * a).sum(axis=1), (planes * b).sum(axis=1)
+    high = np.clip((bb * ax - ab * bx) / det, 0, 255)
+    low = np.clip((aa * bx - ab * ax) / det, 0, 255)
+    r0, r1 = _ordered_565(high, low)
+    refit_indices, refit_error = _bc1_fit(planes, r0, r1)
+    better = ok & (refit_error < error)
+    c0, c1 = np.where(better, r0, c0), np.where(better, r1, c1)
+    indices = np.where(better, refit_indices, indices)
+    indices[:, c0 == c1] = 0  # flat block: equal endpoints would select 3-color mode
+    bits = (indices.astype(np.uint32) << (2 * np.arange(16, dtype=np.uint32))[:, None]).sum(axis=0, dtype=np.uint32)
+    out = np.empty((len(blocks), 8), dtype=np.uint8)
+    out[:, 0:2] = c0.astype("<u2").view(np.uint8).reshape(-1, 2)
+    out[:, 2:4] = c1.astype("<u2").view(np.uint8).reshape(-1, 2)
+    out[:, 4:8] = bits.astype("<u4").view(np.uint8).reshape(-1, 4)
+    return out
+
+
+def encode_bc3_alpha(blocks):
+    """(N, 8) BC3 alpha blocks: min/max endpoints, 8-value mode, nearest 3-bit index per texel."""
+    alpha = blocks[..., 3].astype(np.int32)
+    a0, a1 = alpha.max(axis=1), alpha.min(axis=1)
+    span = np.maximum(a0 - a1, 1)
+    # Position on the ramp from a1 (0) to a0 (7), rounded; codes: 0 = a0, 1 = a1, 2..7 = a0 -> a1
+    step = np.rint((alpha - a1[:, None]) * 7 / span[:, None]).astype(np.int32)
+    codes = np.where(step == 7, 0, np.where(step == 0, 1, 8 - step))
+    codes[a0 == a1] = 0
+    bits = (codes.astype(np.uint64) << (3 * np.arange(16, dtype=np.uint64))).sum(axis=1, dtype=np.uint64)
+    out = np.empty((len(blocks), 8), dtype=np.uint8)
+    out[:, 0] = a0
+    out[:, 1] = a1
+    out[:, 2:8] = bits.astype("<u8").view(np.uint8).reshape(-1, 8)[:, :6]
+    return out
+
+
+def encode_bc1(blocks):
+    return encode_bc1_colors(blocks)
+
+
+def encode_bc3(blocks):
+    return np.concatenate([encode_bc3_alpha(blocks), encode_bc1_colors(blocks)], axis=1)
+
+
+def _put_bits(lo, hi, values, offset, bits):
+    values = values.astype(np.uint64)
+    if offset + bits <= 64:
+        lo |= values << np.uint64(offset)
+    elif offset >= 64:
+        hi |= values << np.uint64(offset - 64)
+    else:
+        low_bits = 64 - offset
+        lo |= (values & np.uint64((1 << low_bits) - 1)) << np.uint64(offset)
+        hi |= values >> np.uint64(low_bits)
+
+
+def _bc7_endpoint(color):
+    """Mode 6 endpoint (7 bits per channel + shared p-bit) closest to (4, N) float RGBA colors.
+
+    Alpha errors weigh more when picking the p-bit, so opaque texels stay exactly 255
+    (at the cost of one step of color) and alpha tests keep working.
+    """
+    candidates = []
+    for pbit in (0, 1):
+        q = np.clip(np.rint((color - pbit) / 2), 0, 127).astype(np.int32)
+        error = (((q << 1) | pbit) - color) ** 2
+        candidates.append((q, error[:3].sum(axis=0) + 4 * error[3]))
+    (even, even_error), (odd, odd_error) = candidates
+    pbit = (odd_error < even_error).astype(np.int32)
+    return np.where(pbit == 1, odd, even), pbit
+
+
+def encode_bc7(blocks):
+    """(N, 16) BC7 mode 6 blocks: one RGBA segment per block, 7777+p endpoints, 4-bit indices.
+
+    Only mode 6 is used (the fast subset): no partitions or rotations, indices from the
+    projection of each texel on the quantized segment.
+    """
+    planes = _planes(blocks, 4)
+    high, low = _principal_endpoints(planes)
+    q0, p0 = _bc7_endpoint(high)
+    q1, p1 = _bc7_endpoint(low)
+    e0 = ((q0 << 1) | p0).astype(np.float32)
+    segment = ((q1 << 1) | p1) - e0
+    length = np.maximum((segment * segment).sum(axis=0), 1e-6)
+    t = ((planes - e0[:, None, :]) * segment[:, None, :]).sum(axis=0) / length
+    # Nearest of the 16 interpolation weights (w / 64) to each projection
+    indices = np.searchsorted(_BC7_MIDPOINTS, np.clip(t, 0, 1) * 64).astype(np.int32)
+    # The anchor (first) index is stored with 3 bits: swap the endpoints if its top bit is set
+    swap = indices[0] >= 8
+    q0, q1 = np.where(swap, q1, q0), np.where(swap, q0, q1)
+    p0, p1 = np.where(swap, p1, p0), np.where(swap, p0, p1)
+    indices = np.where(swap, 15 - indices, indices)
+
+    n = len(blocks)
+    lo, hi = np.zeros(n, dtype=np.uint64), np.zeros(n, dtype=np.uint64)
+    _put_bits(lo, hi, np.full(n, 1 << 6), 0, 7)  # mode 6
+    offset = 7
+    for channel in range(4):
+        _put_bits(lo, hi, q0[channel], offset, 7)
+        _put_bits(lo, hi, q1[channel], offset + 7, 7)
+        offset += 14
+    _put_bits(lo, hi, p0, 63, 1)
+    _put_bits(lo, hi, p1, 64, 1)
+    _put_bits(lo, hi, indices[0], 65, 3)
+    for i in range(1, 16):
+        _put_bits(lo, hi, indices[i], 68 + 4 * (i - 1), 4)
+    out = np.empty((n, 16), dtype=np.uint8)
+    out[:, :8] = lo.astype("<u8").view(np.uint8).reshape(-1, 8)
+    out[:, 8:] = hi.astype("<u8").view(np.uint8).reshape(-1, 8)
+    return out
+
+
+_ENCODERS = {"bc1": encode_bc1, "bc3": encode_bc3, "bc7": encode_bc7}
+
+
+def encode_level(rgba, fmt, pool=None):
+    """Block-compressed bytes of one (h, w, 4) uint8 level; chunks of blocks run on pool if given."""
+    blocks = to_blocks(rgba)
+    encoder = _ENCODERS[fmt]
+    chunks = [blocks[start:start + CHUNK_BLOCKS] for start in range(0, len(blocks), CHUNK_BLOCKS)]
+    encoded = list(pool.map(encoder, chunks)) if pool is not None and len(chunks) > 1 else [encoder(c) for c in chunks]
+    return b"".join(chunk.tobytes() for chunk in encoded)
+
+
+def dds_header(width, height, fmt, mip_count):
+    """DDS magic + DDS_HEADER (+ DDS_HEADER_DXT10 for BC7) for a 2D block-compressed texture."""
+    flags = _DDSD_CAPS | _DDSD_HEIGHT | _DDSD_WIDTH | _DDSD_PIXELFORMAT | _DDSD_LINEARSIZE
+    caps = _DDSCAPS_TEXTURE
+    if mip_count > 1:
+        flags |= _DDSD_MIPMAPCOUNT
+        caps |= _DDSCAPS_COMPLEX | _DDSCAPS_MIPMAP
+    linear_size = max(1, -(-width // 4)) * max(1, -(-height // 4)) * BLOCK_BYTES[fmt]
+    fourcc = {"bc1": b"DXT1", "bc3": b"DXT5", "bc7": b"DX10"}[fmt]
+    pixel_format = struct.pack("<II4s5I", 32, _DDPF_FOURCC, fourcc, 0, 0, 0, 0, 0)
+    header = struct.pack("<7I44x", 124, flags, height, width, linear_size, 0, mip_count)
+    header += pixel_format + struct.pack("<5I", caps, 0, 0, 0, 0)
+    if fmt == "bc7":
+        header += struct.pack("<5I", _DXGI_FORMAT_BC7_UNORM, _D3D10_RESOURCE_DIMENSION_TEXTURE2D, 0, 1, 0)
+    return b"DDS " + header
+
+
+def write_dds(path, rgba, fmt=DEFAULT_DDS_FORMAT, mips=True, alpha_threshold=1, workers=0, levels=None):
+    """Save an (h, w, 4) uint8 straight-alpha atlas as a BC1/BC3/BC7 DDS, with its mip chain if mips.
+
+    levels, if given, are the prebuilt uint8 levels below rgba (e.g. mip_export.mip_levels)
+    and replace mip_chain's box-filtered ones. Blocks are encoded in chunks on `workers`
+    threads (0 = one per CPU); numpy releases the GIL in the heavy array operations.
+    path may be a binary file object.
+    """
+    if fmt not in _ENCODERS:
+        raise ValueError(f"unknown DDS format {fmt!r} (expected one of {', '.join(DDS_FORMATS)})")
+    height, width = rgba.shape[:2]
+    if width == 0 or height == 0:
+        raise ValueError("cannot write an empty DDS")
+    if not mips:
+        levels = [rgba]
+    elif levels is not None:
+        levels = [rgba] + list(levels)
+    else:
+        levels = mip_chain(rgba, alpha_threshold)
+    workers = resolve_worker_count(workers)
+    with ThreadPoolExecutor(max_workers=workers) if workers > 1 else contextlib.nullcontext() as pool:
+        data = [encode_level(level, fmt, pool) for level in levels]
+    own = isinstance(path, str)
+    f = open(path, "wb") if own else path
+    try:
+        f.write(dds_header(width, height, fmt, len(levels)))
+        for level in data:
+            f.write(level)
+    finally:
+        if own:
+            f.close()
+
@@ -0,0 +1,165 @@
+import numpy as np
+
+BAND_ROWS = 256  # rows per pass over the offset maps
+MAX_SIZE = 16384  # offsets are int16, so atlases up to 16K
+NO_SEED = 32767  # row offset of pixels with no opaque pixel found yet
+# Squared distance of pixels without an opaque pixel: above any real one (< 2 * MAX_SIZE**2)
+# and below any candidate built from NO_SEED (>= (NO_SEED - MAX_SIZE // 2) ** 2), so those
+# candidates never win and no validity test is needed
+_NO_SEED_DIST = 2 * MAX_SIZE ** 2 + 1
+_FAR = 1 << 30  # column sentinel for rows without opaque pixels
+
+
+def _rows(store, top, bottom):
+    # Plain arrays and row files (tiled export) are read and written the same way
+    return store.rows(top, bottom) if hasattr(store, "rows") else store[top:bottom]
+
+
+def _bands(height, band_rows):
+    for top in range(0, height, band_rows):
+        yield top, min(height, top + band_rows)
+
+
+def _jump_steps(height, max_radius):
+    """Column jump lengths: powers of two down to 1, then 2 and 1 again to fix up misses."""
+    reach = int(height) if not max_radius else min(int(height), int(max_radius))
+    step = 1 << max(0, (reach - 1).bit_length() - 1)
+    steps = []
+    while step >= 1:
+        steps.append(step)
+        step //= 2
+    return steps + [2, 1] if height > 2 else steps
+
+
+def _row_pass(keep, vy, vx, dist):
+    """Exact nearest opaque pixel within each row; rows without any get NO_SEED."""
+    width = keep.shape[1]
+    cols = np.arange(width, dtype=np.int32)
+    left = np.where(keep, cols, -_FAR)
+    np.maximum.accumulate(left, axis=1, out=left)
+    right = np.where(keep, cols, _FAR)[:, ::-1]
+    right = np.minimum.accumulate(right, axis=1)[:, ::-1]
+    to_left, to_right = cols - left, right - cols
+    offset = np.where(to_left <= to_right, -to_left, to_right)
+    empty = ~keep.any(axis=1)
+    offset[empty] = 0
+    vx[...] = offset
+    vy[...] = 0
+    vy[empty] = NO_SEED
+    np.multiply(offset, offset, out=dist)
+    dist[empty] = _NO_SEED_DIST
+
+
+class _Scratch:
+    """Band-sized temporaries reused by every column pass (fresh multi-MB arrays cost page faults)."""
+
+    def __init__(self, rows, width):
+        shape = (rows, width)
+        self.src_vx = np.empty(shape, dtype=np.int16)
+        self.cand_vy = np.empty(shape, dtype=np.int32)
+        self.cand = np.empty(shape, dtype=np.int32)
+        self.square = np.empty(shape, dtype=np.int32)
+        self.better = np.empty(shape, dtype=bool)
+
+    def take(self, rows):
+        return [getattr(self, name)[:rows] for name in ("src_vx", "cand_vy", "cand", "square", "better")]
+
+
+def _column_pass(vy, vx, dist, height, oy, band_rows, scratch):
+    """One jump of length |oy|: take the neighbour's opaque pixel (oy rows away) where it is closer.
+
+    Bands are visited so that they only read rows this pass has not written yet,
+    which makes the result independent of band_rows.
+    """
+    first, last = max(0, -oy), min(height, height - oy)
+    if first >= last:
+        return
+    bands = list(_bands(last - first, band_rows))
+    if oy < 0:
+        bands.reverse()
+    for top, bottom in bands:
+        top, bottom = top + first, bottom + first
+        src_vx, cand_vy, cand, square, better = scratch.take(bottom - top)
+        src_vy = _rows(vy, top + oy, bottom + oy)
+        # Copied: for row files numpy cannot see that the source overlaps the rows written below
+        np.copyto(src_vx, _rows(vx, top + oy, bottom + oy))
+        np.add(src_vy, oy, out=cand_vy, dtype=np.int32)
+        np.multiply(src_vx, src_vx, out=cand, dtype=np.int32)
+        np.square(cand_vy, out=square)
+        cand += square
+        band_dist = _rows(dist, top, bottom)
+        np.less(cand, band_dist, out=better)
+        np.copyto(band_dist, cand, where=better)
+        np.copyto(_rows(vy, top, bottom), cand_vy, where=better, casting="unsafe")
+        np.copyto(_rows(vx, top, bottom), src_vx, where=better)
+
+
+def nearest_opaque(keep_rows, height, width, max_radius=0, make_buffer=None, band_rows=BAND_ROWS):
+    """Offsets (vy, vx) from every pixel to a near opaque pixel, and the squared distance.
+
+    keep_rows(top, bottom) returns the opaque mask of those rows. This is a separable
+    jump flood: an exact nearest opaque pixel per row, then jumps of halving length
+    along columns. Like any jump flood it is approximate; a small fraction of pixels
+    picks an opaque pixel a little farther than the nearest one. With max_radius only
+    jumps up to that reach are made. make_buffer(shape, dtype) allocates the three
+    maps (numpy arrays by default, row files for tiled exports).
+    """
+    make_buffer = make_buffer or (lambda shape, dtype: np.empty(shape, dtype=dtype))
+    vy = make_buffer((height, width), np.int16)
+    vx = make_buffer((height, width), np.int16)
+    dist = make_buffer((height, width), np.int32)
+    for top, bottom in _bands(height, band_rows):
+        _row_pass(keep_rows(top, bottom), _rows(vy, top, bottom), _rows(vx, top, bottom), _rows(dist, top, bottom))
+    scratch = _Scratch(min(band_rows, height), width)
+    for step in _jump_steps(height, max_radius):
+        for oy in (-step, step):
+            _column_pass(vy, vx, dist, height, oy, band_rows, scratch)
+    return vy, vx, dist
+
+
+def dilate_rows(atlas, height, width, alpha_threshold=1, max_radius=0, make_buffer=None, band_rows=BAND_ROWS):
+    """Edge dilation of an (h, w, 4) uint8 atlas store in place (array or row file).
+
+    Color outside the alpha mask is copied from the nearest opaque texel; alpha is left
+    untouched. With max_radius > 0 only pixels within that many pixels are filled.
+    """
+    if width == 0 or height == 0:
+        return
+    if height > MAX_SIZE or width > MAX_SIZE:
+        raise ValueError(f"dilation supports atlases up to {MAX_SIZE} px")
+
+    def keep_rows(top, bottom):
+        return _rows(atlas, top, bottom)[..., 3] > alpha_threshold
+
+    vy, vx, dist = nearest_opaque(keep_rows, height, width, max_radius, make_buffer, band_rows)
+    limit = int(max_radius) ** 2 if max_radius else _NO_SEED_DIST - 1
+    cols = np.arange(width, dtype=np.int64)
+    for top, bottom in _bands(height, band_rows):
+        band_vy = np.asarray(_rows(vy, top, bottom))
+        band_vx = np.asarray(_rows(vx, top, bottom))
+        alpha = np.array(_rows(atlas, top, bottom)[..., 3])
+        fill = alpha <= alpha_threshold
+        fill &= np.asarray(_rows(dist, top, bottom)) <= limit
+        if not fill.any():
+            continue
+        src_y = np.arange(top, bottom, dtype=np.int64)[:, None] + np.where(fill, band_vy, 0)
+        first, last = int(src_y.min()), int(src_y.max()) + 1
+        index = (src_y - first) * width
+        index += cols
+        index += np.where(fill, band_vx, 0)
+        # Whole pixels are gathered from the opaque texels (which are never written, so
+        # reading them from the same atlas is safe); alpha is put back afterwards. The
+        # source window is a view, so only the gathered pages of a row file are touched
+        source = _rows(atlas, first, last).view(np.uint32).reshape(-1)
+        pixels = np.take(source, index)
+        del source
+        band = _rows(atlas, top, bottom)
+        band.view(np.uint32)[..., 0] = pixels
+        band[..., 3] = alpha
+
+
+def dilate(rgba, alpha_threshold=1, max_radius=0):
+    """Nearest-texel edge extension of an (h, w, 4) uint8 straight-alpha array; returns a new array."""
+    out = rgba.copy()
+    dilate_rows(out, out.shape[0], out.shape[1], alpha_threshold, max_radius)
+    return out
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import threading
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from core.image_cache import source_identity
+
+CACHE_FORMAT_VERSION = 2  # 2: JPEG draft decoding for heavy downscales
+DEFAULT_CACHE_BYTES = 2 * 1024 * 1024 * 1024  # 2 GiB
+
+
+def default_cache_dir():
+    return os.path.join(str(Path.home()), ".texture_processor_cache", "resample")
+
+
+def resample_cache_key(image_path, rect, target_size, mode, beta, radius, use_pyramid=False):
+    """Content address of one resampled crop: source identity + every resample input."""
+    parts = (
+        CACHE_FORMAT_VERSION,
+        source_identity(image_path),
+        tuple(int(v) for v in rect),
+        tuple(int(v) for v in target_size),
+        mode,
+        round(float(beta), 3) if mode == "kaiser" else None,
+        int(radius) if mode == "kaiser" else None,
+    )
+    if use_pyramid and mode != "nearest":
+        parts += ("pyramid",)
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+class ResampleDiskCache:
+    """On-disk store of resampled RGBA crops as .npy files with a total size cap.
+
+    Hits refresh the file mtime, and pruning deletes the least recently used files first.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_CACHE_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max(0, int(max_bytes))
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._total_bytes = None  # scanned lazily
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.pruned_files = 0
+        self.pruned_bytes = 0
+
+    def _path_for(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".npy")
+
+    def get(self, key):
+        """Return a read-only memory-mapped (h, w, 4) uint8 array, or None on a miss."""
+        if not self.enabled:
+            return None
+        path = self._path_for(key)
+        try:
+            arr = np.load(path, mmap_mode="r")
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return arr
+
+    def put(self, key, arr):
+        if not self.enabled:
+            return
+        path = self._path_for(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.ascontiguousarray(arr, dtype=np.uint8))
+            try:
+                replaced = os.path.getsize(path)  # an overwritten crop no longer counts
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self.writes += 1
+            if self._total_bytes is not None:
+                self._total_bytes += size - replaced
+        self.prune()
+
+    def _scan(self):
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".npy"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+        return entries
+
+    def total_bytes(self):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._scan())
+            return self._total_bytes
+
+    def prune(self, max_bytes=None):
+        """Delete least recently used crops until the cache fits max_bytes."""
+        limit = self.max_bytes if max_bytes is None else max(0, int(max_bytes))
+        if self.total_bytes() <= limit:
+            return
+        with self._lock:
+            entries = sorted(self._scan())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= limit:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self.pruned_files += 1
+                self.pruned_bytes += size
+            self._total_bytes = total
+
+    def clear(self):
+        self.prune(max_bytes=0)
+
+    def stats(self):
+        total = self.total_bytes()
+        with self._lock:
+            return {
+                "cache_dir": self.cache_dir,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "pruned_files": self.pruned_files,
+                "pruned_bytes": self.pruned_bytes,
+            }
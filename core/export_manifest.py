@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+from dataclasses import astuple
+
+from core.incremental_export import placement_fingerprint
+from core.png_writer import DEFAULT_PNG_PRESET
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path(output_path):
+    """Where the inputs hash of an exported file is kept: next to it, as <name>.manifest.json."""
+    return output_path + ".manifest.json"
+
+
+def _digest(parts):
+    return hashlib.sha1(repr((MANIFEST_VERSION,) + parts).encode("utf-8")).hexdigest()
+
+
+def atlas_inputs_hash(compositor, placements, mip_flood_settings=None, dilation=None, encoding=("png", DEFAULT_PNG_PRESET)):
+    """Hash of everything an atlas image export depends on.
+
+    encoding holds the file format and its settings, e.g. ("png", preset, mip_chain) or
+    ("dds", format, mips, mip_chain). Sources count by identity (path, mtime, size), so touching a file is
+    a miss; the export budget and incremental mode only change how the same pixels are
+    produced.
+    """
+    settings = (compositor.width, compositor.height, compositor.density, compositor.mode, compositor.beta,
+                compositor.radius, compositor.use_pyramid, mip_flood_settings, dilation)
+    return _digest((repr(encoding), settings, tuple(placement_fingerprint(p) for p in placements)))
+
+
+def mesh_inputs_hash(meshes, atlas_width, atlas_height, density, encoding=("obj", False, False, False)):
+    """Hash of everything a mesh export depends on; encoding is ("obj", triangulate, weld, merged) or ("glb", merged)."""
+    return _digest((repr(encoding), int(atlas_width), int(atlas_height), density, tuple(astuple(m) for m in meshes)))
+
+
+def _file_identity(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def is_current(output_path, inputs_hash):
+    """True if output_path was written from inputs_hash and has not been touched since."""
+    try:
+        with open(manifest_path(output_path), "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    identity = _file_identity(output_path)
+    return identity is not None and manifest.get("inputs") == inputs_hash and manifest.get("output") == identity
+
+
+def invalidate(output_path):
+    """Forget the manifest before output_path is rewritten, so a failed write is never a hit."""
+    try:
+        os.remove(manifest_path(output_path))
+    except FileNotFoundError:
+        pass
+
+
+def record(output_path, inputs_hash):
+    """Store inputs_hash with the identity of the freshly written output_path."""
+    path = manifest_path(output_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "inputs": inputs_hash, "output": _file_identity(output_path)}, f)
+    os.replace(tmp_path, path)
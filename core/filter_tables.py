@@ -0,0 +1,125 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def kaiser_weight(dist, radius, beta):
+    """Kaiser-windowed sinc for |dist| <= radius, zero outside."""
+    mask = np.abs(dist) <= radius
+    out = np.zeros_like(dist, dtype=np.float32)
+    ratio = np.zeros_like(dist, dtype=np.float32)
+    ratio[mask] = dist[mask] / radius
+    window = np.zeros_like(dist, dtype=np.float32)
+    window[mask] = np.i0(beta * np.sqrt(1 - ratio[mask] ** 2)) / np.i0(beta)
+    out[mask] = np.sinc(dist[mask]) * window[mask]
+    return out
+
+
+def lanczos_weight(dist, radius, _param=None):
+    """Lanczos-a kernel (a = radius): sinc(x) * sinc(x / a) for |x| < a."""
+    mask = np.abs(dist) < radius
+    out = np.zeros_like(dist, dtype=np.float32)
+    out[mask] = np.sinc(dist[mask]) * np.sinc(dist[mask] / radius)
+    return out
+
+
+def box_weight(dist, _radius=None, _param=None):
+    """Box of width 1: 1 inside, 1/2 on the edges, so texels on a boundary are shared evenly."""
+    dist = np.abs(dist)
+    return np.where(dist < 0.5, 1.0, np.where(dist == 0.5, 0.5, 0.0)).astype(np.float32)
+
+
+KERNELS = {
+    "box": box_weight,
+    "kaiser": kaiser_weight,
+    "lanczos": lanczos_weight,
+}
+
+
+def build_filter_table(kernel, src_len, tgt_len, radius, param=None, start=0.0, span=None):
+    """Tap indices (tgt_len, taps) into the source axis and their normalized weights.
+
+    start/span select a (possibly fractional) window of the source axis; by default
+    the whole axis is mapped onto the target.
+    """
+    weight_fn = KERNELS[kernel]
+    span = src_len if span is None else span
+    centers = start + (np.arange(tgt_len) + 0.5) * span / tgt_len - 0.5
+    offsets = np.arange(-radius, radius + 1)
+    idx = np.floor(centers[:, None] + offsets).astype(int)
+    idx = np.clip(idx, 0, src_len - 1)
+    weights = weight_fn(centers[:, None] - idx, radius, param)
+    total = weights.sum(axis=1, keepdims=True)
+    weights = np.divide(weights, total, out=np.zeros_like(weights), where=total != 0)
+    return idx, weights
+
+
+class FilterTableCache:
+    """LRU of normalized (indices, weights) tables keyed by kernel and axis geometry."""
+
+    def __init__(self, limit=256):
+        self.limit = max(1, int(limit))
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, kernel, src_len, tgt_len, radius, param=None, start=0.0, span=None):
+        span = src_len if span is None else span
+        key = (
+            kernel,
+            int(src_len),
+            int(tgt_len),
+            int(radius),
+            None if param is None else round(float(param), 6),
+            round(float(start), 6),
+            round(float(span), 6),
+        )
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                self.hits += 1
+                return table
+            self.misses += 1
+
+        idx, weights = build_filter_table(kernel, src_len, tgt_len, radius, param, start, span)
+        # Tables are shared between callers, so keep them immutable
+        idx.setflags(write=False)
+        weights.setflags(write=False)
+        table = (idx, weights)
+        with self._lock:
+            self._tables[key] = table
+            while len(self._tables) > self.limit:
+                self._tables.popitem(last=False)
+                self.evictions += 1
+        return table
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._tables),
+                "limit": self.limit,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "reuse_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+_shared_tables = FilterTableCache()
+
+
+def shared_filter_tables():
+    return _shared_tables
+
+
+def filter_table(kernel, src_len, tgt_len, radius, param=None, start=0.0, span=None):
+    return _shared_tables.get(kernel, src_len, tgt_len, radius, param, start, span)
@@ -0,0 +1,51 @@
+class FragmentStore:
+    """Reference-counted results keyed by their full render inputs.
+
+    Every holder of a key shares one stored value; the value is dropped when the
+    last holder releases it. Not thread-safe: owners use it from one thread.
+    """
+
+    def __init__(self):
+        self._entries = {}  # key -> [value, refs]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """The stored value for key, or None; does not take a reference."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def acquire(self, key, value):
+        """Take a reference to key, storing value if key is new; returns the shared value."""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [value, 0]
+        entry[1] += 1
+        return entry[0]
+
+    def release(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self._entries[key]
+
+    def refs(self, key):
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else 0
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "references": sum(entry[1] for entry in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
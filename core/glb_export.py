@@ -0,0 +1,143 @@
+import json
+import os
+import struct
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+
+from core.obj_export import atlas_outline, sorted_masks
+from core.triangulate import signed_area, triangulate_polygon
+
+GLB_MAGIC = b"glTF"
+GLB_VERSION = 2
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+FLOAT, UNSIGNED_INT = 5126, 5125  # accessor component types
+ARRAY_BUFFER, ELEMENT_ARRAY_BUFFER = 34962, 34963  # bufferView targets
+TRIANGLES = 4
+
+
+@dataclass
+class GlbMesh:
+    """Triangle meshes of an atlas in three contiguous buffers, ready to be written as the GLB binary chunk.
+
+    positions (n, 3) float32 meters, uvs (n, 2) float32, indices (m,) uint32 triangle
+    corners local to each primitive's vertices. primitives are (name, first vertex,
+    vertex count, first index, index count) slices of those buffers.
+    """
+    positions: np.ndarray
+    uvs: np.ndarray
+    indices: np.ndarray
+    primitives: List[tuple] = field(default_factory=list)
+    extras: dict = field(default_factory=dict)
+
+
+def build_glb_mesh(masks, atlas_width, atlas_height, density, merged=False):
+    """Triangulated mask meshes as a GlbMesh; returns (mesh, None) or (None, error) like generate_obj.
+
+    Positions use the OBJ's convention: meters, atlas top-left at the origin, +Y up,
+    Z = 0. UVs follow glTF's, with (0, 0) at the image's top-left corner, so the atlas
+    maps without a flip. Concave masks are ear-clipped; merged puts every mask in one
+    primitive instead of one per mask.
+    """
+    masks = list(masks)
+    if not masks:
+        return None, "No items on atlas to export."
+    if atlas_width <= 0 or atlas_height <= 0:
+        return None, "Invalid atlas size."
+
+    outlines, triangles, names = [], [], []
+    for idx, mask in enumerate(sorted_masks(masks), start=1):
+        outline = atlas_outline(mask, density)
+        if outline is None:
+            continue
+        tris = triangulate_polygon(outline)
+        if not len(tris):
+            continue  # zero area; glTF accessors cannot be empty
+        # Counter-clockwise in atlas pixels (+Y down) is clockwise once Y points up: flip those,
+        # so every face points along +Z whichever way the mask was drawn
+        outlines.append(outline)
+        triangles.append(tris[:, ::-1] if signed_area(outline) > 0 else tris)
+        names.append(f"mask_{mask.mask_id or idx}")
+    if not outlines:
+        return None, "No valid masks to export."
+
+    atlas = np.concatenate(outlines)
+    positions = np.zeros((len(atlas), 3), dtype=np.float32)
+    positions[:, 0] = atlas[:, 0] / density
+    positions[:, 1] = (atlas_height - atlas[:, 1]) / density
+    uvs = np.empty((len(atlas), 2), dtype=np.float32)
+    uvs[:, 0] = atlas[:, 0] / atlas_width
+    uvs[:, 1] = atlas[:, 1] / atlas_height
+
+    vertex_counts = [len(outline) for outline in outlines]
+    index_counts = [3 * len(tris) for tris in triangles]
+    if merged:
+        starts = np.cumsum([0] + vertex_counts[:-1])
+        indices = np.concatenate([tris + start for tris, start in zip(triangles, starts)])
+        primitives = [("atlas", 0, len(atlas), 0, indices.size)]
+    else:
+        indices = np.concatenate(triangles)
+        vertex_starts = np.cumsum([0] + vertex_counts[:-1])
+        index_starts = np.cumsum([0] + index_counts[:-1])
+        primitives = list(zip(names, vertex_starts.tolist(), vertex_counts, index_starts.tolist(), index_counts))
+    extras = {"atlas_size": [int(atlas_width), int(atlas_height)], "atlas_density_px_per_m": density}
+    return GlbMesh(positions, uvs, np.ascontiguousarray(indices, dtype=np.uint32).reshape(-1), primitives, extras), None
+
+
+def glb_document(mesh):
+    """glTF JSON of a GlbMesh: one node and mesh per primitive, buffer views over positions, uvs, indices."""
+    views = []
+    offset = 0
+    for array, target in ((mesh.positions, ARRAY_BUFFER), (mesh.uvs, ARRAY_BUFFER), (mesh.indices, ELEMENT_ARRAY_BUFFER)):
+        views.append({"buffer": 0, "byteOffset": offset, "byteLength": array.nbytes, "target": target})
+        if target == ARRAY_BUFFER:
+            views[-1]["byteStride"] = array.itemsize * array.shape[1]  # required: every primitive's accessor shares the view
+        offset += array.nbytes  # float32/uint32 buffers keep every view 4-byte aligned
+    accessors, meshes, nodes = [], [], []
+    for name, first_vertex, vertex_count, first_index, index_count in mesh.primitives:
+        corners = mesh.positions[first_vertex:first_vertex + vertex_count]
+        accessors.append({"bufferView": 0, "byteOffset": 12 * first_vertex, "componentType": FLOAT, "count": vertex_count,
+                          "type": "VEC3", "min": corners.min(axis=0).tolist(), "max": corners.max(axis=0).tolist()})
+        accessors.append({"bufferView": 1, "byteOffset": 8 * first_vertex, "componentType": FLOAT, "count": vertex_count,
+                          "type": "VEC2"})
+        accessors.append({"bufferView": 2, "byteOffset": 4 * first_index, "componentType": UNSIGNED_INT, "count": index_count,
+                          "type": "SCALAR"})
+        base = len(accessors) - 3
+        meshes.append({"name": name, "primitives": [{"attributes": {"POSITION": base, "TEXCOORD_0": base + 1},
+                                                     "indices": base + 2, "mode": TRIANGLES}]})
+        nodes.append({"name": name, "mesh": len(meshes) - 1})
+    return {
+        "asset": {"version": "2.0", "generator": "Texture Atlas Editor GLB export", "extras": mesh.extras},
+        "scene": 0,
+        "scenes": [{"nodes": list(range(len(nodes)))}],
+        "nodes": nodes,
+        "meshes": meshes,
+        "accessors": accessors,
+        "bufferViews": views,
+        "buffers": [{"byteLength": offset}],
+    }
+
+
+def write_glb(path, mesh):
+    """Write a GlbMesh as binary glTF; the numpy buffers go straight into the BIN chunk without copies.
+
+    path may be a binary file object.
+    """
+    document = json.dumps(glb_document(mesh), separators=(",", ":")).encode("utf-8")
+    document += b" " * (-len(document) % 4)  # JSON chunk padded with spaces
+    binary_length = mesh.positions.nbytes + mesh.uvs.nbytes + mesh.indices.nbytes
+    total = 12 + 8 + len(document) + 8 + binary_length
+    own = isinstance(path, (str, os.PathLike))
+    f = open(path, "wb") if own else path
+    try:
+        f.write(struct.pack("<4sII", GLB_MAGIC, GLB_VERSION, total))
+        f.write(struct.pack("<II", len(document), CHUNK_JSON))
+        f.write(document)
+        f.write(struct.pack("<II", binary_length, CHUNK_BIN))
+        for array in (mesh.positions, mesh.uvs, mesh.indices):
+            f.write(memoryview(np.ascontiguousarray(array)).cast("B"))
+    finally:
+        if own:
+            f.close()
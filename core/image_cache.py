@@ -0,0 +1,178 @@
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+DEFAULT_BUDGET_BYTES = 1024 * 1024 * 1024  # 1 GiB of decoded RGBA
+DRAFT_SCALES = (8, 4, 2)  # JPEG DCT-domain reductions
+DRAFT_QUALITY_MARGIN = 2.0  # reduced crop must stay >= this many times the target
+
+
+def source_identity(path):
+    """(resolved path, mtime_ns, size) — changes whenever the file on disk changes."""
+    resolved = os.path.normcase(os.path.realpath(path))
+    st = os.stat(resolved)
+    return resolved, st.st_mtime_ns, st.st_size
+
+
+def image_nbytes(image):
+    return image.width * image.height * len(image.getbands())
+
+
+def draft_scale(rect_size, target_size, margin=DRAFT_QUALITY_MARGIN):
+    """Largest JPEG draft scale that keeps the reduced crop >= margin x target on both axes, else 1."""
+    rect_w, rect_h = rect_size
+    tgt_w, tgt_h = target_size
+    for scale in DRAFT_SCALES:
+        if rect_w / scale >= margin * tgt_w and rect_h / scale >= margin * tgt_h:
+            return scale
+    return 1
+
+
+def _decode_draft(path, scale):
+    """Decode a JPEG at 1/scale in the DCT domain; (image, scale) or None if the file can't be drafted."""
+    with Image.open(path) as src:
+        if src.format != "JPEG":
+            return None
+        full_w, full_h = src.size
+        src.draft(src.mode, (-(-full_w // scale), -(-full_h // scale)))
+        # libjpeg may pick a smaller reduction than requested; find the one it used
+        for actual in DRAFT_SCALES:
+            if src.size == (-(-full_w // actual), -(-full_h // actual)):
+                return src.convert("RGBA"), actual
+    return None
+
+
+class DecodedImageCache:
+    """LRU cache of decoded RGBA sources, evicted by total byte size rather than entry count."""
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = max(0, int(budget_bytes))
+        self._entries = OrderedDict()  # identity -> (image, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.draft_decodes = 0
+        self.draft_uses = 0
+        self._draft_factors = {}  # (identity..., scale) -> reduction libjpeg used; 1 = not draftable
+
+    def get(self, path):
+        """Return the decoded RGBA image for path, decoding it on a miss. Raises OSError if unreadable."""
+        key = source_identity(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        with Image.open(key[0]) as src:
+            image = src.convert("RGBA")
+        self.put(key, image)
+        return image
+
+    def get_draft(self, path, scale):
+        """(image, factor): the source reduced by factor via JPEG draft decoding.
+
+        Non-JPEG sources and scale 1 fall back to the full decode with factor 1.
+        Reduced decodes are cached next to full ones, keyed by the requested scale.
+        """
+        if scale <= 1:
+            return self.get(path), 1
+        key = source_identity(path) + (scale,)
+        with self._lock:
+            factor = self._draft_factors.get(key)
+            entry = self._entries.get(key) if factor != 1 else None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.draft_uses += 1
+                return entry[0], factor
+        if factor == 1:
+            return self.get(path), 1
+
+        decoded = _decode_draft(key[0], scale)
+        if decoded is None:
+            with self._lock:
+                self._draft_factors[key] = 1
+            return self.get(path), 1
+        image, factor = decoded
+        with self._lock:
+            self._draft_factors[key] = factor
+            self.misses += 1
+            self.draft_decodes += 1
+            self.draft_uses += 1
+        self.put(key, image)
+        return image, factor
+
+    def peek(self, path):
+        """Return the decoded image only if it is already cached; never decodes and never counts."""
+        try:
+            key = source_identity(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def put(self, key, image):
+        nbytes = image_nbytes(image)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            # Entries that alone exceed the budget are handed out but never retained
+            if nbytes > self.budget_bytes:
+                return
+            self._entries[key] = (image, nbytes)
+            self._bytes += nbytes
+            self._evict_locked()
+
+    def set_budget(self, budget_bytes):
+        with self._lock:
+            self.budget_bytes = max(0, int(budget_bytes))
+            self._evict_locked()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._draft_factors.clear()
+            self._bytes = 0
+
+    @property
+    def current_bytes(self):
+        return self._bytes
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "evicted_bytes": self.evicted_bytes,
+                "draft_decodes": self.draft_decodes,
+                "draft_uses": self.draft_uses,
+            }
+
+    def _evict_locked(self):
+        while self._entries and self._bytes > self.budget_bytes:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self._bytes -= nbytes
+            self.evictions += 1
+            self.evicted_bytes += nbytes
+
+
+_shared_cache = DecodedImageCache()
+
+
+def shared_decode_cache():
+    """Process-wide cache shared by every canvas/exporter in this process."""
+    return _shared_cache
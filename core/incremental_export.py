@@ -0,0 +1,330 @@
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+from core.dilation import _jump_steps, dilate
+from core.image_cache import source_identity
+from core.mip_export import write_mip_pngs
+from core.mip_flood import downsample_level, flood_into, level_sizes, to_pixels
+from core.png_writer import DEFAULT_PNG_PRESET, write_png
+
+CACHE_VERSION = 1
+TILE = 64  # dirty tracking granularity in pixels, at every mip level (even, so levels nest)
+
+
+def sidecar_dir(png_path):
+    """Where the incremental state of an exported PNG lives: next to it, as <name>.png.cache."""
+    return png_path + ".cache"
+
+
+def placement_fingerprint(placement):
+    """Every input that shapes one placement's pixels, including the source file identity."""
+    try:
+        identity = source_identity(placement.image_path)
+    except OSError:
+        identity = (placement.image_path, None)
+    parts = (identity, tuple(tuple(p) for p in placement.points), placement.real_width,
+             placement.original_width, placement.x, placement.y)
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def _settings_key(compositor, mip_flood_settings, dilation):
+    parts = (CACHE_VERSION, TILE, compositor.width, compositor.height, compositor.density, compositor.mode,
+             compositor.beta, compositor.radius, compositor.use_pyramid, mip_flood_settings, dilation)
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def diff_bounds(old, new):
+    """Atlas boxes whose stack of placements differs between two [(fingerprint, bounds)] lists in paint order.
+
+    Placements present in only one list are dirty, and so are common ones whose
+    position among the common placements changed (their stacking order did).
+    """
+    dirty = []
+    remaining = {}
+    for fingerprint, bounds in new:
+        remaining[fingerprint] = remaining.get(fingerprint, 0) + 1
+    common_old = []
+    for fingerprint, bounds in old:
+        if remaining.get(fingerprint, 0) > 0:
+            remaining[fingerprint] -= 1
+            common_old.append((fingerprint, bounds))
+        else:
+            dirty.append(bounds)
+    taken = {}
+    for fingerprint, _bounds in common_old:
+        taken[fingerprint] = taken.get(fingerprint, 0) + 1
+    common_new = []
+    for fingerprint, bounds in new:
+        if taken.get(fingerprint, 0) > 0:
+            taken[fingerprint] -= 1
+            common_new.append((fingerprint, bounds))
+        else:
+            dirty.append(bounds)
+    for (fp_old, bounds_old), (fp_new, bounds_new) in zip(common_old, common_new):
+        if fp_old != fp_new:
+            dirty.extend((bounds_old, bounds_new))
+    return [tuple(b) for b in dirty if b is not None]
+
+
+def tile_grid(height, width):
+    return np.zeros((math.ceil(height / TILE), math.ceil(width / TILE)), dtype=bool)
+
+
+def mark_boxes(grid, boxes):
+    """Set the tiles overlapped by pixel boxes (left, top, right, bottom); boxes are clipped."""
+    rows, cols = grid.shape
+    for left, top, right, bottom in boxes:
+        ty0, tx0 = max(0, math.floor(top / TILE)), max(0, math.floor(left / TILE))
+        ty1, tx1 = min(rows, math.ceil(bottom / TILE)), min(cols, math.ceil(right / TILE))
+        if ty0 < ty1 and tx0 < tx1:
+            grid[ty0:ty1, tx0:tx1] = True
+    return grid
+
+
+def grow_grid(grid, tiles):
+    """Tiles within `tiles` tiles (Chebyshev distance) of a set tile."""
+    if tiles <= 0 or not grid.any():
+        return grid.copy()
+    out = grid.copy()
+    rows, cols = grid.shape
+    for dy in range(-tiles, tiles + 1):
+        for dx in range(-tiles, tiles + 1):
+            src = grid[max(0, -dy):rows - max(0, dy), max(0, -dx):cols - max(0, dx)]
+            out[max(0, dy):max(0, dy) + src.shape[0], max(0, dx):max(0, dx) + src.shape[1]] |= src
+    return out
+
+
+def _pool_grid(grid, shape):
+    """Tiles of the next smaller mip level touched by set tiles of this one."""
+    rows, cols = grid.shape
+    padded = np.zeros((rows + rows % 2, cols + cols % 2), dtype=bool)
+    padded[:rows, :cols] = grid
+    pooled = padded[0::2, 0::2] | padded[1::2, 0::2] | padded[0::2, 1::2] | padded[1::2, 1::2]
+    return pooled[:shape[0], :shape[1]]
+
+
+def _expand_grid(grid, shape):
+    """Tiles of the next larger mip level covered by set tiles of this one."""
+    return np.repeat(np.repeat(grid, 2, axis=0), 2, axis=1)[:shape[0], :shape[1]]
+
+
+def grid_boxes(grid, height, width):
+    """Pixel boxes (left, top, right, bottom) of the bounding boxes of 8-connected groups of set tiles."""
+    seen = np.zeros_like(grid)
+    rows, cols = grid.shape
+    boxes = []
+    for ty, tx in zip(*np.nonzero(grid)):
+        if seen[ty, tx]:
+            continue
+        seen[ty, tx] = True
+        stack = [(ty, tx)]
+        y0, x0, y1, x1 = ty, tx, ty, tx
+        while stack:
+            y, x = stack.pop()
+            y0, x0, y1, x1 = min(y0, y), min(x0, x), max(y1, y), max(x1, x)
+            for ny in range(max(0, y - 1), min(rows, y + 2)):
+                for nx in range(max(0, x - 1), min(cols, x + 2)):
+                    if grid[ny, nx] and not seen[ny, nx]:
+                        seen[ny, nx] = True
+                        stack.append((ny, nx))
+        boxes.append((int(x0) * TILE, int(y0) * TILE, min(width, (int(x1) + 1) * TILE), min(height, (int(y1) + 1) * TILE)))
+    return boxes
+
+
+class _MipState:
+    """mip_flood's pyramid kept between exports: raw coverage-weighted levels, their masks and flooded copies."""
+
+    def __init__(self, sizes, arrays):
+        self.sizes = sizes
+        self.raw, self.masks, self.flooded = arrays
+
+    @staticmethod
+    def names(sizes):
+        return [f"{kind}_{level}" for level in range(1, len(sizes)) for kind in ("raw", "mask", "flooded")]
+
+    def update(self, straight, alpha_threshold, grid, output):
+        """Rebuild the levels under the dirty base tiles in grid, then re-flood output wherever they changed.
+
+        Each step calls the same helpers as mip_flood on tile-aligned slices (even
+        offsets, so 2x2 blocks and edge repeats line up), which keeps every pixel bit-identical.
+        """
+        grids = [grid]
+        for level in range(1, len(self.sizes)):
+            h, w = self.sizes[level]
+            grids.append(_pool_grid(grids[-1], (math.ceil(h / TILE), math.ceil(w / TILE))))
+            for left, top, right, bottom in grid_boxes(grids[level], h, w):
+                src_h, src_w = self.sizes[level - 1]
+                src_rows, src_cols = slice(2 * top, min(src_h, 2 * bottom)), slice(2 * left, min(src_w, 2 * right))
+                if level == 1:
+                    rgba = straight[src_rows, src_cols]
+                    color, mask = rgba[..., :3], (rgba[..., 3] > alpha_threshold).view(np.uint8)
+                else:
+                    color, mask = self.raw[level - 1][src_rows, src_cols], self.masks[level - 1][src_rows, src_cols]
+                out_color = self.raw[level][top:bottom, left:right]
+                out_color[...] = 0
+                downsample_level(color, mask, out_color, self.masks[level][top:bottom, left:right], unit=level == 1)
+
+        # Flood from smallest to largest; a level changes where it was rebuilt or where the one below it changed
+        changed = None
+        for level in range(len(self.sizes) - 1, -1, -1):
+            h, w = self.sizes[level]
+            shape = (math.ceil(h / TILE), math.ceil(w / TILE))
+            changed = grids[level] if changed is None else grids[level] | _expand_grid(changed, shape)
+            for left, top, right, bottom in grid_boxes(changed, h, w):
+                rows, cols = slice(top, bottom), slice(left, right)
+                if level == 0:
+                    small = to_pixels(self.flooded[1][top // 2:(bottom + 1) // 2, left // 2:(right + 1) // 2])
+                    out = output[rows, cols]
+                    out[...] = straight[rows, cols]
+                    flood_into(out.view(np.uint32)[..., 0], straight[rows, cols, 3] <= alpha_threshold, small)
+                    out[..., 3] = straight[rows, cols, 3]
+                    continue
+                self.flooded[level][rows, cols] = self.raw[level][rows, cols]
+                if level < len(self.sizes) - 1:
+                    small = self.flooded[level + 1][top // 2:(bottom + 1) // 2, left // 2:(right + 1) // 2]
+                    flood_into(self.flooded[level][rows, cols], self.masks[level][rows, cols] == 0, small)
+
+
+def _dilation_margins(height, alpha_threshold, max_radius):
+    """(reach, halo) in pixels for bounded dilation, or None when it is unbounded.
+
+    A texel's result only depends on opaque texels within 2V + R (V = total column
+    jump length, R = radius): candidates must lie within R, and a closer rival can only
+    displace one at a pixel at most V rows away. A window with R + V + 1 pixels of
+    context around the affected area therefore reproduces the full-frame result there.
+    """
+    if not max_radius:
+        return None
+    reach = sum(_jump_steps(height, max_radius))
+    return 2 * reach + max_radius, max_radius + reach + 1
+
+
+def _update_dilation(straight, output, grid, alpha_threshold, max_radius):
+    height, width = straight.shape[:2]
+    margins = _dilation_margins(height, alpha_threshold, max_radius)
+    if margins is None:
+        output[...] = dilate(straight, alpha_threshold, max_radius)
+        return
+    affect, halo = margins
+    for left, top, right, bottom in grid_boxes(grow_grid(grid, math.ceil(affect / TILE)), height, width):
+        wl, wt = max(0, left - halo), max(0, top - halo)
+        wr, wb = min(width, right + halo), min(height, bottom + halo)
+        window = dilate(straight[wt:wb, wl:wr], alpha_threshold, max_radius)
+        output[top:bottom, left:right] = window[top - wt:bottom - wt, left - wl:right - wl]
+
+
+def _array_names(sizes, mip_flood_settings, dilation):
+    names = ["straight"]
+    if mip_flood_settings is not None or dilation is not None:
+        names.append("output")
+    if dilation is None and mip_flood_settings is not None:
+        names += _MipState.names(sizes)
+    return names
+
+
+def _load_state(cache, settings_key):
+    try:
+        with open(os.path.join(cache, "state.json"), "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("settings") == settings_key else None
+
+
+def _write_state(cache, state):
+    tmp_path = os.path.join(cache, "state.json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, os.path.join(cache, "state.json"))
+
+
+def _png_identity(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def export_png_incremental(compositor, placements, path, mip_flood_settings=None, dilation=None, dirty_boxes=(), cache_dir=None,
+                           png_preset=DEFAULT_PNG_PRESET, mip_chain=None):
+    """write_atlas_png's in-memory export, reusing the previous export of path kept in a sidecar cache.
+
+    Dirty tiles are the union of dirty_boxes (e.g. tracked by the canvas) and of a diff
+    of the placements against the ones recorded in the cache, so edits made elsewhere
+    are picked up too. Only those tiles are recomposited; padding is redone on the mip
+    tiles above them (mip flood) or in windows around them (bounded dilation), so the
+    PNG is identical to a full export. mip_chain, if set, rewrites the filtered mip
+    PNGs (mip_export.write_mip_pngs) from the result whenever the PNG is. Returns {"mode": "full"|"incremental"|"unchanged",
+    "dirty_tiles": n, "tiles": n}.
+    """
+    height, width = compositor.height, compositor.width
+    cache = cache_dir or sidecar_dir(path)
+    os.makedirs(cache, exist_ok=True)
+    settings_key = _settings_key(compositor, mip_flood_settings, dilation)
+    records = [(placement_fingerprint(p), compositor.bounds(p)) for p in placements]
+    sizes = level_sizes(height, width, mip_flood_settings[1]) if mip_flood_settings is not None else [(height, width)]
+    names = _array_names(sizes, mip_flood_settings, dilation)
+    state = _load_state(cache, settings_key)
+    grid = tile_grid(height, width)
+    stats = {"tiles": int(grid.size)}
+
+    if state is not None:
+        try:
+            arrays = {name: np.load(os.path.join(cache, name + ".npy"), mmap_mode="r+") for name in names}
+        except (OSError, ValueError):
+            state = None
+    if state is None:
+        # Full export; the buffers are created in the cache and kept for the next one
+        stats.update(mode="full", dirty_tiles=int(grid.size))
+        arrays = {}
+        for name in names:
+            shape, dtype = _array_layout(name, sizes)
+            arrays[name] = np.lib.format.open_memmap(os.path.join(cache, name + ".npy"), "w+", dtype, shape)
+        grid[...] = True
+    else:
+        mark_boxes(grid, diff_bounds([tuple(r) for r in state["placements"]], records))
+        mark_boxes(grid, dirty_boxes)
+        stats.update(mode="incremental", dirty_tiles=int(grid.sum()))
+        if (not grid.any() and _png_identity(path) == state.get("png") and state.get("preset") == repr(png_preset)
+                and state.get("mips") == repr(mip_chain)):
+            stats["mode"] = "unchanged"
+            return stats
+        os.remove(os.path.join(cache, "state.json"))  # buffers are about to change
+
+    straight = arrays["straight"]
+    boxes = grid_boxes(grid, height, width)
+    for (left, top, right, bottom), region in zip(boxes, compositor.composite_regions(placements, boxes)):
+        straight[top:bottom, left:right] = region
+    output = arrays.get("output", straight)
+    if dilation is not None:
+        _update_dilation(straight, output, grid, *dilation)
+    elif mip_flood_settings is not None:
+        mip_state = _MipState(sizes, ([None] + [arrays[f"raw_{k}"] for k in range(1, len(sizes))],
+                                      [None] + [arrays[f"mask_{k}"] for k in range(1, len(sizes))],
+                                      [None] + [arrays[f"flooded_{k}"] for k in range(1, len(sizes))]))
+        if len(sizes) == 1:
+            output[...] = straight
+        else:
+            mip_state.update(straight, mip_flood_settings[0], grid, output)
+
+    write_png(path, output, png_preset)
+    if mip_chain is not None:
+        write_mip_pngs(output, height, width, path, mip_chain, png_preset)
+    for array in arrays.values():
+        array.flush()
+    _write_state(cache, {"settings": settings_key, "placements": [[fp, b] for fp, b in records], "png": _png_identity(path),
+                         "preset": repr(png_preset), "mips": repr(mip_chain)})
+    return stats
+
+
+def _array_layout(name, sizes):
+    if name in ("straight", "output"):
+        return sizes[0] + (4,), np.uint8
+    kind, level = name.rsplit("_", 1)
+    h, w = sizes[int(level)]
+    return ((h, w), np.uint8) if kind == "mask" else ((h, w, 3), np.float32)
@@ -0,0 +1,172 @@
+import math
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from core.filter_tables import KERNELS
+from core.mip_flood import level_sizes
+from core.png_writer import DEFAULT_PNG_PRESET, PngStreamWriter
+
+BAND_ROWS = 16  # rows of a smaller level produced per pass
+COLUMN_BLOCK = 32  # columns of a smaller level per horizontal matrix product
+LEVEL_PLANES = 5  # float32 planes in every row of a level: straight color (3), coverage, alpha
+_MIN_COVERAGE = 1e-3  # below this the coverage-weighted color is noise; the plain filtered color is used
+
+
+@dataclass(frozen=True)
+class MipFilter:
+    kernel: str  # "box", "lanczos" or "kaiser" (filter_tables.KERNELS)
+    radius: float  # kernel reach in texels of the smaller level
+    param: Optional[float] = None  # Kaiser beta
+
+
+def mip_filter(resample_mode, kaiser_beta=3.0, kaiser_radius=2):
+    """The mip reduction filter matching a project's resampler: Kaiser, Lanczos-3, or a 2x2 box for nearest."""
+    if resample_mode == "kaiser":
+        return MipFilter("kaiser", int(kaiser_radius), float(kaiser_beta))
+    if resample_mode == "nearest":
+        return MipFilter("box", 0.5)
+    return MipFilter("lanczos", 3)
+
+
+def mip_paths(path, count):
+    """File names of mip levels 1..count next to path: atlas.png -> atlas_mip1.png, ..."""
+    stem, ext = os.path.splitext(path)
+    return [f"{stem}_mip{level}{ext}" for level in range(1, count + 1)]
+
+
+def reduction_table(mip_filter, src_len, tgt_len):
+    """Tap indices (tgt_len, taps) into the source axis and normalized weights of a src_len -> tgt_len reduction.
+
+    The kernel is stretched by the reduction factor (unlike the resampler's tables,
+    which are made for enlarging crops), so every source texel is filtered, not sampled.
+    Out-of-range taps repeat the edge texel; tap columns that are zero everywhere are dropped.
+    """
+    scale = src_len / tgt_len
+    centers = (np.arange(tgt_len) + 0.5) * scale - 0.5
+    reach = int(math.floor(mip_filter.radius * scale))
+    taps = np.floor(centers[:, None]) + np.arange(-reach, reach + 2)
+    weights = KERNELS[mip_filter.kernel]((centers[:, None] - taps) / scale, mip_filter.radius, mip_filter.param)
+    used = np.any(weights != 0, axis=0)
+    taps, weights = taps[:, used], weights[:, used]
+    total = weights.sum(axis=1, keepdims=True)
+    weights = np.divide(weights, total, out=np.zeros_like(weights), where=total != 0)
+    return np.clip(taps, 0, src_len - 1).astype(np.intp), weights.astype(np.float32)
+
+
+def _rows(store, top, bottom):
+    """Rows [top, bottom) of an array or a RowFile."""
+    return store.rows(top, bottom) if hasattr(store, "rows") else store[top:bottom]
+
+
+def _planes(band, alpha_threshold):
+    """(8, rows, w) float32 planes of a level band: color * coverage (3), coverage, color (3), alpha.
+
+    band is (rows, w, 4) uint8 RGBA of the atlas when alpha_threshold is set (coverage
+    = alpha above it, like mip flood), otherwise a (rows, 5, w) float32 level band.
+    """
+    if alpha_threshold is not None:
+        out = np.empty((8,) + band.shape[:2], dtype=np.float32)
+        for c in range(3):
+            np.multiply(band[..., c], 1 / 255.0, out=out[4 + c], dtype=np.float32)
+        np.greater(band[..., 3], alpha_threshold, out=out[3])
+        np.multiply(band[..., 3], 1 / 255.0, out=out[7], dtype=np.float32)
+    else:
+        out = np.empty((8, band.shape[0], band.shape[2]), dtype=np.float32)
+        out[3:] = band[:, [3, 0, 1, 2, 4]].transpose(1, 0, 2)
+    np.multiply(out[4:7], out[3], out=out[:3])
+    return out
+
+
+def _band_matrix(taps, weights, top, bottom):
+    """(first source position, dense (bottom - top, span) weights) of output texels [top, bottom)."""
+    taps, weights = taps[top:bottom], weights[top:bottom]
+    first = int(taps.min())
+    matrix = np.zeros((bottom - top, int(taps.max()) + 1 - first), dtype=np.float32)
+    np.add.at(matrix, (np.arange(bottom - top)[:, None], taps - first), weights)  # clipped edge taps add up
+    return first, matrix
+
+
+def reduce_level(src, src_shape, out, mip_filter, alpha_threshold=None, band_rows=BAND_ROWS):
+    """Fill the (h2, 5, w2) float32 level out from the level above it in one separable pass.
+
+    Color is filtered premultiplied by coverage and divided back, so transparent padding
+    never bleeds into covered texels; where almost nothing is covered the plain filtered
+    color is used instead, carrying the padding down. Coverage and alpha are filtered
+    plainly and carried as fractions. src and out may be arrays or RowFiles; src is the
+    uint8 RGBA atlas when alpha_threshold is set, otherwise a level made by this function.
+
+    Both passes are matrix products with small banded weight matrices (a band of output
+    rows, a block of output columns), which BLAS runs far faster than a loop over taps.
+    """
+    src_h, src_w = src_shape
+    out_h, out_w = out.shape[0], out.shape[2]
+    row_taps, row_weights = reduction_table(mip_filter, src_h, out_h)
+    col_blocks = [(left, min(out_w, left + COLUMN_BLOCK)) for left in range(0, out_w, COLUMN_BLOCK)]
+    col_taps, col_weights = reduction_table(mip_filter, src_w, out_w)
+    col_matrices = [_band_matrix(col_taps, col_weights, left, right) for left, right in col_blocks]
+    for top in range(0, out_h, band_rows):
+        bottom = min(out_h, top + band_rows)
+        first, matrix = _band_matrix(row_taps, row_weights, top, bottom)
+        columns = matrix @ _planes(_rows(src, first, first + matrix.shape[1]), alpha_threshold)
+        filtered = np.empty((8, bottom - top, out_w), dtype=np.float32)
+        for (left, right), (first, matrix) in zip(col_blocks, col_matrices):
+            np.matmul(columns[..., first:first + matrix.shape[1]], matrix.T, out=filtered[..., left:right])
+        covered = filtered[3] > _MIN_COVERAGE
+        np.divide(filtered[:3], filtered[3], out=filtered[:3], where=covered)
+        np.copyto(filtered[:3], filtered[4:7], where=~covered)
+        filtered[4] = filtered[7]
+        np.clip(filtered[:5], 0.0, 1.0, out=filtered[:5])
+        _rows(out, top, bottom)[...] = filtered[:5].transpose(1, 0, 2)
+
+
+def to_rgba8(level):
+    """(rows, w, 4) uint8 RGBA texels of a (rows, 5, w) float32 level band (coverage dropped)."""
+    planes = np.rint(level[:, [0, 1, 2, 4]] * 255.0)
+    return planes.transpose(0, 2, 1).astype(np.uint8)
+
+
+def reduced_levels(atlas, height, width, mip_chain, make_buffer):
+    """Yield (level number, float32 level buffer) below the atlas, each built from the one before."""
+    alpha_threshold, levels, chain_filter = mip_chain
+    sizes = level_sizes(height, width, levels)
+    src, src_shape, threshold = atlas, (height, width), alpha_threshold
+    for level, (h, w) in enumerate(sizes[1:], 1):
+        out = make_buffer((h, LEVEL_PLANES, w), np.float32)
+        reduce_level(src, src_shape, out, chain_filter, threshold)
+        yield level, out
+        src, src_shape, threshold = out, (h, w), None
+
+
+def mip_levels(rgba, mip_chain):
+    """uint8 RGBA mip levels of an in-memory (h, w, 4) atlas below full size.
+
+    mip_chain is (alpha_threshold, levels, MipFilter); levels <= 0 goes down to 1x1.
+    """
+    height, width = rgba.shape[:2]
+    if width == 0 or height == 0:
+        return []
+    make_buffer = lambda shape, dtype: np.empty(shape, dtype=dtype)
+    return [to_rgba8(level) for _, level in reduced_levels(rgba, height, width, mip_chain, make_buffer)]
+
+
+def write_mip_pngs(atlas, height, width, path, mip_chain, png_preset=DEFAULT_PNG_PRESET, make_buffer=None):
+    """Write the mip levels of an atlas (array or RowFile) as <name>_mip<k>.png next to path; returns their paths.
+
+    Only two levels are alive at a time; make_buffer(shape, dtype) allocates them
+    (RowFiles in the tiled export), and each PNG is encoded band by band.
+    """
+    if width == 0 or height == 0:
+        return []
+    make_buffer = make_buffer or (lambda shape, dtype: np.empty(shape, dtype=dtype))
+    written = []
+    for level, buffer in reduced_levels(atlas, height, width, mip_chain, make_buffer):
+        h, w = buffer.shape[0], buffer.shape[2]
+        level_path = mip_paths(path, level)[-1]
+        with PngStreamWriter(level_path, w, h, png_preset, 0) as writer:
+            for top in range(0, h, BAND_ROWS):
+                writer.write_rows(to_rgba8(_rows(buffer, top, min(h, top + BAND_ROWS))))
+        written.append(level_path)
+    return written
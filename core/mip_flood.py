@@ -0,0 +1,115 @@
+import math
+
+import numpy as np
+
+BAND_ROWS = 128  # rows of a smaller level produced per pass
+
+
+def level_sizes(height, width, levels=4):
+    """(h, w) of every mip flood level, full size first, as mip_flood builds them."""
+    if levels is None or levels <= 0:
+        levels = int(math.ceil(math.log2(max(width, height)))) if max(width, height) > 0 else 1
+    sizes = [(height, width)]
+    for _ in range(levels):
+        h2, w2 = (sizes[-1][0] + 1) // 2, (sizes[-1][1] + 1) // 2
+        sizes.append((h2, w2))
+        if h2 == 1 and w2 == 1:
+            break
+    return sizes
+
+
+def _quadrant(arr, dy, dx, h2, w2):
+    """arr[dy::2, dx::2] as an (h2, w2) block; odd edges repeat the last row/column."""
+    block = arr[dy::2, dx::2]
+    if block.shape[:2] == (h2, w2):
+        return block
+    rows = np.minimum(np.arange(h2) * 2 + dy, arr.shape[0] - 1)
+    cols = np.minimum(np.arange(w2) * 2 + dx, arr.shape[1] - 1)
+    return arr[rows[:, None], cols[None, :]]
+
+
+def downsample_level(color, mask, out_color, out_mask, unit=False):
+    """Fill out_color/out_mask with the coverage-weighted 2x2 mean of color and the OR of mask.
+
+    color is float32, or uint8 with unit=True (scaled by 1/255 on the fly, so the
+    full-size level is never converted as a whole). out_color must start zeroed.
+    Quadrants are summed top-left, top-right, bottom-left, bottom-right, the order
+    numpy's reshape(...).sum(axis=(1, 3)) uses, so every level matches it bit for bit.
+    """
+    h2, w2 = out_mask.shape
+    for top in range(0, h2, BAND_ROWS):
+        bottom = min(h2, top + BAND_ROWS)
+        rows = bottom - top
+        color_band = color[2 * top:2 * bottom]
+        mask_band = mask[2 * top:2 * bottom]
+        summed = out_color[top:bottom]
+        coverage = np.zeros((rows, w2), dtype=np.uint8)
+        for dy in (0, 1):
+            for dx in (0, 1):
+                block_mask = _quadrant(mask_band, dy, dx, rows, w2)
+                block = _quadrant(color_band, dy, dx, rows, w2).astype(np.float32)
+                if unit:
+                    block /= 255.0
+                block *= block_mask[..., None]
+                summed += block
+                coverage += block_mask
+        covered = coverage > 0
+        np.divide(summed, coverage[..., None].astype(np.float32), out=summed, where=covered[..., None])
+        out_mask[top:bottom] = covered
+
+
+def flood_into(big, fill, small):
+    """Copy small, upsampled 2x nearest, into big wherever fill is set, one quadrant at a time."""
+    for dy in (0, 1):
+        for dx in (0, 1):
+            target = big[dy::2, dx::2]
+            h, w = target.shape[:2]
+            where = fill[dy::2, dx::2]
+            np.copyto(target, small[:h, :w], where=where[..., None] if target.ndim == 3 else where)
+
+
+def to_pixels(color):
+    """float32 colors in [0, 1] as packed RGBA8888 pixels (alpha 0) the way mip_flood writes them.
+
+    (c * 255) is clipped and truncated, and each pixel is one uint32 so flooding the
+    full-size level moves whole pixels instead of three strided bytes.
+    """
+    out = np.zeros(color.shape[:2] + (4,), dtype=np.uint8)
+    for top in range(0, color.shape[0], BAND_ROWS):
+        band = color[top:top + BAND_ROWS] * 255.0
+        np.clip(band, 0, 255, out=band)
+        out[top:top + BAND_ROWS, :, :3] = band
+    return out.view(np.uint32)[..., 0]
+
+
+def mip_flood(rgba, alpha_threshold=1, levels=4):
+    """Fill color outside the alpha mask from coverage-weighted mips; alpha is left untouched.
+
+    rgba is an (h, w, 4) uint8 straight-alpha array; returns a new array. levels <= 0
+    (or None) builds mips all the way down to 1x1. The full-size level stays uint8 and
+    smaller levels are float32 buffers, built in row bands and flooded in place
+    without materializing upsampled copies.
+    """
+    h, w = rgba.shape[:2]
+    if w == 0 or h == 0:
+        return rgba.copy()
+
+    keep = (rgba[..., 3] > alpha_threshold).view(np.uint8)
+    colors, masks = [rgba[..., :3]], [keep]
+    for h2, w2 in level_sizes(h, w, levels)[1:]:
+        color_ds = np.zeros((h2, w2, 3), dtype=np.float32)
+        mask_ds = np.empty((h2, w2), dtype=np.uint8)
+        downsample_level(colors[-1], masks[-1], color_ds, mask_ds, unit=len(colors) == 1)
+        colors.append(color_ds)
+        masks.append(mask_ds)
+
+    # Flood from smallest to largest
+    for i in range(len(colors) - 2, 0, -1):
+        flood_into(colors[i], masks[i] == 0, colors[i + 1])
+
+    # Kept pixels survive the trip through float32 unchanged: (c / 255) * 255 truncates back to c
+    out = np.ascontiguousarray(rgba).copy()
+    if len(colors) > 1:
+        flood_into(out.view(np.uint32)[..., 0], keep == 0, to_pixels(colors[1]))
+        out[..., 3] = rgba[..., 3]
+    return out
@@ -0,0 +1,190 @@
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from core.coverage import aligned_bounds
+from core.triangulate import triangulate_polygon
+
+WELD_TOLERANCE = 0.01  # atlas pixels; vertices closer than this on both axes are welded
+OBJ_WRITE_BUFFER = 1 << 20  # bytes buffered by write_obj between mask blocks and the file
+
+
+@dataclass(frozen=True)
+class MeshMask:
+    """One placed mask for OBJ export: source mask outline plus the atlas position of its fragment."""
+    points: Tuple[Tuple[float, float], ...]
+    real_width: float
+    original_width: float
+    x: float = 0.0
+    y: float = 0.0
+    mask_id: Optional[int] = None
+    original_path: str = ""
+
+
+def sorted_masks(masks):
+    """Masks in export order (mask_id, original path, position), so exports are deterministic."""
+    return sorted(masks, key=lambda m: (m.mask_id or 0, m.original_path or "", m.x, m.y))
+
+
+def atlas_outline(mask, density):
+    """(n, 2) float64 outline of a placed mask in atlas pixels (top-left origin, +Y down), or None if it is skipped."""
+    if not mask.points or not mask.real_width or not mask.original_width:
+        return None
+    left, top, width, height = aligned_bounds(mask.points)
+    if width <= 0 or height <= 0:
+        return None
+    scale = (density * mask.real_width) / mask.original_width
+    points = np.asarray(mask.points, dtype=np.float64)
+    return np.column_stack(((points[:, 0] - left) * scale + mask.x, (points[:, 1] - top) * scale + mask.y))
+
+
+def weld_points(points, tolerance):
+    """Vertex number of every point, counted in order of first appearance; a point within tolerance of an earlier one (on both axes) reuses its number.
+
+    Points are hashed into tolerance-sized grid cells, so only the 3x3 cells around a
+    point can hold its match and welding stays linear in the number of points.
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    xs, ys = pts[:, 0].tolist(), pts[:, 1].tolist()
+    cells = np.floor(pts / tolerance).astype(np.int64).tolist()
+    grid = {}
+    numbers = np.empty(len(pts), dtype=np.intp)
+    count = 0
+    for i, (cx, cy) in enumerate(cells):
+        x, y = xs[i], ys[i]
+        match = None
+        for key in ((cx, cy), (cx - 1, cy - 1), (cx - 1, cy), (cx - 1, cy + 1), (cx, cy - 1), (cx, cy + 1),
+                    (cx + 1, cy - 1), (cx + 1, cy), (cx + 1, cy + 1)):
+            for j in grid.get(key, ()):
+                if abs(xs[j] - x) <= tolerance and abs(ys[j] - y) <= tolerance:
+                    match = j
+                    break
+            if match is not None:
+                break
+        if match is None:
+            grid.setdefault((cx, cy), []).append(i)
+            numbers[i] = count
+            count += 1
+        else:
+            numbers[i] = numbers[match]
+    return numbers
+
+
+def _faces(outline, numbers, triangulate):
+    """(faces, corners) of one mask: zero-based vertex numbers, with a list of corner counts for n-gons and corners 3 for triangles.
+
+    Corners merged by welding are dropped, and faces left with fewer than three go.
+    """
+    if triangulate:
+        triangles = numbers[triangulate_polygon(outline)]
+        keep = (triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) & (triangles[:, 2] != triangles[:, 0])
+        return triangles[keep], 3
+    ring = numbers[numbers != np.roll(numbers, 1)] if len(numbers) > 1 else numbers
+    return (ring[None], [len(ring)]) if len(ring) >= 3 or len(numbers) < 3 else (ring[:0, None], [])
+
+
+def _face_lines(faces, corners):
+    """"f" lines of faces; every corner is "<n>/<n>" (one-based) since v and vt share numbers."""
+    if not len(faces):
+        return ""
+    if corners == 3:
+        return ("f %d/%d %d/%d %d/%d\n" * len(faces)) % tuple(np.repeat(faces + 1, 2, axis=1).ravel().tolist())
+    return "".join("f" + " %d/%d" * count % tuple(np.repeat(face + 1, 2).tolist()) + "\n" for face, count in zip(faces, corners))
+
+
+def obj_error(masks, atlas_width, atlas_height):
+    """Why masks cannot be exported as an OBJ, or None."""
+    if not masks:
+        return "No items on atlas to export."
+    if atlas_width <= 0 or atlas_height <= 0:
+        return "Invalid atlas size."
+    return None
+
+
+def obj_blocks(masks, atlas_width, atlas_height, density, triangulate=False, weld=False, merged=False):
+    """Yield the OBJ text in pieces: the header, then one block of o/v/vt/f lines per mask.
+
+    Each mask is one n-gon face unless triangulate ear-clips it (concave masks too).
+    weld shares vertices that coincide within WELD_TOLERANCE atlas pixels, also between
+    masks, and merged writes every face into a single "atlas" object. A block's vertex
+    and UV lines are formatted in one go from numpy columns, not line by line.
+    Check obj_error first.
+    """
+    masks = sorted_masks(masks)
+
+    yield "\n".join((
+        "# Texture Atlas Editor OBJ export",
+        f"# atlas_size {int(atlas_width)}x{int(atlas_height)}",
+        f"# atlas_density_px_per_m {density}",
+        "# coordinate system: origin at atlas top-left, exported with +Y up (Blender-friendly)",
+    )) + "\n"
+
+    outlines, names = [], []
+    for idx, mask in enumerate(masks, start=1):
+        outline = atlas_outline(mask, density)
+        if outline is None:
+            continue
+        # Reversed: flipping Y to +Y up below would otherwise turn the faces around
+        outlines.append(outline[::-1])
+        names.append(f"mask_{mask.mask_id or idx}")
+    if not outlines:
+        return
+
+    # Positions and UVs both derive from the atlas point, so one number serves as v and vt index
+    points = np.concatenate(outlines)
+    numbers = weld_points(points, WELD_TOLERANCE) if weld else np.arange(len(points))
+    firsts = np.unique(numbers, return_index=True)[1] if weld else numbers
+    if merged:
+        yield "o atlas\n"
+
+    written = 0
+    start = 0
+    for outline, name in zip(outlines, names):
+        mask_numbers = numbers[start:start + len(outline)]
+        start += len(outline)
+        # Vertices first used by this mask; numbering by first appearance makes them the next ones
+        new = points[firsts[written:int(mask_numbers.max()) + 1]]
+        written += len(new)
+
+        block = [] if merged else [f"o {name}\n"]
+        columns = np.empty((len(new), 2), dtype=np.float64)
+        # Vertex positions in meters, +Y up, Z=0
+        np.divide(new[:, 0], density, out=columns[:, 0])
+        np.divide(atlas_height - new[:, 1], density, out=columns[:, 1])
+        block.append(("v %.6f %.6f 0.000000\n" * len(new)) % tuple(columns.ravel().tolist()))
+        # UVs normalized to atlas size, V flipped to bottom-left origin (Blender-friendly)
+        np.divide(new[:, 0], atlas_width, out=columns[:, 0])
+        np.subtract(1.0, new[:, 1] / atlas_height, out=columns[:, 1])
+        block.append(("vt %.6f %.6f\n" * len(new)) % tuple(columns.ravel().tolist()))
+        block.append(_face_lines(*_faces(outline, mask_numbers, triangulate)))
+        yield "".join(block)
+
+
+def generate_obj(masks, atlas_width, atlas_height, density, triangulate=False, weld=False, merged=False):
+    """OBJ text with one object per mask (see obj_blocks); returns (text, None) or (None, error)."""
+    masks = list(masks)
+    err = obj_error(masks, atlas_width, atlas_height)
+    if err:
+        return None, err
+    return "".join(obj_blocks(masks, atlas_width, atlas_height, density, triangulate, weld, merged)), None
+
+
+def write_obj(path, masks, atlas_width, atlas_height, density, triangulate=False, weld=False, merged=False):
+    """Stream the OBJ of masks into path (or a text file object) block by block; returns an error string or None.
+
+    Only one mask's block is held as text at a time, and nothing is opened when the
+    masks cannot be exported.
+    """
+    masks = list(masks)
+    err = obj_error(masks, atlas_width, atlas_height)
+    if err:
+        return err
+    blocks = obj_blocks(masks, atlas_width, atlas_height, density, triangulate, weld, merged)
+    if isinstance(path, (str, os.PathLike)):
+        with open(path, "w", encoding="utf-8", buffering=OBJ_WRITE_BUFFER) as f:
+            f.writelines(blocks)
+    else:
+        path.writelines(blocks)
+    return None
@@ -0,0 +1,180 @@
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+from core.disk_cache import resample_cache_key
+from core.image_cache import draft_scale, shared_decode_cache
+from core.resample import resample_box, resample_crop, scaled_box
+from core.source_pyramid import resample_from_levels, shared_pyramid_cache
+
+
+@dataclass(frozen=True)
+class ResampleJob:
+    image_path: str
+    rect: Tuple[int, int, int, int]  # left, top, width, height in source pixels
+    target_size: Tuple[int, int]
+    mode: str = "lanczos"
+    beta: float = 3.0
+    radius: int = 2
+    use_pyramid: bool = False
+
+    def cache_key(self):
+        return resample_cache_key(self.image_path, self.rect, self.target_size, self.mode, self.beta, self.radius, self.use_pyramid)
+
+
+def run_job(job, decode_cache=None):
+    """Resample one crop in the current process; returns an (h, w, 4) uint8 array."""
+    if job.use_pyramid and job.mode != "nearest":
+        levels = shared_pyramid_cache().levels(job.image_path)
+        resized = resample_from_levels(levels, job.rect, job.target_size, job.mode, job.beta, job.radius)
+    else:
+        # Heavy downscales of JPEG sources decode at 1/2..1/8 size in the DCT domain
+        scale = draft_scale(job.rect[2:], job.target_size) if job.mode != "nearest" else 1
+        source, factor = (decode_cache or shared_decode_cache()).get_draft(job.image_path, scale)
+        if factor == 1:
+            resized = resample_crop(source, job.rect, job.target_size, job.mode, job.beta, job.radius)
+        else:
+            resized = resample_box(source, scaled_box(job.rect, factor), job.target_size, job.mode, job.beta, job.radius)
+    return np.asarray(resized)
+
+
+def resolve_worker_count(workers):
+    """0/None means one worker per CPU."""
+    try:
+        workers = int(workers or 0)
+    except (TypeError, ValueError):
+        workers = 0
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(1, workers)
+
+
+def _init_worker(decode_budget_bytes):
+    # Every worker keeps its own decoded sources, so split the budget between them
+    shared_decode_cache().set_budget(decode_budget_bytes)
+
+
+def _run_batch(jobs):
+    results = []
+    for job in jobs:
+        try:
+            results.append(run_job(job))
+        except Exception:
+            results.append(None)
+    return results
+
+
+def _batches_by_source(jobs, batch_size):
+    """Group job indices by source path so each task decodes its source once."""
+    groups = OrderedDict()
+    for index, job in enumerate(jobs):
+        groups.setdefault(job.image_path, []).append(index)
+    batches = []
+    for indices in groups.values():
+        for start in range(0, len(indices), batch_size):
+            batches.append(indices[start:start + batch_size])
+    return batches
+
+
+class ParallelResampler:
+    """Farms crop-and-resample jobs out to a process pool.
+
+    Results are delivered through on_result(index, array) in the calling thread, so
+    the caller can turn them into Qt objects there. should_cancel() is polled between
+    results and doubles as the caller's event pump.
+    """
+
+    def __init__(self, workers=0, batch_size=4, poll_interval=0.05):
+        self.workers = resolve_worker_count(workers)
+        self.batch_size = max(1, int(batch_size))
+        self.poll_interval = poll_interval
+        self._pool = None
+
+    def set_workers(self, workers):
+        workers = resolve_worker_count(workers)
+        if workers != self.workers:
+            self.shutdown()
+            self.workers = workers
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            budget = shared_decode_cache().budget_bytes // self.workers
+            # spawn: never fork a process that may be running Qt threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(budget,),
+            )
+        return self._pool
+
+    def run(self, jobs, on_result, should_cancel=None):
+        """Resample all jobs; returns False if should_cancel() stopped the run early."""
+        jobs = list(jobs)
+        if self.workers <= 1 or len(jobs) <= 1:
+            return self._run_serial(jobs, on_result, should_cancel)
+
+        pool = self._ensure_pool()
+        pending = {}
+        for indices in _batches_by_source(jobs, self.batch_size):
+            future = pool.submit(_run_batch, [jobs[i] for i in indices])
+            pending[future] = indices
+
+        cancelled = False
+        try:
+            while pending:
+                done, _ = wait(list(pending), timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    indices = pending.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception:
+                        # Worker died or the pool broke: redo this batch in-process
+                        self._discard_broken_pool()
+                        results = _run_batch([jobs[i] for i in indices])
+                    for index, arr in zip(indices, results):
+                        on_result(index, arr)
+                if should_cancel and should_cancel():
+                    cancelled = True
+                    break
+        finally:
+            # Queued batches are dropped; batches already running finish but are ignored
+            for future in pending:
+                future.cancel()
+        return not cancelled
+
+    def _run_serial(self, jobs, on_result, should_cancel):
+        for index, job in enumerate(jobs):
+            if should_cancel and should_cancel():
+                return False
+            try:
+                arr = run_job(job)
+            except Exception:
+                arr = None
+            on_result(index, arr)
+        return True
+
+    def _discard_broken_pool(self):
+        if self._pool is not None and getattr(self._pool, "_broken", False):
+            self.shutdown()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def resample_all(jobs, workers=0):
+    """Convenience wrapper: resample jobs in parallel and return arrays in job order."""
+    results = [None] * len(jobs)
+    resampler = ParallelResampler(workers)
+    try:
+        resampler.run(jobs, lambda index, arr: results.__setitem__(index, arr))
+    finally:
+        resampler.shutdown()
+    return results
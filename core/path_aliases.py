@@ -0,0 +1,50 @@
+import json
+import os
+from pathlib import Path
+
+
+def default_alias_file():
+    return os.path.join(str(Path.home()), ".texture_processor_aliases.json")
+
+
+def load_aliases(path=None):
+    """{stored_prefix: local_prefix} from the alias file; an empty dict if it is missing or broken."""
+    path = path or default_alias_file()
+    try:
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+    except Exception:
+        pass
+    return {}
+
+
+def save_aliases(aliases, path=None):
+    try:
+        with open(path or default_alias_file(), 'w') as f:
+            json.dump(aliases, f, indent=2)
+    except Exception:
+        pass
+
+
+def resolve_path(path_str, aliases):
+    """Expand env vars, then swap the longest matching stored prefix for its local one.
+
+    An existing candidate wins at once; otherwise the last rewritten path is returned.
+    """
+    if not path_str:
+        return path_str
+    path_str = os.path.expandvars(path_str)
+    if os.path.exists(path_str):
+        return path_str
+    best = path_str
+    prefixes = sorted(aliases.keys(), key=lambda p: len(p), reverse=True)
+    for src in prefixes:
+        if path_str.startswith(src):
+            candidate = path_str.replace(src, aliases[src], 1)
+            if os.path.exists(candidate):
+                return candidate
+            best = candidate
+    return best
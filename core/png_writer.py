@@ -0,0 +1,246 @@
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from core.parallel_resample import resolve_worker_count
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+IDAT_BYTES = 1 << 20  # compressed bytes per IDAT chunk
+BAND_BYTES = 1 << 20  # filtered bytes deflated as one unit (and one thread task)
+BAND_WORKING_BYTES = 24 * BAND_BYTES  # peak temporaries of one band task (adaptive filtering)
+WINDOW = 32768  # deflate history; each band is primed with this much of the data before it
+_ADLER_BASE = 65521
+FILTERS = ("none", "sub", "up", "average", "paeth")  # PNG filter types 0-4
+
+
+@dataclass(frozen=True)
+class PngPreset:
+    level: int  # zlib compression level
+    filter: str  # one of FILTERS, or "adaptive" (cheapest filter per row)
+    strategies: tuple = (zlib.Z_FILTERED,)  # zlib strategies tried on every band; the shortest output is kept
+
+
+# Z_FILTERED is libpng's choice for filtered rows; Z_RLE is as fast as level 1 and often
+# smaller on grainy photo fragments, but misses repeated content that LZ matches find
+PNG_PRESETS = {
+    "fast": PngPreset(1, "up", (zlib.Z_RLE,)),
+    "balanced": PngPreset(6, "adaptive"),
+    "smallest": PngPreset(9, "adaptive", (zlib.Z_FILTERED, zlib.Z_RLE)),
+}
+DEFAULT_PNG_PRESET = "balanced"
+
+
+def png_preset(preset):
+    """A PngPreset from a preset name (unknown names fall back to the default) or a PngPreset."""
+    if isinstance(preset, PngPreset):
+        return preset
+    return PNG_PRESETS.get(preset, PNG_PRESETS[DEFAULT_PNG_PRESET])
+
+
+def _chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(data, zlib.crc32(tag)) & 0xFFFFFFFF)
+
+
+def adler32_combine(adler1, adler2, length2):
+    """Adler-32 of A + B from adler32(A), adler32(B) and len(B), as zlib's adler32_combine."""
+    rem = length2 % _ADLER_BASE
+    sum1 = adler1 & 0xFFFF
+    sum2 = (rem * sum1) % _ADLER_BASE
+    sum1 += (adler2 & 0xFFFF) + _ADLER_BASE - 1
+    sum2 += (adler1 >> 16) + (adler2 >> 16) + _ADLER_BASE - rem
+    return (sum1 % _ADLER_BASE) | ((sum2 % _ADLER_BASE) << 16)
+
+
+def _zlib_header(level):
+    cmf = 0x78  # deflate, 32K window
+    flevel = 0 if level < 2 else 1 if level < 6 else 2 if level == 6 else 3
+    flg = flevel << 6
+    flg += 31 - ((cmf << 8) + flg) % 31
+    return bytes((cmf, flg))
+
+
+def _predictions(rows, above, kind, bpp=4):
+    """Predictor of every byte of rows for one PNG filter type, as int16 (None for 'none')."""
+    if kind == "none":
+        return None
+    left = np.zeros(rows.shape, dtype=np.int16)
+    left[:, bpp:] = rows[:, :-bpp]
+    if kind == "sub":
+        return left
+    up = np.empty(rows.shape, dtype=np.int16)
+    up[:1] = above
+    up[1:] = rows[:-1]
+    if kind == "up":
+        return up
+    if kind == "average":
+        left += up
+        left >>= 1
+        return left
+    upper_left = np.zeros(rows.shape, dtype=np.int16)
+    upper_left[:, bpp:] = up[:, :-bpp]
+    # Paeth: whichever of left, up, upper-left is closest to left + up - upper-left (ties in that order)
+    pa = np.abs(up - upper_left)
+    pb = np.abs(left - upper_left)
+    pc = np.abs(left + up - 2 * upper_left)
+    prediction = np.where(pb <= pc, up, upper_left)
+    return np.where((pa <= pb) & (pa <= pc), left, prediction)
+
+
+def filter_rows(rows, above, method):
+    """PNG-filtered scanlines (filter byte + bytes) of (n, stride) uint8 rows below the row `above`.
+
+    method is one of FILTERS, or "adaptive": per row, the filter with the smallest sum of
+    absolute signed differences (libpng's heuristic).
+    """
+    out = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+    methods = FILTERS if method == "adaptive" else (method,)
+    best_cost = None
+    for kind in methods:
+        prediction = _predictions(rows, above, kind)
+        filtered = rows if prediction is None else (rows - prediction).astype(np.uint8)
+        if len(methods) == 1:
+            out[:, 0] = FILTERS.index(kind)
+            out[:, 1:] = filtered
+            return out
+        cost = np.minimum(filtered, np.negative(filtered)).sum(axis=1, dtype=np.uint32)
+        better = slice(None) if best_cost is None else cost < best_cost
+        best_cost = cost if best_cost is None else np.minimum(cost, best_cost)
+        out[better, 0] = FILTERS.index(kind)
+        out[better, 1:] = filtered[better]
+    return out
+
+
+def _deflate_band(rows, context_rows, above, preset, final):
+    """Filter and raw-deflate rows[context_rows:] primed with the filtered context rows before them.
+
+    Returns (compressed bytes, adler32 of the filtered band, its length); the stream is
+    byte-aligned (sync flush) unless final, so bands concatenate into one deflate stream.
+    """
+    filtered = filter_rows(rows, above, preset.filter)
+    context = filtered[:context_rows].reshape(-1)[-WINDOW:]
+    band = filtered[context_rows:]
+    primed = {"zdict": context.tobytes()} if len(context) else {}
+    data = None
+    for strategy in preset.strategies:
+        compressor = zlib.compressobj(preset.level, zlib.DEFLATED, -15, 9, strategy, **primed)
+        candidate = compressor.compress(band.data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        if data is None or len(candidate) < len(data):
+            data = candidate
+    return data, zlib.adler32(band.data), band.nbytes
+
+
+class PngStreamWriter:
+    """Writes an 8-bit RGBA PNG from row bands, so the full image never has to be in memory.
+
+    Rows are filtered and deflated in bands of about BAND_BYTES, each primed with the
+    32 KB of filtered data before it; with workers > 1 the bands are compressed in
+    threads (zlib and numpy release the GIL) and joined into one zlib stream. The file
+    is the same for any number of workers and however the rows are split into
+    write_rows calls. path may be a binary file object instead of a file name. Use as
+    a context manager or call close().
+    """
+
+    def __init__(self, path, width, height, preset=DEFAULT_PNG_PRESET, workers=1):
+        workers = resolve_worker_count(workers)  # 0 = one thread per CPU
+        self.width, self.height = int(width), int(height)
+        self.preset = png_preset(preset)
+        self.rows_written = 0
+        self._stride = self.width * 4
+        self._context_rows = -(-WINDOW // (self._stride + 1)) if self._stride else 0
+        self._carry = np.zeros((0, self._stride), dtype=np.uint8)
+        self._carry_top = 0  # image row of self._carry[0]
+        self._compressed = 0  # rows deflated so far
+        self._adler = 1
+        self._pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        self._owns_file = isinstance(path, (str, os.PathLike))
+        self._file = open(path, "wb") if self._owns_file else path  # or a binary file object, left open
+        self._closed = False
+        self._pending = []
+        self._pending_bytes = 0
+        self._file.write(PNG_SIGNATURE)
+        self._file.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 6, 0, 0, 0)))
+        self._emit(_zlib_header(self.preset.level))
+
+    def write_rows(self, rgba):
+        """Append an (rows, width, 4) uint8 band below the rows written so far."""
+        rgba = np.ascontiguousarray(rgba, dtype=np.uint8)
+        rows = rgba.reshape(rgba.shape[0], self._stride)
+        if self.rows_written + len(rows) > self.height:
+            raise ValueError("more rows than the PNG height")
+        if not len(rows):
+            return
+        # Carried rows: the last compressed ones (one filters the next row, the rest prime
+        # deflate) and any not yet compressed, so bands always start at multiples of step
+        self.rows_written += len(rows)
+        rows = np.concatenate([self._carry, rows]) if len(self._carry) else rows
+        base = self._carry_top
+        step = max(1, BAND_BYTES // max(1, self._stride + 1))
+        jobs = []
+        while self._compressed < self.height:
+            bottom = min(self._compressed + step, self.height)
+            if bottom > self.rows_written:
+                break
+            top = self._compressed - base
+            first = max(0, top - self._context_rows)
+            above = rows[first - 1] if first > 0 else np.zeros(self._stride, dtype=np.uint8)
+            jobs.append((rows[first:bottom - base], top - first, above, self.preset, bottom == self.height))
+            self._compressed = bottom
+        if self._pool is None:
+            results = [_deflate_band(*job) for job in jobs]
+        else:
+            results = self._pool.map(_deflate_band, *zip(*jobs))
+        for data, adler, length in results:
+            self._adler = adler32_combine(self._adler, adler, length)
+            self._emit(data)
+        keep = max(0, self._compressed - base - self._context_rows - 1)
+        self._carry = rows[keep:].copy()
+        self._carry_top = base + keep
+
+    def _emit(self, data, flush=False):
+        if data:
+            self._pending.append(data)
+            self._pending_bytes += len(data)
+        if self._pending_bytes >= IDAT_BYTES or (flush and self._pending_bytes):
+            self._file.write(_chunk(b"IDAT", b"".join(self._pending)))
+            self._pending = []
+            self._pending_bytes = 0
+
+    def _shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+        self._closed = True
+        if self._owns_file:
+            self._file.close()
+
+    def close(self):
+        if self._closed:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"PNG expects {self.height} rows, got {self.rows_written}")
+            if not self.height:
+                self._emit(zlib.compress(b"", self.preset.level)[2:-4])  # empty final block
+            self._emit(struct.pack(">I", self._adler), flush=True)
+            self._file.write(_chunk(b"IEND", b""))
+        finally:
+            self._shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._shutdown()
+
+
+def write_png(path, rgba, preset=DEFAULT_PNG_PRESET, workers=0):
+    """Save an (h, w, 4) uint8 array as an RGBA PNG with a preset, compressing bands in `workers` threads (0 = per CPU)."""
+    height, width = rgba.shape[:2]
+    with PngStreamWriter(path, width, height, preset, workers) as writer:
+        writer.write_rows(rgba)
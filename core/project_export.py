@@ -0,0 +1,264 @@
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+from core import export_manifest
+from core.compositor import AtlasCompositor, FragmentPlacement
+from core.dds_export import DEFAULT_DDS_FORMAT, write_dds
+from core.dilation import dilate
+from core.glb_export import build_glb_mesh, write_glb
+from core.incremental_export import export_png_incremental
+from core.mip_export import mip_filter, mip_levels, mip_paths, write_mip_pngs
+from core.mip_flood import level_sizes, mip_flood
+from core.obj_export import MeshMask, obj_error, write_obj
+from core.png_writer import DEFAULT_PNG_PRESET, write_png
+from core.path_aliases import resolve_path
+from core.project_store import normalize_loaded_project, upgrade_legacy_masks
+from core.tiled_export import DEFAULT_EXPORT_BUDGET, export_dds_tiled, export_png_tiled, needs_tiling
+
+ALPHA_THRESHOLD = 1  # CanvasWidget.mip_flood_threshold
+RESAMPLE_MODES = ("lanczos", "kaiser", "nearest")
+
+
+def load_project_file(path):
+    """Project JSON as MainWindow.load_project sees it: normalized settings, legacy masks upgraded."""
+    with open(path, 'r') as f:
+        return upgrade_legacy_masks(normalize_loaded_project(json.load(f)))
+
+
+def write_atlas_png(compositor, placements, path, budget_bytes, mip_flood_settings=None, dilation=None, incremental=False,
+                    dirty_boxes=(), png_preset=DEFAULT_PNG_PRESET, mip_chain=None):
+    """Composite placements, optionally pad them and save a PNG; tiled when the frame exceeds budget_bytes.
+
+    mip_flood_settings is None or (alpha_threshold, levels), dilation is None or
+    (alpha_threshold, max_radius) and takes precedence. With incremental, in-memory
+    exports go through export_png_incremental (sidecar cache next to path, only the
+    tiles under changed placements and dirty_boxes are redone). png_preset names the
+    encoder settings (PNG_PRESETS); rows are compressed in parallel threads. mip_chain
+    is None or (alpha_threshold, levels, MipFilter): the padded atlas's filtered mip
+    levels are also saved as <name>_mip<k>.png.
+    """
+    if needs_tiling(compositor.width, compositor.height, budget_bytes):
+        # Large atlases are composited, padded and encoded in bands through temporary files
+        export_png_tiled(compositor, placements, path, budget_bytes, mip_flood_settings, png_preset, dilation=dilation,
+                         mip_chain=mip_chain)
+        return
+    if incremental:
+        export_png_incremental(compositor, placements, path, mip_flood_settings, dilation, dirty_boxes, png_preset=png_preset,
+                               mip_chain=mip_chain)
+        return
+    atlas = padded_atlas(compositor, placements, mip_flood_settings, dilation)
+    write_png(path, atlas, png_preset)
+    if mip_chain is not None:
+        write_mip_pngs(atlas, atlas.shape[0], atlas.shape[1], path, mip_chain, png_preset)
+
+
+def padded_atlas(compositor, placements, mip_flood_settings=None, dilation=None):
+    """The composited straight-alpha atlas in memory with optional padding (color only, alpha untouched)."""
+    atlas = compositor.composite(placements)
+    if dilation is not None:
+        atlas = dilate(atlas, *dilation)
+    elif mip_flood_settings is not None:
+        atlas = mip_flood(atlas, *mip_flood_settings)
+    return atlas
+
+
+def write_atlas_dds(compositor, placements, path, dds_format=DEFAULT_DDS_FORMAT, mip_flood_settings=None, dilation=None, mips=True,
+                    mip_chain=None, budget_bytes=DEFAULT_EXPORT_BUDGET):
+    """Composite placements, optionally pad them and save a block-compressed DDS (with its mip chain if mips).
+
+    With mip_chain (see write_atlas_png) the DDS holds those filtered levels instead of
+    the box-filtered full chain. Like the PNG path, atlases beyond budget_bytes are
+    composited, padded and encoded in bands through temporary files (export_dds_tiled),
+    with the same bytes as the in-memory export.
+    """
+    threshold = (dilation or mip_flood_settings or (ALPHA_THRESHOLD,))[0]
+    if needs_tiling(compositor.width, compositor.height, budget_bytes):
+        export_dds_tiled(compositor, placements, path, budget_bytes, dds_format, mip_flood_settings, dilation, mips, mip_chain,
+                         threshold)
+        return
+    atlas = padded_atlas(compositor, placements, mip_flood_settings, dilation)
+    levels = mip_levels(atlas, mip_chain) if mips and mip_chain is not None else None
+    write_dds(path, atlas, dds_format, mips, threshold, levels=levels)
+
+
+def padding_settings(project_data):
+    """(mip_flood, dilation) arguments for write_atlas_png from the project's export toggles."""
+    flood = dilation = None
+    if project_data.get('dilate', False):
+        dilation = (ALPHA_THRESHOLD, int(project_data.get('dilate_radius', 0)))
+    elif project_data.get('mip_flood', False):
+        levels = 0 if project_data.get('mip_flood_auto', True) else int(project_data.get('mip_flood_levels', 6))
+        flood = (ALPHA_THRESHOLD, levels)
+    return flood, dilation
+
+
+def mip_chain_settings(project_data):
+    """mip_chain argument of the atlas writers from the project's mip export toggle, or None.
+
+    The reduction filter follows the project's resampler (resample_mode, kaiser_beta,
+    kaiser_radius); mip_export_levels <= 0 goes down to 1x1.
+    """
+    if not project_data.get('mip_export', False):
+        return None
+    chain_filter = mip_filter(project_data.get('resample_mode', 'lanczos'), project_data.get('kaiser_beta', 3.0),
+                              int(project_data.get('kaiser_radius', 2)))
+    return ALPHA_THRESHOLD, int(project_data.get('mip_export_levels', 0)), chain_filter
+
+
+def obj_mesh_settings(project_data):
+    """(triangulate, weld, merged) OBJ options of a project, in generate_obj's argument order."""
+    return (bool(project_data.get('obj_triangulate', False)), bool(project_data.get('obj_weld', False)),
+            bool(project_data.get('merge_meshes', False)))
+
+
+def project_layout(project_data, aliases=None):
+    """(placements, meshes, missing) of a loaded project, laid out the way MainWindow.load_project builds the canvas.
+
+    Masks are stacked in texture/mask order, positioned from `items` (unplaced ones stay
+    at the origin) and snapped to whole pixels in nearest mode. Masks whose source file
+    does not exist (after alias resolution) are left out and their paths returned in missing.
+    """
+    aliases = aliases or {}
+    positions = {(entry.get('filepath'), entry.get('mask_id')): (entry.get('x', 0), entry.get('y', 0))
+                 for entry in project_data.get('items', [])}
+    snap = project_data.get('resample_mode', 'lanczos') == 'nearest'
+    placements, meshes, missing = [], [], []
+    for orig_path, data in project_data.get('textures', {}).items():
+        resolved_path = resolve_path(orig_path, aliases)
+        file_for_io = resolved_path if resolved_path and os.path.exists(resolved_path) else orig_path
+        masks = [m for m in data.get('masks') or [] if m.get('points')]
+        if masks and not os.path.exists(file_for_io):
+            missing.append(orig_path)
+            continue
+        for m in masks:
+            x, y = positions.get((orig_path, m.get('id')), (0, 0))
+            if snap:
+                x, y = round(x), round(y)
+            points = tuple((float(px), float(py)) for px, py in m['points'])
+            placements.append(FragmentPlacement(file_for_io, points, m.get('real_width'), m.get('original_width'), x, y))
+            meshes.append(MeshMask(points, m.get('real_width'), m.get('original_width'), x, y, m.get('id'), orig_path))
+    return placements, meshes, missing
+
+
+def project_compositor(project_data, disk_cache=None):
+    """AtlasCompositor with the project's atlas size, density and resample settings."""
+    mode = project_data.get('resample_mode', 'lanczos')
+    return AtlasCompositor(
+        int(project_data.get('atlas_size', 2048)),
+        float(project_data.get('atlas_density', 512.0)),
+        mode if mode in RESAMPLE_MODES else 'lanczos',
+        project_data.get('kaiser_beta', 3.0),
+        int(project_data.get('kaiser_radius', 2)),
+        bool(project_data.get('source_pyramid', False)),
+        disk_cache=disk_cache,
+    )
+
+
+@dataclass
+class ExportReport:
+    project: str
+    fragments: int = 0
+    missing: List[str] = field(default_factory=list)
+    cached: List[str] = field(default_factory=list)  # outputs skipped because their manifest matched ('png', 'obj', ...)
+    timings: Dict[str, float] = field(default_factory=dict)  # step -> seconds, in run order
+
+    @property
+    def total(self):
+        return sum(self.timings.values())
+
+
+def export_project(project_path, png_path=None, obj_path=None, aliases=None, disk_cache=None, budget_bytes=None,
+                   incremental=False, force=False, png_preset=None, dds_path=None, dds_format=None, glb_path=None):
+    """Export a project JSON to PNG, DDS, OBJ and/or GLB without any Qt objects; returns an ExportReport.
+
+    budget_bytes, png_preset and dds_format override the project's export_budget_mb,
+    png_preset and dds_format; incremental (or the project's incremental_export)
+    reuses the PNG's sidecar cache; the project's merge_meshes makes the GLB and OBJ one
+    mesh, obj_triangulate and obj_weld triangulate and weld the OBJ. An output whose manifest
+    (<output>.manifest.json) holds the hash of the current inputs is left alone and
+    listed in report.cached, unless force. Errors (unreadable project, failed writes)
+    propagate; missing sources are only reported.
+    """
+    report = ExportReport(project_path)
+    start = time.perf_counter()
+    project_data = load_project_file(project_path)
+    placements, meshes, report.missing = project_layout(project_data, aliases)
+    report.fragments = len(placements)
+    report.timings['load'] = time.perf_counter() - start
+
+    if budget_bytes is None:
+        budget_bytes = int(project_data.get('export_budget_mb', 1024)) * 1024 * 1024
+
+    if png_path:
+        start = time.perf_counter()
+        flood, dilation = padding_settings(project_data)
+        compositor = project_compositor(project_data, disk_cache)
+        png_preset = png_preset or project_data.get('png_preset', DEFAULT_PNG_PRESET)
+        mip_chain = mip_chain_settings(project_data)
+        inputs = export_manifest.atlas_inputs_hash(compositor, placements, flood, dilation, ('png', png_preset, mip_chain))
+        level_count = len(level_sizes(compositor.height, compositor.width, mip_chain[1])) - 1 if mip_chain else 0
+        if (not force and export_manifest.is_current(png_path, inputs)
+                and all(os.path.exists(p) for p in mip_paths(png_path, level_count))):
+            report.cached.append('png')
+        else:
+            export_manifest.invalidate(png_path)
+            incremental = incremental or bool(project_data.get('incremental_export', False))
+            write_atlas_png(compositor, placements, png_path, budget_bytes, flood, dilation, incremental, png_preset=png_preset,
+                            mip_chain=mip_chain)
+            export_manifest.record(png_path, inputs)
+        report.timings['png'] = time.perf_counter() - start
+
+    if dds_path:
+        start = time.perf_counter()
+        flood, dilation = padding_settings(project_data)
+        compositor = project_compositor(project_data, disk_cache)
+        dds_format = dds_format or project_data.get('dds_format', DEFAULT_DDS_FORMAT)
+        mips = bool(project_data.get('dds_mips', True))
+        mip_chain = mip_chain_settings(project_data) if mips else None
+        inputs = export_manifest.atlas_inputs_hash(compositor, placements, flood, dilation, ('dds', dds_format, mips, mip_chain))
+        if not force and export_manifest.is_current(dds_path, inputs):
+            report.cached.append('dds')
+        else:
+            export_manifest.invalidate(dds_path)
+            write_atlas_dds(compositor, placements, dds_path, dds_format, flood, dilation, mips, mip_chain, budget_bytes)
+            export_manifest.record(dds_path, inputs)
+        report.timings['dds'] = time.perf_counter() - start
+
+    if obj_path:
+        start = time.perf_counter()
+        size = int(project_data.get('atlas_size', 2048))
+        density = float(project_data.get('atlas_density', 512.0))
+        options = obj_mesh_settings(project_data)
+        inputs = export_manifest.mesh_inputs_hash(meshes, size, size, density, ('obj',) + options)
+        if not force and export_manifest.is_current(obj_path, inputs):
+            report.cached.append('obj')
+        else:
+            err = obj_error(meshes, size, size)
+            if err:
+                raise ValueError(err)
+            export_manifest.invalidate(obj_path)
+            write_obj(obj_path, meshes, size, size, density, *options)
+            export_manifest.record(obj_path, inputs)
+        report.timings['obj'] = time.perf_counter() - start
+
+    if glb_path:
+        start = time.perf_counter()
+        size = int(project_data.get('atlas_size', 2048))
+        density = float(project_data.get('atlas_density', 512.0))
+        merged = bool(project_data.get('merge_meshes', False))
+        inputs = export_manifest.mesh_inputs_hash(meshes, size, size, density, ('glb', merged))
+        if not force and export_manifest.is_current(glb_path, inputs):
+            report.cached.append('glb')
+        else:
+            mesh, err = build_glb_mesh(meshes, size, size, density, merged)
+            if err:
+                raise ValueError(err)
+            export_manifest.invalidate(glb_path)
+            write_glb(glb_path, mesh)
+            export_manifest.record(glb_path, inputs)
+        report.timings['glb'] = time.perf_counter() - start
+    return report
@@ -1,5 +1,7 @@
 from copy import deepcopy
 
+from core.dds_export import DDS_FORMATS, DEFAULT_DDS_FORMAT
+from core.png_writer import DEFAULT_PNG_PRESET, PNG_PRESETS
 from core.scale_reference import ScaleReference
 
 
@@ -22,6 +24,15 @@ def normalize_project_settings(data):
 
     out["atlas_density"] = _safe_float(out.get("atlas_density", 512.0), 512.0)
     out["atlas_size"] = _safe_int(out.get("atlas_size", 2048), 2048)
+    out["resample_workers"] = max(0, _safe_int(out.get("resample_workers", 0), 0))
+    out["export_budget_mb"] = max(64, _safe_int(out.get("export_budget_mb", 1024), 1024))
+    out["decode_cache_mb"] = max(0, _safe_int(out.get("decode_cache_mb", 1024), 1024))
+    out["dilate_radius"] = max(0, _safe_int(out.get("dilate_radius", 0), 0))
+    out["mip_export_levels"] = max(0, _safe_int(out.get("mip_export_levels", 0), 0))
+    if out.get("png_preset") not in PNG_PRESETS:
+        out["png_preset"] = DEFAULT_PNG_PRESET
+    if out.get("dds_format") not in DDS_FORMATS:
+        out["dds_format"] = DEFAULT_DDS_FORMAT
 
     raw_len = _safe_float(out.get("scale_reference_length", 1.0), 1.0)
     out["scale_reference_length"] = max(0.01, raw_len)
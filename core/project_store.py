@@ -19,3 +19,20 @@ def normalize_loaded_project(project_data):
     out.setdefault("textures", {})
     out.setdefault("items", [])
     return out
+
+
+def upgrade_legacy_masks(project_data):
+    """Turn pre-masks texture entries (points/real_width/original_width at top level) into a one-mask list, in place."""
+    textures = project_data.get("textures", {})
+    for tex_path, data in list(textures.items()):
+        if "masks" not in data:
+            textures[tex_path] = {
+                "px_per_meter": data.get("px_per_meter"),
+                "masks": [{
+                    "id": 1,
+                    "points": data.get("points"),
+                    "real_width": data.get("real_width"),
+                    "original_width": data.get("original_width"),
+                }],
+            }
+    return project_data
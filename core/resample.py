@@ -0,0 +1,92 @@
+import math
+
+import numpy as np
+from PIL import Image
+
+from core.filter_tables import filter_table
+
+
+def separable_resize_array(src, target_size, kernel, radius, param=None, box=None):
+    """Resize an (h, w, ch) array with a separable explicit kernel; returns float32.
+
+    Each pass is a sum over the (2 * radius + 1) taps, every tap applied to the
+    whole image at once, so the only Python loop is over the filter taps.
+    Tap tables come from the shared filter table cache. box = (x0, y0, x1, y1)
+    resamples only that (possibly fractional) source region, like PIL's box.
+    """
+    src_h, src_w, channels = src.shape
+    tgt_w, tgt_h = target_size
+    x0, y0, x1, y1 = box if box is not None else (0.0, 0.0, src_w, src_h)
+    idx_x, w_x = filter_table(kernel, src_w, tgt_w, radius, param, x0, x1 - x0)
+    idx_y, w_y = filter_table(kernel, src_h, tgt_h, radius, param, y0, y1 - y0)
+
+    # Vertical pass straight from the source rows: (src_h, src_w, ch) -> (tgt_h, src_w, ch)
+    tmp = np.zeros((tgt_h, src_w, channels), dtype=np.float32)
+    for t in range(idx_y.shape[1]):
+        tmp += src[idx_y[:, t]] * w_y[:, t, None, None]
+
+    # Horizontal pass on the transposed (now shorter) image so taps gather whole rows too
+    cols = np.ascontiguousarray(tmp.transpose(1, 0, 2))
+    out = np.zeros((tgt_w, tgt_h, channels), dtype=np.float32)
+    for t in range(idx_x.shape[1]):
+        out += cols[idx_x[:, t]] * w_x[:, t, None, None]
+    return out.transpose(1, 0, 2)
+
+
+def kaiser_resize(image: Image.Image, target_size, radius: int, beta: float, box=None) -> Image.Image:
+    """Resize using a separable Kaiser-windowed sinc filter.
+
+    The passes are separable, so running the vertical one first only changes
+    float rounding, never more than one uint8 step.
+    """
+    src = np.asarray(image)
+    if src.ndim == 2:
+        src = src[:, :, None]
+    src_h, src_w, channels = src.shape
+    tgt_w, tgt_h = target_size
+    if tgt_w <= 0 or tgt_h <= 0:
+        return image
+    if box is None and tgt_w == src_w and tgt_h == src_h:
+        return image
+
+    out = separable_resize_array(src, target_size, "kaiser", radius, beta, box)
+    out = np.clip(out, 0, 255).astype(np.uint8)
+    if channels == 1:
+        out = out[:, :, 0]
+    return Image.fromarray(out, mode=image.mode)
+
+
+def resample_crop(source: Image.Image, rect, target_size, mode, beta=3.0, radius=2) -> Image.Image:
+    """Crop rect (left, top, width, height) out of a decoded source and resize it with the given mode."""
+    left, top, width, height = rect
+    cropped = source.crop((left, top, left + width, top + height))
+    if mode == "kaiser":
+        return kaiser_resize(cropped, target_size, radius, beta)
+    if mode == "nearest":
+        return cropped.resize(target_size, Image.NEAREST)
+    return cropped.resize(target_size, Image.LANCZOS)
+
+
+def resample_box(image: Image.Image, box, target_size, mode, beta=3.0, radius=2) -> Image.Image:
+    """Resize the (possibly fractional) box (x0, y0, x1, y1) of image to target_size."""
+    if mode == "kaiser":
+        # Crop with a tap margin, then resample the fractional box inside it
+        margin = int(radius) + 1
+        ix0 = max(0, int(math.floor(box[0])) - margin)
+        iy0 = max(0, int(math.floor(box[1])) - margin)
+        ix1 = min(image.width, int(math.ceil(box[2])) + margin)
+        iy1 = min(image.height, int(math.ceil(box[3])) + margin)
+        cropped = image.crop((ix0, iy0, ix1, iy1))
+        local_box = (box[0] - ix0, box[1] - iy0, box[2] - ix0, box[3] - iy0)
+        return kaiser_resize(cropped, target_size, radius, beta, box=local_box)
+    if mode == "nearest":
+        return image.resize(target_size, Image.NEAREST, box=box)
+    return image.resize(target_size, Image.LANCZOS, box=box)
+
+
+def scaled_box(rect, factor):
+    """Map rect (left, top, width, height) in full-size pixels into an image reduced by factor."""
+    left, top, width, height = rect
+    factor = float(factor)
+    # Pixel i of the reduced image covers full-size pixels [i * factor, (i + 1) * factor)
+    return (left / factor, top / factor, (left + width) / factor, (top + height) / factor)
@@ -0,0 +1,105 @@
+import math
+import threading
+from collections import OrderedDict
+
+from core.image_cache import image_nbytes, shared_decode_cache, source_identity
+from core.resample import resample_box, scaled_box
+
+DEFAULT_PYRAMID_BUDGET_BYTES = 512 * 1024 * 1024
+MIN_LEVEL_SIZE = 16
+
+
+def build_levels(image, min_size=MIN_LEVEL_SIZE):
+    """Pre-filtered power-of-two levels 1..n of image (2x2 box reduce per level; level 0 not included)."""
+    levels = []
+    current = image
+    while min(current.width, current.height) // 2 >= min_size:
+        current = current.reduce(2)
+        levels.append(current)
+    return levels
+
+
+def select_level(rect_size, target_size, level_count):
+    """Smallest level whose crop is still at least the target size on both axes."""
+    rect_w, rect_h = rect_size
+    tgt_w, tgt_h = target_size
+    ratio = min(rect_w / max(1, tgt_w), rect_h / max(1, tgt_h))
+    if ratio < 2.0:
+        return 0
+    return max(0, min(level_count, int(math.floor(math.log2(ratio)))))
+
+
+def resample_from_levels(levels, rect, target_size, mode, beta=3.0, radius=2):
+    """Resample rect (left, top, width, height in level-0 pixels) from the best level.
+
+    levels[0] is the full-resolution source. The crop box is mapped into the level
+    with fractional coordinates, so no crop snapping is introduced.
+    """
+    level = select_level(rect[2:], target_size, len(levels) - 1)
+    return resample_box(levels[level], scaled_box(rect, 2 ** level), target_size, mode, beta, radius)
+
+
+class SourcePyramidCache:
+    """Byte-budgeted LRU of pyramid levels 1..n per source; level 0 lives in the decode cache."""
+
+    def __init__(self, budget_bytes=DEFAULT_PYRAMID_BUDGET_BYTES, decode_cache=None):
+        self.budget_bytes = max(0, int(budget_bytes))
+        self.decode_cache = decode_cache or shared_decode_cache()
+        self._entries = OrderedDict()  # identity -> (levels, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evicted_bytes = 0
+
+    def levels(self, path):
+        """[source, level1, level2, ...] for path; builds and caches the reduced levels on a miss."""
+        key = source_identity(path)
+        source = self.decode_cache.get(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return [source] + entry[0]
+            self.misses += 1
+
+        reduced = build_levels(source)
+        nbytes = sum(image_nbytes(level) for level in reduced)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                # Another thread built the same source meanwhile: keep its levels, count the bytes once
+                self._entries.move_to_end(key)
+                return [source] + entry[0]
+            if nbytes <= self.budget_bytes:
+                self._entries[key] = (reduced, nbytes)
+                self._bytes += nbytes
+                while self._bytes > self.budget_bytes and self._entries:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self._bytes -= evicted
+                    self.evicted_bytes += evicted
+        return [source] + reduced
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evicted_bytes": self.evicted_bytes,
+            }
+
+
+_shared_pyramids = SourcePyramidCache()
+
+
+def shared_pyramid_cache():
+    return _shared_pyramids
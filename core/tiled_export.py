@@ -0,0 +1,193 @@
+import contextlib
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core.compositor import unpremultiply
+from core.dds_export import CHUNK_BLOCKS, DEFAULT_DDS_FORMAT, box_level, dds_header, encode_level
+from core.dilation import dilate_rows
+from core.mip_export import reduced_levels, to_rgba8, write_mip_pngs
+from core.mip_flood import downsample_level, flood_into, level_sizes, to_pixels
+from core.parallel_resample import resolve_worker_count
+from core.png_writer import BAND_WORKING_BYTES, DEFAULT_PNG_PRESET, PngStreamWriter
+
+DEFAULT_EXPORT_BUDGET = 1024 * 1024 * 1024  # 1 GiB
+IN_MEMORY_BYTES_PER_PIXEL = 24  # peak of composite + mip_flood on a full frame
+BAND_BYTES_PER_PIXEL = 64  # working set per pixel of one band in any tiled pass
+
+
+def needs_tiling(width, height, budget_bytes=DEFAULT_EXPORT_BUDGET):
+    """True when a full-frame export of this size would not fit the memory budget."""
+    return width * height * IN_MEMORY_BYTES_PER_PIXEL > budget_bytes
+
+
+def band_rows(width, budget_bytes, bytes_per_pixel=BAND_BYTES_PER_PIXEL):
+    """Even number of rows per band so that one band stays within budget_bytes."""
+    rows = budget_bytes // max(1, width * bytes_per_pixel)
+    return max(2, int(rows) & ~1)
+
+
+class RowFile:
+    """A (height, width, channels) array in a file, accessed through short-lived memory-mapped row windows.
+
+    Unlike one big np.memmap, a window's pages leave the resident set as soon as it is
+    dropped, so peak memory follows the band size instead of the file size.
+    """
+
+    def __init__(self, directory, shape, dtype):
+        self.shape = tuple(int(v) for v in shape)
+        self.dtype = np.dtype(dtype)
+        self._row_bytes = int(np.prod(self.shape[1:])) * self.dtype.itemsize
+        fd, self.path = tempfile.mkstemp(dir=directory, suffix=".rows")
+        with os.fdopen(fd, "wb") as f:
+            f.truncate(self._row_bytes * self.shape[0])  # sparse, reads back as zeros
+
+    def rows(self, top, bottom):
+        """Writable view of rows [top, bottom)."""
+        return np.memmap(self.path, self.dtype, "r+", offset=top * self._row_bytes, shape=(bottom - top,) + self.shape[1:])
+
+    def bands(self, rows_per_band):
+        for top in range(0, self.shape[0], rows_per_band):
+            yield top, min(self.shape[0], top + rows_per_band)
+
+
+def tiled_mip_flood(atlas, alpha_threshold=1, levels=4, budget_bytes=DEFAULT_EXPORT_BUDGET, work_dir=None):
+    """mip_flood on a RowFile atlas in place, band by band; output is bit-identical to mip_flood.
+
+    Levels below full size are kept in RowFiles in work_dir and built with the same
+    per-level helpers as mip_flood; bands start on even rows so they map onto whole
+    rows of the next smaller level.
+    """
+    height, width = atlas.shape[:2]
+    if width == 0 or height == 0:
+        return
+    sizes = level_sizes(height, width, levels)
+    colors = [None] + [RowFile(work_dir, (h, w, 3), np.float32) for h, w in sizes[1:]]
+    masks = [None] + [RowFile(work_dir, (h, w), np.uint8) for h, w in sizes[1:]]
+
+    for level in range(1, len(sizes)):
+        src_h, src_w = sizes[level - 1]
+        for top, bottom in colors[level].bands(band_rows(src_w * 2, budget_bytes)):
+            src_top, src_bottom = 2 * top, min(src_h, 2 * bottom)
+            if level == 1:
+                rgba = atlas.rows(src_top, src_bottom)
+                color, mask = rgba[..., :3], (rgba[..., 3] > alpha_threshold).view(np.uint8)
+            else:
+                color, mask = colors[level - 1].rows(src_top, src_bottom), masks[level - 1].rows(src_top, src_bottom)
+            downsample_level(color, mask, colors[level].rows(top, bottom), masks[level].rows(top, bottom), unit=level == 1)
+
+    # Flood from smallest to largest; each level is final before the next one reads it
+    for level in range(len(sizes) - 2, -1, -1):
+        w = sizes[level][1]
+        small = colors[level + 1]
+        target = atlas if level == 0 else colors[level]
+        for top, bottom in target.bands(band_rows(w, budget_bytes)):
+            small_band = small.rows(top // 2, (bottom + 1) // 2)
+            if level == 0:
+                rgba = atlas.rows(top, bottom)
+                alpha = rgba[..., 3].copy()
+                flood_into(rgba.view(np.uint32)[..., 0], alpha <= alpha_threshold, to_pixels(small_band))
+                rgba[..., 3] = alpha
+            else:
+                flood_into(colors[level].rows(top, bottom), masks[level].rows(top, bottom) == 0, small_band)
+
+
+def _padded_row_file(compositor, placements, scratch, budget_bytes, mip_flood=None, dilation=None):
+    """The composited, unpremultiplied and padded atlas as a RowFile in scratch (see export_png_tiled)."""
+    width, height = compositor.width, compositor.height
+    atlas = RowFile(scratch, (height, width, 4), np.uint8)
+    compositor.composite_into(placements, atlas.rows)
+    rows = band_rows(width, budget_bytes)
+    for top, bottom in atlas.bands(rows):
+        band = atlas.rows(top, bottom)
+        band[...] = unpremultiply(band)
+        del band
+    if dilation is not None:
+        dilate_rows(atlas, height, width, dilation[0], dilation[1],
+                    make_buffer=lambda shape, dtype: RowFile(scratch, shape, dtype), band_rows=rows)
+    elif mip_flood is not None:
+        tiled_mip_flood(atlas, mip_flood[0], mip_flood[1], budget_bytes, scratch)
+    return atlas
+
+
+def export_png_tiled(compositor, placements, path, budget_bytes=DEFAULT_EXPORT_BUDGET, mip_flood=None, png_preset=DEFAULT_PNG_PRESET,
+                     work_dir=None, dilation=None, mip_chain=None):
+    """Composite, optionally pad and PNG-encode an atlas without holding it in memory.
+
+    mip_flood is None or (alpha_threshold, levels); dilation is None or
+    (alpha_threshold, max_radius) and takes precedence. mip_chain, if set, also writes
+    the filtered mip levels next to path (see mip_export.write_mip_pngs). The atlas,
+    flood levels, mip levels and dilation offset maps live in temporary files under
+    work_dir; memory stays around budget_bytes plus the largest single fragment.
+    """
+    width, height = compositor.width, compositor.height
+    with tempfile.TemporaryDirectory(prefix="atlas_export_", dir=work_dir) as scratch:
+        atlas = _padded_row_file(compositor, placements, scratch, budget_bytes, mip_flood, dilation)
+        rows = band_rows(width, budget_bytes)
+        # Compression threads are capped so their band temporaries stay well inside the budget
+        workers = min(resolve_worker_count(0), max(1, budget_bytes // (8 * BAND_WORKING_BYTES)))
+        with PngStreamWriter(path, width, height, png_preset, workers) as writer:
+            for top, bottom in atlas.bands(rows):
+                writer.write_rows(atlas.rows(top, bottom))
+        if mip_chain is not None:
+            write_mip_pngs(atlas, height, width, path, mip_chain, png_preset,
+                           make_buffer=lambda shape, dtype: RowFile(scratch, shape, dtype))
+
+
+def _block_rows(width, budget_bytes):
+    """Rows per band of a block-compressed level: a multiple of 4 (whole blocks) and of 2 (whole rows below)."""
+    return max(4, band_rows(width, budget_bytes) & ~3)
+
+
+def export_dds_tiled(compositor, placements, path, budget_bytes=DEFAULT_EXPORT_BUDGET, dds_format=DEFAULT_DDS_FORMAT,
+                     mip_flood=None, dilation=None, mips=True, mip_chain=None, alpha_threshold=1, work_dir=None):
+    """write_atlas_dds for atlases beyond the memory budget; the file is byte-identical to dds_export.write_dds.
+
+    The padded atlas and every level below it live in RowFiles under work_dir. Each
+    level is encoded in bands of whole 4x4 block rows and appended to path as soon as
+    it is compressed, so memory stays around budget_bytes. Levels come from
+    mip_export.reduced_levels with mip_chain, otherwise from dds_export.box_level run
+    band by band (bands start on even rows, so they read whole rows of the level above).
+    """
+    width, height = compositor.width, compositor.height
+    if width == 0 or height == 0:
+        raise ValueError("cannot write an empty DDS")
+    if not mips:
+        sizes = [(height, width)]
+    else:
+        sizes = level_sizes(height, width, mip_chain[1] if mip_chain is not None else 0)
+    # Encoder threads are capped like the PNG compressors: one chunk of blocks each, well inside the budget
+    workers = min(resolve_worker_count(0), max(1, budget_bytes // (8 * CHUNK_BLOCKS * 16 * BAND_BYTES_PER_PIXEL)))
+    with tempfile.TemporaryDirectory(prefix="atlas_export_", dir=work_dir) as scratch, open(path, "wb") as f, \
+            ThreadPoolExecutor(max_workers=workers) if workers > 1 else contextlib.nullcontext() as pool:
+        atlas = _padded_row_file(compositor, placements, scratch, budget_bytes, mip_flood, dilation)
+        f.write(dds_header(width, height, dds_format, len(sizes)))
+        for top, bottom in atlas.bands(_block_rows(width, budget_bytes)):
+            f.write(encode_level(atlas.rows(top, bottom), dds_format, pool))
+        if len(sizes) == 1:
+            return
+        if mip_chain is not None:
+            make_buffer = lambda shape, dtype: RowFile(scratch, shape, dtype)
+            for _, level in reduced_levels(atlas, height, width, mip_chain, make_buffer):
+                for top, bottom in level.bands(_block_rows(level.shape[2], budget_bytes)):
+                    f.write(encode_level(to_rgba8(level.rows(top, bottom)), dds_format, pool))
+            return
+        src = None  # (color, alpha, mask) RowFiles of the level above; None reads the atlas
+        for level, (h, w) in enumerate(sizes[1:], 1):
+            src_h = sizes[level - 1][0]
+            out = (RowFile(scratch, (h, w, 3), np.float32), RowFile(scratch, (h, w, 1), np.float32),
+                   RowFile(scratch, (h, w), np.uint8))
+            for top, bottom in out[0].bands(_block_rows(w * 2, budget_bytes)):
+                src_top, src_bottom = 2 * top, min(src_h, 2 * bottom)
+                if src is None:
+                    rgba = atlas.rows(src_top, src_bottom)
+                    color, alpha, mask = rgba[..., :3], rgba[..., 3:], (rgba[..., 3] > alpha_threshold).view(np.uint8)
+                else:
+                    color, alpha, mask = (store.rows(src_top, src_bottom) for store in src)
+                results = box_level(color, alpha, mask, unit=src is None)
+                for store, result in zip(out, results):
+                    store.rows(top, bottom)[...] = result
+                f.write(encode_level(results[3], dds_format, pool))
+            src = out
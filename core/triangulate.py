@@ -0,0 +1,125 @@
+import math
+
+import numpy as np
+
+
+def signed_area(points):
+    """Shoelace area of a closed polygon; positive when counter-clockwise in a +Y up frame."""
+    pts = np.asarray(points, dtype=np.float64)
+    if len(pts) < 3:
+        return 0.0
+    x, y = pts[:, 0], pts[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+class _ReflexGrid:
+    """Reflex vertices hashed into square cells, so an ear test only looks at the few near its triangle."""
+
+    def __init__(self, xs, ys, cell):
+        self.xs, self.ys = xs, ys
+        self.cell = cell
+        self.cells = {}
+        self.count = 0
+
+    def _key(self, v):
+        return math.floor(self.xs[v] / self.cell), math.floor(self.ys[v] / self.cell)
+
+    def add(self, v):
+        self.cells.setdefault(self._key(v), set()).add(v)
+        self.count += 1
+
+    def remove(self, v):
+        self.cells[self._key(v)].discard(v)
+        self.count -= 1
+
+    def near(self, x0, y0, x1, y1):
+        """Reflex vertices in the cells overlapping the box; every one of them once big boxes cover more cells than vertices."""
+        cx0, cy0 = math.floor(x0 / self.cell), math.floor(y0 / self.cell)
+        cx1, cy1 = math.floor(x1 / self.cell), math.floor(y1 / self.cell)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > self.count:
+            for members in self.cells.values():
+                yield from members
+            return
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                members = self.cells.get((cx, cy))
+                if members:
+                    yield from members
+
+
+def triangulate_polygon(points):
+    """(m, 3) indices into points of triangles covering a simple polygon, wound like the polygon.
+
+    Ear clipping: a convex vertex whose triangle holds no reflex vertex is cut off, so
+    concave outlines come out right. Reflex vertices sit in a hashed grid, so an ear test costs a few lookups instead of a scan, and the
+    vertices are plain floats because the loop is scalar. Collinear and repeated points
+    are dropped without a triangle; a self-intersecting outline still terminates
+    (remaining vertices are clipped in order once no proper ear is left).
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(pts)
+    area = signed_area(pts)
+    if n < 3 or area == 0:
+        return np.empty((0, 3), dtype=np.intp)
+    order = np.arange(n) if area > 0 else np.arange(n)[::-1]
+    ccw = pts[order]  # counter-clockwise from here on
+    xs, ys = ccw[:, 0].tolist(), ccw[:, 1].tolist()
+    nxt = list(range(1, n)) + [0]
+    prv = [n - 1] + list(range(n - 1))
+
+    def turn(a, b, c):
+        return (xs[b] - xs[a]) * (ys[c] - ys[b]) - (ys[b] - ys[a]) * (xs[c] - xs[b])
+
+    # About four vertices per cell over the bounding box: thin, spiky outlines have little
+    # area, and cells sized by it make the long late ears visit thousands of empty cells
+    grid = _ReflexGrid(xs, ys, 2.0 * math.sqrt(float(np.ptp(ccw[:, 0])) * float(np.ptp(ccw[:, 1])) / n))
+    reflex = [False] * n
+    for v in range(n):
+        if turn(prv[v], v, nxt[v]) < 0:
+            reflex[v] = True
+            grid.add(v)
+
+    def blocked(a, b, c):
+        ax, ay, bx, by, cx, cy = xs[a], ys[a], xs[b], ys[b], xs[c], ys[c]
+        for p in grid.near(min(ax, bx, cx), min(ay, by, cy), max(ax, bx, cx), max(ay, by, cy)):
+            if p == a or p == c:
+                continue
+            px, py = xs[p], ys[p]
+            # Repeats of a corner (bridges, pinches) never overlap the ear's interior
+            if (px == ax and py == ay) or (px == bx and py == by) or (px == cx and py == cy):
+                continue
+            if ((bx - ax) * (py - ay) - (by - ay) * (px - ax) >= 0 and (cx - bx) * (py - by) - (cy - by) * (px - bx) >= 0
+                    and (ax - cx) * (py - cy) - (ay - cy) * (px - cx) >= 0):
+                return True
+        return False
+
+    triangles = []
+    remaining, i, misses = n, 0, 0
+    while remaining > 3:
+        a, c = prv[i], nxt[i]
+        t = turn(a, i, c)
+        if t == 0 or misses > remaining:
+            ear = True
+        else:
+            ear = t > 0 and not blocked(a, i, c)
+        if not ear:
+            i, misses = c, misses + 1
+            continue
+        if t > 0:
+            triangles.append((a, i, c))
+        nxt[a], prv[c] = c, a
+        if reflex[i]:
+            reflex[i] = False
+            grid.remove(i)
+        remaining -= 1
+        for v in (a, c):
+            now = turn(prv[v], v, nxt[v]) < 0
+            if now != reflex[v]:
+                reflex[v] = now
+                grid.add(v) if now else grid.remove(v)
+        i, misses = c, 0
+    b, c = nxt[i], nxt[nxt[i]]
+    if turn(i, b, c) > 0:
+        triangles.append((i, b, c))
+    out = order[np.array(triangles, dtype=np.intp).reshape(-1, 3)]
+    return out if area > 0 else out[:, ::-1]
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from core.batch_export import batch_tasks, expand_projects, run_batch
+
+
+def write_project(path, source, x):
+    project = {
+        "textures": {source: {"masks": [{"id": 1, "points": [[0, 0], [10, 0], [10, 10]], "real_width": 1.0, "original_width": 10}]}},
+        "items": [{"filepath": source, "mask_id": 1, "x": x, "y": 0}],
+        "atlas_size": 64,
+        "atlas_density": 8.0,
+    }
+    with open(path, "w") as f:
+        json.dump(project, f)
+
+
+class BatchExportTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        source = os.path.join(self.tmp, "src.png")
+        Image.new("RGBA", (10, 10), (200, 100, 50, 255)).save(source)
+        for i in range(4):
+            write_project(os.path.join(self.tmp, f"level_{i}.json"), source, i)
+        with open(os.path.join(self.tmp, "level_broken.json"), "w") as f:
+            f.write("{")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_expand_keeps_order_and_unmatched_names(self):
+        pattern = os.path.join(self.tmp, "level_[0-9].json")
+        first = os.path.join(self.tmp, "level_2.json")
+        projects = expand_projects([first, pattern, "missing.json"])
+        self.assertEqual([os.path.basename(p) for p in projects],
+                         ["level_2.json", "level_0.json", "level_1.json", "level_3.json", "missing.json"])
+
+    def test_outputs_are_named_after_projects(self):
+        task, = batch_tasks([os.path.join(self.tmp, "level_0.json")], ("obj",), out_dir="build")
+        self.assertEqual(task.obj_path, os.path.join("build", "level_0.obj"))
+        self.assertIsNone(task.png_path)
+
+    def test_projects_sharing_a_stem_get_mirrored_folders(self):
+        source = os.path.join(self.tmp, "src.png")
+        projects = []
+        for folder in ("a", "b"):
+            os.makedirs(os.path.join(self.tmp, "levels", folder))
+            projects.append(os.path.join(self.tmp, "levels", folder, "atlas.json"))
+            write_project(projects[-1], source, 0)
+        out_dir = os.path.join(self.tmp, "build")
+        tasks = batch_tasks(projects, ("png", "obj"), out_dir=out_dir)
+        self.assertEqual([t.obj_path for t in tasks],
+                         [os.path.join(out_dir, "a", "atlas.obj"), os.path.join(out_dir, "b", "atlas.obj")])
+        with open(projects[0].replace(".json", ".txt"), "w") as f:
+            f.write("{}")
+        with self.assertRaises(ValueError):
+            batch_tasks([projects[0], projects[0].replace(".json", ".txt")], ("obj",), out_dir=out_dir)
+
+    def test_fail_fast_skips_the_rest_and_keep_going_does_not(self):
+        projects = expand_projects([os.path.join(self.tmp, "level_*.json")])
+        self.assertEqual(os.path.basename(projects[-1]), "level_broken.json")
+        projects.insert(0, projects.pop())
+        tasks = batch_tasks(projects, ("obj",))
+        statuses = [r.status for r in run_batch(tasks, workers=1)]
+        self.assertEqual(statuses, ["failed"] + ["skipped"] * 4)
+        statuses = [r.status for r in run_batch(tasks, workers=1, keep_going=True)]
+        self.assertEqual(statuses, ["failed"] + ["ok"] * 4)
+
+    def test_unchanged_projects_are_reported_cached(self):
+        projects = expand_projects([os.path.join(self.tmp, "level_[0-9].json")])
+        statuses = [r.status for r in run_batch(batch_tasks(projects), workers=1)]
+        self.assertEqual(statuses, ["ok"] * 4)
+        write_project(projects[1], os.path.join(self.tmp, "src.png"), 5)
+        statuses = [r.status for r in run_batch(batch_tasks(projects), workers=1)]
+        self.assertEqual(statuses, ["cached", "ok", "cached", "cached"])
+        statuses = [r.status for r in run_batch(batch_tasks(projects, force=True), workers=1)]
+        self.assertEqual(statuses, ["ok"] * 4)
+
+    def test_process_pool_exports_every_project(self):
+        projects = expand_projects([os.path.join(self.tmp, "level_[0-9].json")])
+        results = run_batch(batch_tasks(projects, ("obj",)), workers=2)
+        self.assertEqual([r.task.project for r in results], projects)
+        for i, result in enumerate(results):
+            self.assertEqual(result.status, "ok")
+            with open(result.task.obj_path) as f:
+                self.assertIn(f"v {i / 8.0:.6f} ", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+
+import numpy as np
+
+from core.compositor import (
+    AtlasCompositor,
+    FragmentPlacement,
+    blend_over,
+    fragment_geometry,
+    premultiply,
+    shift_subpixel,
+    unpremultiply,
+)
+from core.coverage import masked_fragment
+
+try:
+    from PySide6.QtCore import QRectF
+    from PySide6.QtGui import QImage, QPainter, QPixmap
+    from PySide6.QtWidgets import QApplication, QGraphicsScene
+except ImportError:  # the compositor itself never needs Qt
+    QApplication = None
+
+SQUARE = ((2.5, 1.0), (12.0, 1.0), (12.0, 9.5), (2.5, 9.5))
+
+
+def solid_crop(job):
+    width, height = job.target_size
+    crop = np.empty((height, width, 4), dtype=np.uint8)
+    crop[..., 0] = 200
+    crop[..., 1] = np.arange(width, dtype=np.uint8)[None, :]
+    crop[..., 2] = 30
+    crop[..., 3] = 255
+    return crop
+
+
+def translucent_crop(job):
+    width, height = job.target_size
+    return np.random.default_rng(width * 1000 + height).integers(0, 256, (height, width, 4), dtype=np.uint8)
+
+
+class GeometryTests(unittest.TestCase):
+    def test_target_size_follows_density(self):
+        bbox, scale, target = fragment_geometry(SQUARE, 2.0, 100.0, 256.0)
+        self.assertEqual(bbox, (2, 1, 10, 9))
+        self.assertAlmostEqual(scale, 5.12)
+        self.assertEqual(target, (51, 46))
+
+    def test_degenerate_mask_has_no_geometry(self):
+        self.assertIsNone(fragment_geometry(((1, 1), (5, 1), (9, 1)), 1.0, 1.0, 1.0))
+
+
+class BlendTests(unittest.TestCase):
+    def test_premultiply_round_trip_keeps_opaque_and_clear_pixels(self):
+        rgba = np.array([[[10, 20, 30, 255], [99, 98, 97, 0], [255, 128, 0, 128]]], dtype=np.uint8)
+        back = unpremultiply(premultiply(rgba))
+        np.testing.assert_array_equal(back[0, 0], rgba[0, 0])
+        np.testing.assert_array_equal(back[0, 1], [0, 0, 0, 0])
+        np.testing.assert_allclose(back[0, 2].astype(int), rgba[0, 2], atol=1)
+
+    def test_source_over_matches_float_reference(self):
+        rng = np.random.default_rng(3)
+        dst = premultiply(rng.integers(0, 256, (8, 8, 4), dtype=np.uint8))
+        src = premultiply(rng.integers(0, 256, (8, 8, 4), dtype=np.uint8))
+        expected = src + dst * (1 - src[..., 3:4] / 255.0)
+        blend_over(dst, src, 0, 0)
+        np.testing.assert_allclose(dst, expected, atol=1)
+
+    def test_blend_is_clipped_to_the_atlas(self):
+        dst = np.zeros((4, 4, 4), dtype=np.uint8)
+        src = np.full((3, 3, 4), 255, dtype=np.uint8)
+        blend_over(dst, src, -1, 2)
+        self.assertEqual(int(dst[..., 3].sum()) // 255, 4)
+        np.testing.assert_array_equal(dst[2:, :2, 3], 255)
+        blend_over(dst, src, 10, 10)  # entirely outside: no-op
+
+    def test_subpixel_shift_conserves_coverage(self):
+        src = premultiply(np.full((5, 7, 4), 255, dtype=np.uint8))
+        shifted = shift_subpixel(src, 0.25, 0.5)
+        self.assertEqual(shifted.shape, (6, 8, 4))
+        self.assertAlmostEqual(shifted[..., 3].sum() / 255.0, 35.0, delta=0.5)
+
+
+class CompositorTests(unittest.TestCase):
+    def test_integer_placement_reproduces_the_fragment(self):
+        compositor = AtlasCompositor(64, 256.0, fetch_crop=solid_crop)
+        placement = FragmentPlacement("src.png", SQUARE, 2.0, 100.0, 5.0, 7.0)
+        atlas = compositor.composite([placement])
+        job, geometry = compositor.job(placement)
+        fragment = masked_fragment(solid_crop(job), SQUARE, geometry[2])
+        h, w = fragment.shape[:2]
+        expected = unpremultiply(premultiply(fragment))
+        np.testing.assert_array_equal(atlas[7:7 + h, 5:5 + w], expected)
+        self.assertEqual(int(atlas[:7].max()), 0)
+
+    def test_later_placements_paint_on_top(self):
+        compositor = AtlasCompositor(64, 256.0, fetch_crop=solid_crop)
+        red = FragmentPlacement("a.png", SQUARE, 2.0, 100.0, 0.0, 0.0)
+        blue = FragmentPlacement("b.png", SQUARE, 2.0, 100.0, 20.0, 20.0)
+        atlas = compositor.composite([red, blue])
+        np.testing.assert_array_equal(atlas[30, 30], [200, 10, 30, 255])
+
+    def test_unreadable_sources_are_skipped(self):
+        def failing(job):
+            raise OSError("missing")
+
+        atlas = AtlasCompositor((16, 8), 256.0, fetch_crop=failing).composite([FragmentPlacement("x.png", SQUARE, 2.0, 100.0)])
+        self.assertEqual(atlas.shape, (8, 16, 4))
+        self.assertEqual(int(atlas.max()), 0)
+
+
+
+@unittest.skipIf(QApplication is None, "PySide6 is not installed")
+class SceneRenderTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(["test", "-platform", "offscreen"])
+
+    def test_integer_placements_match_the_scene_render_premultiplied(self):
+        size = 64
+        compositor = AtlasCompositor(size, 256.0, fetch_crop=translucent_crop)
+        placements = [
+            FragmentPlacement("a.png", SQUARE, 2.0, 100.0, 5, 7),
+            FragmentPlacement("b.png", ((0, 0), (20, 0), (10, 15)), 1.5, 20.0, 20, 15),
+            FragmentPlacement("c.png", SQUARE, 1.0, 100.0, 10, 10),
+        ]
+        atlas = np.zeros((size, size, 4), dtype=np.uint8)
+        compositor.composite_into(placements, lambda top, bottom: atlas[top:bottom])
+
+        # The canvas path: straight-alpha pixmaps stacked in a scene, rendered over transparency
+        scene = QGraphicsScene(0, 0, size, size)
+        for z, placement in enumerate(placements):
+            fragment = np.ascontiguousarray(compositor.fragment(placement))
+            h, w = fragment.shape[:2]
+            image = QImage(fragment.data, w, h, 4 * w, QImage.Format_RGBA8888).copy()
+            item = scene.addPixmap(QPixmap.fromImage(image))
+            item.setPos(placement.x, placement.y)
+            item.setZValue(z)
+        rendered = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+        rendered.fill(0)
+        painter = QPainter(rendered)
+        scene.render(painter, QRectF(0, 0, size, size), QRectF(0, 0, size, size))
+        painter.end()
+        rendered = rendered.convertToFormat(QImage.Format_RGBA8888_Premultiplied)
+        expected = np.frombuffer(rendered.constBits(), np.uint8).reshape(size, rendered.bytesPerLine() // 4, 4)[:, :size]
+
+        self.assertGreater(int((expected[..., 3] > 0).sum()), 1000)
+        self.assertTrue(((atlas[..., 3] > 0) & (atlas[..., 3] < 255)).any())
+        np.testing.assert_array_equal(atlas, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
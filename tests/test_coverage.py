@@ -0,0 +1,87 @@
+import unittest
+
+import numpy as np
+
+from core.coverage import CoverageCache, aligned_bounds, apply_coverage, fragment_coverage, polygon_coverage
+
+
+def shoelace(points):
+    pts = np.asarray(points, dtype=np.float64)
+    x, y = pts[:, 0], pts[:, 1]
+    return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+class PolygonCoverageTests(unittest.TestCase):
+    def test_fractional_vertical_edges_are_exact(self):
+        cov = polygon_coverage([(1.25, 1), (4.5, 1), (4.5, 3), (1.25, 3)], (6, 4))
+        expected = np.zeros((4, 6), dtype=np.float32)
+        expected[1:3] = [0, 0.75, 1, 1, 0.5, 0]
+        np.testing.assert_allclose(cov, expected, atol=1e-6)
+
+    def test_total_coverage_matches_polygon_area(self):
+        rng = np.random.default_rng(5)
+        for _ in range(5):
+            angles = np.sort(rng.uniform(0, 2 * np.pi, 12))
+            radii = rng.uniform(20, 45, 12)
+            points = np.c_[50 + radii * np.cos(angles), 50 + radii * np.sin(angles)]
+            cov = polygon_coverage(points, (100, 100))
+            self.assertAlmostEqual(cov.sum() / shoelace(points), 1.0, delta=2e-3)
+            self.assertGreaterEqual(cov.min(), 0.0)
+            self.assertLessEqual(cov.max(), 1.0)
+
+    def test_even_odd_leaves_pentagram_centre_empty(self):
+        star = [(50 + 40 * np.cos(a), 50 + 40 * np.sin(a)) for a in np.arange(5) * 4 * np.pi / 5]
+        cov = polygon_coverage(star, (100, 100))
+        self.assertEqual(cov[50, 50], 0.0)
+        self.assertEqual(cov[50, 85], 1.0)
+
+    def test_polygon_is_clipped_to_the_target(self):
+        cov = polygon_coverage([(-5, -5), (3, -5), (3, 3.5), (-5, 3.5)], (4, 4))
+        np.testing.assert_allclose(cov[:3, :3], 1.0)
+        np.testing.assert_allclose(cov[3, :3], 0.5)
+        np.testing.assert_allclose(cov[:, 3], 0.0)
+
+    def test_degenerate_input(self):
+        self.assertEqual(polygon_coverage([(0, 0), (1, 1)], (3, 2)).shape, (2, 3))
+        self.assertEqual(polygon_coverage([(0, 0), (5, 0), (5, 0)], (3, 2)).sum(), 0.0)
+
+
+class FragmentCoverageTests(unittest.TestCase):
+    def test_mask_bounds_map_onto_the_whole_target(self):
+        points = [(10.5, 20.0), (30.0, 20.0), (30.0, 40.0), (10.5, 40.0)]
+        self.assertEqual(aligned_bounds(points), (10, 20, 20, 20))
+        cov = fragment_coverage(points, (10, 10))
+        np.testing.assert_allclose(cov[:, 0], 0.75)
+        np.testing.assert_allclose(cov[:, 1:], 1.0)
+
+    def test_apply_scales_alpha_only(self):
+        rgba = np.full((2, 2, 4), 200, dtype=np.uint8)
+        cov = np.array([[1.0, 0.5], [0.0, 0.25]], dtype=np.float32)
+        out = apply_coverage(rgba, cov)
+        np.testing.assert_array_equal(out[..., 3], [[200, 100], [0, 50]])
+        np.testing.assert_array_equal(out[..., :3], rgba[..., :3])
+        self.assertEqual(rgba[0, 1, 3], 200)
+
+    def test_apply_writes_into_given_buffer_in_bands(self):
+        rng = np.random.default_rng(2)
+        rgba = rng.integers(0, 256, (37, 5, 4), dtype=np.uint8)
+        cov = rng.random((37, 5)).astype(np.float32)
+        out = np.zeros((37, 5, 4), dtype=np.uint8)
+        self.assertIs(apply_coverage(rgba, cov, out=out, band_rows=8), out)
+        np.testing.assert_array_equal(out, apply_coverage(rgba, cov))
+        np.testing.assert_array_equal(out[..., 3], np.floor(rgba[..., 3] * cov.astype(np.float64) + 0.5))
+
+    def test_cache_reuses_masks_per_points_and_size(self):
+        cache = CoverageCache(limit=2)
+        points = [(0, 0), (8, 0), (0, 8)]
+        first = cache.get(points, (4, 4))
+        self.assertIs(cache.get(points, (4, 4)), first)
+        self.assertFalse(first.flags.writeable)
+        cache.get(points, (8, 8))
+        cache.get(points, (16, 16))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (1, 3, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import io
+import struct
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from core.dds_export import BLOCK_BYTES, DDS_FORMATS, mip_chain, to_blocks, write_dds
+
+
+def gradient_atlas(height, width):
+    y, x = np.mgrid[0:height, 0:width]
+    rgba = np.empty((height, width, 4), dtype=np.uint8)
+    rgba[..., 0] = x * 255 // max(1, width - 1)
+    rgba[..., 1] = y * 255 // max(1, height - 1)
+    rgba[..., 2] = 255 - rgba[..., 0] // 2
+    rgba[..., 3] = np.where((x // 8 + y // 8) % 2, 255, 96)
+    return rgba
+
+
+def encode(rgba, fmt, mips=True, workers=1):
+    out = io.BytesIO()
+    write_dds(out, rgba, fmt, mips=mips, workers=workers)
+    return out.getvalue()
+
+
+def decode_top_level(data):
+    with Image.open(io.BytesIO(data)) as image:
+        return np.asarray(image.convert("RGBA")).astype(np.float64)
+
+
+class DdsExportTests(unittest.TestCase):
+    def test_formats_decode_close_to_the_source(self):
+        for height, width in ((64, 64), (37, 53), (3, 2), (1, 1)):
+            rgba = gradient_atlas(height, width)
+            for fmt, limit in (("bc1", 6.0), ("bc3", 6.0), ("bc7", 4.0)):
+                decoded = decode_top_level(encode(rgba, fmt))
+                self.assertEqual(decoded.shape[:2], (height, width))
+                if height < 4:
+                    continue  # a single block of four unrelated colors
+                channels = 3 if fmt == "bc1" else 4
+                error = np.sqrt(((decoded[..., :channels] - rgba[..., :channels]) ** 2).mean())
+                self.assertLess(error, limit, f"{fmt} {height}x{width}")
+
+    def test_flat_blocks_are_exact(self):
+        rgba = np.empty((8, 8, 4), dtype=np.uint8)
+        rgba[...] = (200, 100, 50, 255)
+        for fmt in DDS_FORMATS:
+            decoded = decode_top_level(encode(rgba, fmt, mips=False))
+            np.testing.assert_allclose(decoded[..., :3], rgba[..., :3], atol=4)
+            self.assertTrue((decoded[..., 3] == 255).all())
+
+    def test_header_and_mip_chain_sizes(self):
+        rgba = gradient_atlas(37, 53)
+        levels = mip_chain(rgba)
+        self.assertEqual([level.shape[:2] for level in levels],
+                         [(37, 53), (19, 27), (10, 14), (5, 7), (3, 4), (2, 2), (1, 1)])
+        for fmt in DDS_FORMATS:
+            data = encode(rgba, fmt)
+            self.assertEqual(data[:4], b"DDS ")
+            height, width, _, _, mip_count = struct.unpack("<5I", data[12:32])
+            self.assertEqual((height, width, mip_count), (37, 53, len(levels)))
+            header = 128 + (20 if fmt == "bc7" else 0)
+            payload = sum(len(to_blocks(level)) for level in levels) * BLOCK_BYTES[fmt]
+            self.assertEqual(len(data), header + payload)
+
+    def test_mip_colors_ignore_transparent_texels(self):
+        rgba = np.zeros((4, 4, 4), dtype=np.uint8)
+        rgba[:2, :2] = (240, 120, 60, 255)  # one covered quadrant, the rest transparent black
+        rgba[2:, 2:, :3] = 30  # uncovered padding: its plain mean carries down
+        second = mip_chain(rgba)[1]
+        self.assertEqual(tuple(second[0, 0]), (240, 120, 60, 255))
+        self.assertEqual(tuple(second[1, 1]), (30, 30, 30, 0))
+        self.assertEqual(tuple(mip_chain(rgba)[2][0, 0]), (240, 120, 60, 64))
+
+    def test_threads_do_not_change_the_file(self):
+        rgba = gradient_atlas(300, 260)
+        with mock.patch("core.dds_export.CHUNK_BLOCKS", 100):
+            for fmt in DDS_FORMATS:
+                self.assertEqual(encode(rgba, fmt, workers=3), encode(rgba, fmt))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from core.dilation import dilate, dilate_rows, nearest_opaque
+from core.tiled_export import RowFile
+
+
+def islands_atlas(rng, height, width, islands=6):
+    rgba = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    rgba[..., 3] = 0
+    for _ in range(islands):
+        y, x = rng.integers(0, height), rng.integers(0, width)
+        h, w = rng.integers(1, 8, size=2)
+        rgba[y:y + h, x:x + w, 3] = 255
+    return rgba
+
+
+def nearest_distances(keep):
+    """Brute-force squared distance from every pixel to the nearest kept pixel."""
+    ys, xs = np.nonzero(keep)
+    gy, gx = np.mgrid[:keep.shape[0], :keep.shape[1]]
+    d = (gy[..., None] - ys) ** 2 + (gx[..., None] - xs) ** 2
+    return d.min(axis=-1)
+
+
+class DilationTests(unittest.TestCase):
+    def test_offsets_point_at_opaque_pixels_near_the_nearest(self):
+        rng = np.random.default_rng(5)
+        for height, width in ((63, 95), (40, 17), (1, 30), (30, 1)):
+            rgba = islands_atlas(rng, height, width)
+            keep = rgba[..., 3] > 1
+            vy, vx, dist = nearest_opaque(lambda top, bottom: keep[top:bottom], height, width)
+            gy, gx = np.mgrid[:height, :width]
+            self.assertTrue(keep[gy + vy, gx + vx].all())
+            np.testing.assert_array_equal(dist, vy.astype(np.int32) ** 2 + vx.astype(np.int32) ** 2)
+            exact = nearest_distances(keep)
+            self.assertTrue((dist >= exact).all())
+            self.assertGreaterEqual((dist == exact).mean(), 0.98)
+
+    def test_color_comes_from_opaque_texels_and_alpha_is_kept(self):
+        rgba = islands_atlas(np.random.default_rng(1), 48, 64)
+        out = dilate(rgba)
+        np.testing.assert_array_equal(out[..., 3], rgba[..., 3])
+        keep = rgba[..., 3] > 1
+        np.testing.assert_array_equal(out[keep], rgba[keep])
+        opaque_colors = {tuple(c) for c in rgba[keep][:, :3]}
+        self.assertTrue(all(tuple(c) in opaque_colors for c in out[~keep][:, :3]))
+
+    def test_max_radius_limits_the_fill(self):
+        rgba = np.zeros((32, 32, 4), dtype=np.uint8)
+        rgba[16, 16] = (10, 20, 30, 255)
+        out = dilate(rgba, max_radius=3)
+        filled = (out[..., :3] != 0).any(axis=-1)
+        gy, gx = np.mgrid[:32, :32]
+        np.testing.assert_array_equal(filled, (gy - 16) ** 2 + (gx - 16) ** 2 <= 9)
+
+    def test_empty_and_full_alpha_are_unchanged(self):
+        rgba = np.random.default_rng(3).integers(0, 256, (9, 7, 4), dtype=np.uint8)
+        rgba[..., 3] = 0
+        np.testing.assert_array_equal(dilate(rgba), rgba)
+        rgba[..., 3] = 255
+        np.testing.assert_array_equal(dilate(rgba), rgba)
+
+    def test_bands_and_row_files_match_in_memory(self):
+        rgba = islands_atlas(np.random.default_rng(8), 70, 45, islands=10)
+        expected = dilate(rgba, max_radius=12)
+        with tempfile.TemporaryDirectory() as tmp:
+            atlas = RowFile(tmp, rgba.shape, np.uint8)
+            atlas.rows(0, 70)[...] = rgba
+            dilate_rows(atlas, 70, 45, max_radius=12, band_rows=7,
+                        make_buffer=lambda shape, dtype: RowFile(tmp, shape, dtype))
+            np.testing.assert_array_equal(np.array(atlas.rows(0, 70)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from core.disk_cache import ResampleDiskCache, resample_cache_key
+
+
+class ResampleDiskCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.source = os.path.join(self.tmp.name, "src.png")
+        Image.new("RGB", (16, 16), (10, 20, 30)).save(self.source)
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+
+    def key(self, **overrides):
+        args = dict(rect=(0, 0, 16, 16), target_size=(8, 8), mode="lanczos", beta=3.0, radius=2)
+        args.update(overrides)
+        return resample_cache_key(self.source, **args)
+
+    def test_round_trip_is_memory_mapped(self):
+        cache = ResampleDiskCache(self.cache_dir)
+        arr = np.arange(8 * 8 * 4, dtype=np.uint8).reshape(8, 8, 4)
+        self.assertIsNone(cache.get(self.key()))
+        cache.put(self.key(), arr)
+        loaded = cache.get(self.key())
+        self.assertIsInstance(loaded, np.memmap)
+        np.testing.assert_array_equal(loaded, arr)
+        self.assertEqual((cache.hits, cache.misses, cache.writes), (1, 1, 1))
+
+    def test_key_covers_every_resample_input(self):
+        base = self.key()
+        self.assertNotEqual(base, self.key(rect=(1, 0, 15, 16)))
+        self.assertNotEqual(base, self.key(target_size=(9, 8)))
+        self.assertNotEqual(base, self.key(mode="nearest"))
+        self.assertNotEqual(self.key(mode="kaiser"), self.key(mode="kaiser", beta=4.0))
+        self.assertNotEqual(self.key(mode="kaiser"), self.key(mode="kaiser", radius=3))
+        # Kaiser parameters do not split other modes
+        self.assertEqual(base, self.key(beta=9.0, radius=5))
+
+    def test_key_changes_when_source_changes(self):
+        before = self.key()
+        st = os.stat(self.source)
+        os.utime(self.source, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        self.assertNotEqual(before, self.key())
+
+    def test_prune_removes_least_recently_used(self):
+        cache = ResampleDiskCache(self.cache_dir)
+        arr = np.zeros((16, 16, 4), dtype=np.uint8)
+        keys = [self.key(target_size=(i + 1, 1)) for i in range(3)]
+        for k in keys:
+            cache.put(k, arr)
+            time.sleep(0.01)
+        cache.get(keys[0])  # touch: now most recent
+        per_file = cache.total_bytes() // 3
+        cache.max_bytes = per_file * 2
+        cache.prune()
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[2]))
+        self.assertEqual(cache.pruned_files, 1)
+        self.assertLessEqual(cache.total_bytes(), cache.max_bytes)
+
+    def test_overwriting_a_key_keeps_the_running_total(self):
+        cache = ResampleDiskCache(self.cache_dir)
+        cache.put(self.key(), np.zeros((16, 16, 4), dtype=np.uint8))
+        one_file = cache.total_bytes()
+        for _ in range(3):
+            cache.put(self.key(), np.zeros((16, 16, 4), dtype=np.uint8))
+        self.assertEqual(cache.total_bytes(), one_file)
+        cache.put(self.key(), np.zeros((4, 4, 4), dtype=np.uint8))
+        self.assertEqual(cache.total_bytes(), ResampleDiskCache(self.cache_dir).total_bytes())
+
+    def test_disabled_cache_is_a_no_op(self):
+        cache = ResampleDiskCache(self.cache_dir)
+        cache.enabled = False
+        cache.put(self.key(), np.zeros((2, 2, 4), dtype=np.uint8))
+        self.assertIsNone(cache.get(self.key()))
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from core.filter_tables import FilterTableCache, build_filter_table
+
+
+class FilterTableCacheTests(unittest.TestCase):
+    def test_repeated_geometry_is_served_from_cache(self):
+        cache = FilterTableCache()
+        first = cache.get("kaiser", 100, 40, 2, 3.0)
+        second = cache.get("kaiser", 100, 40, 2, 3.0)
+        self.assertIs(first, second)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertAlmostEqual(stats["reuse_rate"], 0.5)
+
+    def test_kernel_and_parameters_are_part_of_the_key(self):
+        cache = FilterTableCache()
+        cache.get("kaiser", 100, 40, 2, 3.0)
+        cache.get("kaiser", 100, 40, 2, 4.0)
+        cache.get("lanczos", 100, 40, 2)
+        self.assertEqual(cache.stats()["misses"], 3)
+
+    def test_lru_eviction(self):
+        cache = FilterTableCache(limit=2)
+        cache.get("lanczos", 10, 5, 3)
+        cache.get("lanczos", 20, 5, 3)
+        cache.get("lanczos", 10, 5, 3)  # refresh first entry
+        cache.get("lanczos", 30, 5, 3)  # evicts (20, 5)
+        self.assertEqual(cache.evictions, 1)
+        cache.get("lanczos", 10, 5, 3)
+        self.assertEqual(cache.hits, 2)
+
+    def test_tables_are_normalized_and_read_only(self):
+        cache = FilterTableCache()
+        for kernel, param in (("kaiser", 3.0), ("lanczos", None)):
+            idx, weights = cache.get(kernel, 57, 13, 3, param)
+            self.assertEqual(idx.shape, (13, 7))
+            np.testing.assert_allclose(weights.sum(axis=1), 1.0, rtol=1e-5)
+            with self.assertRaises(ValueError):
+                weights[0, 0] = 0.0
+
+    def test_cached_table_matches_fresh_build(self):
+        cache = FilterTableCache()
+        idx, weights = cache.get("kaiser", 64, 48, 2, 2.5)
+        fresh_idx, fresh_weights = build_filter_table("kaiser", 64, 48, 2, 2.5)
+        np.testing.assert_array_equal(idx, fresh_idx)
+        np.testing.assert_array_equal(weights, fresh_weights)
+
+    def test_source_window_is_part_of_the_key(self):
+        cache = FilterTableCache()
+        full = cache.get("lanczos", 64, 16, 3)
+        self.assertIs(cache.get("lanczos", 64, 16, 3, start=0.0, span=64), full)
+        idx, _weights = cache.get("lanczos", 64, 16, 3, start=10.5, span=32)
+        self.assertEqual(cache.stats()["misses"], 2)
+        # Taps stay centred on the window: first output centre is 10.5 + 1 - 0.5
+        self.assertEqual(idx[0, 3], 11)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from core.fragment_store import FragmentStore
+
+
+class FragmentStoreTests(unittest.TestCase):
+    def test_holders_of_a_key_share_the_first_value(self):
+        store = FragmentStore()
+        first = object()
+        self.assertIs(store.acquire("k", first), first)
+        self.assertIs(store.acquire("k", object()), first)
+        self.assertEqual(store.refs("k"), 2)
+        self.assertIs(store.get("k"), first)
+
+    def test_value_is_dropped_with_the_last_reference(self):
+        store = FragmentStore()
+        store.acquire("k", "pixmap")
+        store.acquire("k", "pixmap")
+        store.release("k")
+        self.assertEqual(store.get("k"), "pixmap")
+        store.release("k")
+        self.assertIsNone(store.get("k"))
+        self.assertEqual(store.stats(), {"entries": 0, "references": 0, "hits": 1, "misses": 1})
+
+    def test_get_does_not_take_a_reference(self):
+        store = FragmentStore()
+        store.acquire("k", "pixmap")
+        store.get("k")
+        store.release("k")
+        self.assertEqual(store.refs("k"), 0)
+        store.release("missing")  # ignored
+
+    def test_clear_drops_everything(self):
+        store = FragmentStore()
+        store.acquire("a", 1)
+        store.acquire("b", 2)
+        store.clear()
+        self.assertEqual(store.stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import io
+import json
+import struct
+import unittest
+
+import numpy as np
+
+from core.glb_export import build_glb_mesh, write_glb
+from core.obj_export import MeshMask
+
+ELL = ((0, 0), (40, 0), (40, 10), (10, 10), (10, 40), (0, 40))
+
+
+def read_glb(data):
+    """(document, {accessor index: array}) of a GLB, checking the container layout on the way."""
+    magic, version, length = struct.unpack_from("<4sII", data, 0)
+    assert (magic, version, length) == (b"glTF", 2, len(data))
+    json_length, json_type = struct.unpack_from("<II", data, 12)
+    assert json_type == 0x4E4F534A and json_length % 4 == 0
+    document = json.loads(data[20:20 + json_length])
+    bin_length, bin_type = struct.unpack_from("<II", data, 20 + json_length)
+    assert bin_type == 0x004E4942 and bin_length == document["buffers"][0]["byteLength"]
+    binary = data[28 + json_length:28 + json_length + bin_length]
+    arrays = {}
+    for i, accessor in enumerate(document["accessors"]):
+        view = document["bufferViews"][accessor["bufferView"]]
+        dtype = np.float32 if accessor["componentType"] == 5126 else np.uint32
+        width = {"SCALAR": 1, "VEC2": 2, "VEC3": 3}[accessor["type"]]
+        start = view["byteOffset"] + accessor["byteOffset"]
+        arrays[i] = np.frombuffer(binary, dtype, accessor["count"] * width, start).reshape(-1, width)
+    return document, arrays
+
+
+class GlbExportTests(unittest.TestCase):
+    def setUp(self):
+        self.masks = [
+            MeshMask(ELL, 0.5, 40.0, 100.0, 20.0, 2, "a.png"),
+            MeshMask(tuple(reversed(ELL)), 1.0, 40.0, 300.0, 300.0, 1, "b.png"),
+        ]
+
+    def export(self, merged):
+        mesh, err = build_glb_mesh(self.masks, 512, 512, 64.0, merged)
+        self.assertIsNone(err)
+        out = io.BytesIO()
+        write_glb(out, mesh)
+        return read_glb(out.getvalue())
+
+    def test_vertex_views_shared_by_several_masks_declare_a_stride(self):
+        document, _ = self.export(merged=False)
+        for attribute, stride in (("POSITION", 12), ("TEXCOORD_0", 8)):
+            views = {document["accessors"][mesh["primitives"][0]["attributes"][attribute]]["bufferView"]
+                     for mesh in document["meshes"]}
+            self.assertEqual(len(views), 1)
+            self.assertEqual(document["bufferViews"][views.pop()]["byteStride"], stride)
+        index_view = document["accessors"][document["meshes"][0]["primitives"][0]["indices"]]["bufferView"]
+        self.assertNotIn("byteStride", document["bufferViews"][index_view])
+
+    def test_one_mesh_per_mask_in_meters_facing_up(self):
+        document, arrays = self.export(merged=False)
+        self.assertEqual([node["name"] for node in document["nodes"]], ["mask_1", "mask_2"])
+        self.assertEqual(document["asset"]["extras"]["atlas_size"], [512, 512])
+        for mesh in document["meshes"]:
+            primitive = mesh["primitives"][0]
+            positions = arrays[primitive["attributes"]["POSITION"]]
+            uvs = arrays[primitive["attributes"]["TEXCOORD_0"]]
+            triangles = arrays[primitive["indices"]].reshape(-1, 3)
+            self.assertEqual(len(triangles), 4)
+            self.assertTrue((triangles < len(positions)).all())
+            a, b, c = (positions[triangles[:, k], :2].astype(np.float64) for k in range(3))
+            areas = 0.5 * ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]))
+            self.assertTrue((areas > 0).all())  # counter-clockwise seen from +Z
+            accessor = document["accessors"][primitive["attributes"]["POSITION"]]
+            np.testing.assert_array_equal(accessor["min"], positions.min(axis=0))
+            self.assertTrue(((uvs >= 0) & (uvs <= 1)).all())
+        # mask_2: 0.5 m over 40 px at 64 px/m is 0.8 px per source px, placed at (100, 20); V is top-down
+        positions = arrays[document["meshes"][1]["primitives"][0]["attributes"]["POSITION"]]
+        uvs = arrays[document["meshes"][1]["primitives"][0]["attributes"]["TEXCOORD_0"]]
+        np.testing.assert_allclose(positions[2], (132 / 64, (512 - 28) / 64, 0), rtol=1e-6)
+        np.testing.assert_allclose(uvs[2], (132 / 512, 28 / 512), rtol=1e-6)
+
+    def test_merged_mesh_keeps_every_triangle(self):
+        document, arrays = self.export(merged=True)
+        self.assertEqual(len(document["meshes"]), 1)
+        primitive = document["meshes"][0]["primitives"][0]
+        self.assertEqual(len(arrays[primitive["attributes"]["POSITION"]]), 12)
+        triangles = arrays[primitive["indices"]].reshape(-1, 3)
+        self.assertEqual(len(triangles), 8)
+        self.assertEqual(int(triangles.max()), 11)
+
+    def test_errors_match_obj_export(self):
+        self.assertEqual(build_glb_mesh([], 512, 512, 64.0), (None, "No items on atlas to export."))
+        self.assertEqual(build_glb_mesh(self.masks, 0, 512, 64.0), (None, "Invalid atlas size."))
+
+
+if __name__ == "__main__":
+    unittest.main()
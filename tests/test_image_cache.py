@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+import numpy as np
+
+from core.image_cache import DecodedImageCache, draft_scale
+
+
+class DecodedImageCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def make_image(self, name, size=(8, 8), color=(255, 0, 0)):
+        path = os.path.join(self.tmp.name, name)
+        Image.new("RGB", size, color).save(path)
+        return path
+
+    def test_second_get_is_a_hit_and_returns_rgba(self):
+        path = self.make_image("a.png")
+        cache = DecodedImageCache()
+        first = cache.get(path)
+        second = cache.get(path)
+        self.assertIs(first, second)
+        self.assertEqual(first.mode, "RGBA")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_eviction_is_driven_by_bytes_not_entries(self):
+        a = self.make_image("a.png", size=(8, 8))  # 256 bytes decoded
+        b = self.make_image("b.png", size=(8, 8))
+        c = self.make_image("c.png", size=(8, 8))
+        cache = DecodedImageCache(budget_bytes=600)
+        cache.get(a)
+        cache.get(b)
+        cache.get(c)
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["bytes"], 512)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["evicted_bytes"], 256)
+        cache.get(a)  # evicted first (least recently used)
+        self.assertEqual(cache.misses, 4)
+
+    def test_oversized_image_is_not_retained(self):
+        path = self.make_image("big.png", size=(32, 32))
+        cache = DecodedImageCache(budget_bytes=100)
+        self.assertEqual(cache.get(path).size, (32, 32))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_modified_file_is_decoded_again(self):
+        path = self.make_image("a.png", color=(255, 0, 0))
+        cache = DecodedImageCache()
+        cache.get(path)
+        Image.new("RGB", (8, 8), (0, 255, 0)).save(path)
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        img = cache.get(path)
+        self.assertEqual(img.getpixel((0, 0)), (0, 255, 0, 255))
+        self.assertEqual(cache.misses, 2)
+
+    def test_peek_never_decodes(self):
+        path = self.make_image("a.png")
+        cache = DecodedImageCache()
+        self.assertIsNone(cache.peek(path))
+        self.assertIsNone(cache.peek(os.path.join(self.tmp.name, "missing.png")))
+        decoded = cache.get(path)
+        self.assertIs(cache.peek(path), decoded)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_shrinking_budget_evicts(self):
+        path = self.make_image("a.png")
+        cache = DecodedImageCache()
+        cache.get(path)
+        cache.set_budget(0)
+        self.assertEqual(cache.current_bytes, 0)
+        self.assertEqual(cache.evicted_bytes, 256)
+
+
+class DraftDecodeTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def save(self, name, size=(400, 300)):
+        path = os.path.join(self.tmp.name, name)
+        rng = np.random.default_rng(3)
+        Image.fromarray(rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)).save(path)
+        return path
+
+    def test_scale_keeps_quality_margin(self):
+        self.assertEqual(draft_scale((1000, 1000), (400, 400)), 1)
+        self.assertEqual(draft_scale((1000, 1000), (250, 250)), 2)
+        self.assertEqual(draft_scale((1000, 1000), (100, 100)), 4)
+        self.assertEqual(draft_scale((4000, 1000), (50, 60)), 8)
+        self.assertEqual(draft_scale((4000, 1000), (50, 200)), 2)
+
+    def test_jpeg_is_decoded_reduced_and_cached(self):
+        path = self.save("a.jpg")
+        cache = DecodedImageCache()
+        image, factor = cache.get_draft(path, 4)
+        self.assertEqual((factor, image.size, image.mode), (4, (100, 75), "RGBA"))
+        again, _ = cache.get_draft(path, 4)
+        self.assertIs(again, image)
+        stats = cache.stats()
+        self.assertEqual((stats["draft_decodes"], stats["draft_uses"], stats["hits"]), (1, 2, 1))
+
+    def test_non_jpeg_falls_back_to_full_decode(self):
+        path = self.save("a.png")
+        cache = DecodedImageCache()
+        image, factor = cache.get_draft(path, 4)
+        self.assertEqual((factor, image.size), (1, (400, 300)))
+        self.assertIs(cache.get_draft(path, 4)[0], image)
+        self.assertEqual(cache.stats()["draft_decodes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from core.compositor import AtlasCompositor, FragmentPlacement
+from core.dilation import dilate
+from core.incremental_export import diff_bounds, export_png_incremental
+from core.mip_flood import mip_flood
+
+
+def noise_crop(job):
+    width, height = job.target_size
+    rng = np.random.default_rng(sum(job.rect))
+    crop = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    crop[..., 3] = np.maximum(crop[..., 3], 90)
+    return crop
+
+
+def random_placement(rng, size):
+    w, h = (float(v) for v in rng.integers(8, 70, size=2))
+    ox, oy = (float(v) for v in rng.integers(0, 100, size=2))
+    points = ((ox, oy), (ox + w, oy + 3.0), (ox + w - 5.0, oy + h), (ox, oy + h))
+    x = float(rng.integers(-10, size)) + (0.5 if rng.random() < 0.3 else 0.0)
+    return FragmentPlacement("src.png", points, 1.0, 40.0, x, float(rng.integers(-10, size)))
+
+
+class IncrementalExportTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def check_edits(self, mip_flood_settings=None, dilation=None, seed=3):
+        rng = np.random.default_rng(seed)
+        compositor = AtlasCompositor((230, 301), 40.0, fetch_crop=noise_crop)
+        placements = [random_placement(rng, 230) for _ in range(25)]
+        path = os.path.join(self.tmp, f"atlas_{seed}.png")
+        modes = []
+        for step in range(7):
+            index = int(rng.integers(len(placements)))
+            if step % 3 == 1:
+                p = placements[index]
+                placements[index] = FragmentPlacement(p.image_path, p.points, p.real_width, p.original_width, p.x + 9, p.y - 4)
+            elif step % 3 == 2:
+                placements.insert(0, placements.pop())  # restack
+            elif step:
+                placements.insert(index, random_placement(rng, 230))
+            stats = export_png_incremental(compositor, placements, path, mip_flood_settings, dilation)
+            modes.append(stats["mode"])
+            expected = compositor.composite(placements)
+            if dilation is not None:
+                expected = dilate(expected, *dilation)
+            elif mip_flood_settings is not None:
+                expected = mip_flood(expected, *mip_flood_settings)
+            with Image.open(path) as image:
+                np.testing.assert_array_equal(np.asarray(image), expected)
+        self.assertEqual(modes[0], "full")
+        self.assertEqual(set(modes[1:]), {"incremental"})
+
+    def test_matches_full_export_without_padding(self):
+        self.check_edits()
+
+    def test_matches_full_export_with_mip_flood(self):
+        self.check_edits(mip_flood_settings=(1, 0))
+        self.check_edits(mip_flood_settings=(1, 3), seed=4)
+
+    def test_matches_full_export_with_dilation(self):
+        self.check_edits(dilation=(1, 12))
+        self.check_edits(dilation=(1, 0), seed=5)
+
+    def test_unchanged_export_is_skipped_and_settings_change_is_full(self):
+        compositor = AtlasCompositor(128, 40.0, fetch_crop=noise_crop)
+        placements = [random_placement(np.random.default_rng(1), 100)]
+        path = os.path.join(self.tmp, "same.png")
+        self.assertEqual(export_png_incremental(compositor, placements, path)["mode"], "full")
+        self.assertEqual(export_png_incremental(compositor, placements, path)["mode"], "unchanged")
+        stats = export_png_incremental(compositor, placements, path, dirty_boxes=[(0, 0, 10, 10)])
+        self.assertEqual((stats["mode"], stats["dirty_tiles"]), ("incremental", 1))
+        self.assertEqual(export_png_incremental(compositor, placements, path, (1, 0))["mode"], "full")
+
+    def test_diff_marks_added_removed_and_restacked(self):
+        a, b, c = ("a", (0, 0, 1, 1)), ("b", (5, 5, 6, 6)), ("c", (9, 9, 10, 10))
+        self.assertEqual(diff_bounds([a, b], [a, b]), [])
+        self.assertEqual(sorted(diff_bounds([a, b], [a, c])), [b[1], c[1]])
+        self.assertEqual(sorted(diff_bounds([a, b, c], [b, a, c])), [a[1], a[1], b[1], b[1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
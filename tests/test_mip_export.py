@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from core.mip_export import MipFilter, mip_filter, mip_levels, mip_paths, reduction_table, write_mip_pngs
+from core.tiled_export import RowFile
+
+
+def island_atlas(height=64, width=96):
+    """Noisy color everywhere, opaque only inside one rectangle."""
+    rng = np.random.default_rng(7)
+    rgba = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    rgba[..., 3] = 0
+    rgba[8:40, 16:72, 3] = 255
+    return rgba
+
+
+class MipExportTests(unittest.TestCase):
+    def test_filter_follows_the_resampler(self):
+        self.assertEqual(mip_filter("kaiser", 4.0, 3), MipFilter("kaiser", 3, 4.0))
+        self.assertEqual(mip_filter("nearest").kernel, "box")
+        self.assertEqual(mip_filter("lanczos").kernel, "lanczos")
+
+    def test_reduction_weights_are_normalized_and_in_range(self):
+        for chain_filter in (mip_filter("nearest"), mip_filter("lanczos"), mip_filter("kaiser")):
+            for src_len, tgt_len in ((64, 32), (37, 19), (3, 2), (1, 1)):
+                taps, weights = reduction_table(chain_filter, src_len, tgt_len)
+                np.testing.assert_allclose(weights.sum(axis=1), 1.0, rtol=1e-5)
+                self.assertTrue(((taps >= 0) & (taps < src_len)).all())
+
+    def test_box_chain_is_the_2x2_mean(self):
+        rgba = np.random.default_rng(3).integers(0, 256, (32, 16, 4), dtype=np.uint8)
+        rgba[..., 3] = 255
+        levels = mip_levels(rgba, (1, 0, mip_filter("nearest")))
+        self.assertEqual([level.shape[:2] for level in levels], [(16, 8), (8, 4), (4, 2), (2, 1), (1, 1)])
+        expected = rgba.astype(np.float64).reshape(16, 2, 8, 2, 4).mean(axis=(1, 3))
+        self.assertLessEqual(np.abs(levels[0] - expected).max(), 0.5)
+
+    def test_transparent_texels_do_not_bleed_into_covered_ones(self):
+        rgba = island_atlas()
+        rgba[..., :3] = (0, 0, 255)
+        rgba[rgba[..., 3] > 0, :3] = (200, 40, 10)
+        for mode in ("nearest", "lanczos", "kaiser"):
+            first = mip_levels(rgba, (1, 1, mip_filter(mode)))[0]
+            # Every texel touching the island keeps its color, even half-covered edge texels
+            island = first[4:20, 8:36]
+            self.assertLessEqual(np.abs(island[..., :3].astype(int) - (200, 40, 10)).max(), 1, mode)
+            # Far from it, the padding color carries down
+            self.assertTrue((first[28:, :, :3] == (0, 0, 255)).all(), mode)
+
+    def test_flat_images_stay_flat_at_every_level(self):
+        rgba = np.full((45, 70, 4), (90, 160, 30, 255), dtype=np.uint8)
+        for mode in ("lanczos", "kaiser"):
+            for level in mip_levels(rgba, (1, 0, mip_filter(mode))):
+                self.assertTrue((level == (90, 160, 30, 255)).all())
+
+    def test_png_files_match_in_memory_and_row_file_levels(self):
+        rgba = island_atlas(50, 70)
+        chain = (1, 3, mip_filter("kaiser"))
+        expected = mip_levels(rgba, chain)
+        with tempfile.TemporaryDirectory() as tmp:
+            atlas = RowFile(tmp, rgba.shape, np.uint8)
+            atlas.rows(0, 50)[...] = rgba
+            path = os.path.join(tmp, "atlas.png")
+            written = write_mip_pngs(atlas, 50, 70, path, chain, "fast",
+                                     make_buffer=lambda shape, dtype: RowFile(tmp, shape, dtype))
+            self.assertEqual(written, mip_paths(path, 3))
+            self.assertTrue(written[0].endswith("atlas_mip1.png"))
+            for level_path, level in zip(written, expected):
+                with Image.open(level_path) as image:
+                    np.testing.assert_array_equal(np.asarray(image), level)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import math
+import unittest
+
+import numpy as np
+
+from core.mip_flood import level_sizes, mip_flood
+
+
+def reference_mip_flood(rgba, alpha_threshold=1, levels=4):
+    """The original float32 pyramid implementation, kept as the bit-exact specification."""
+    h, w = rgba.shape[:2]
+    alpha = rgba[..., 3]
+    mask = (alpha > alpha_threshold).astype(np.uint8)
+    color = rgba[..., :3].astype(np.float32) / 255.0
+
+    def pad_even(img_arr, mask_arr):
+        pad_h, pad_w = img_arr.shape[0] % 2, img_arr.shape[1] % 2
+        if pad_h or pad_w:
+            img_arr = np.pad(img_arr, ((0, pad_h), (0, pad_w), (0, 0)), mode='edge')
+            mask_arr = np.pad(mask_arr, ((0, pad_h), (0, pad_w)), mode='edge')
+        return img_arr, mask_arr
+
+    if levels is None or levels <= 0:
+        levels = int(math.ceil(math.log2(max(w, h)))) if max(w, h) > 0 else 1
+
+    colors = [color]
+    masks = [mask]
+    for _ in range(levels):
+        img_arr, mask_arr = pad_even(colors[-1], masks[-1])
+        h2, w2 = img_arr.shape[0] // 2, img_arr.shape[1] // 2
+        mask_blocks = mask_arr.reshape(h2, 2, w2, 2)
+        mask_ds = mask_blocks.max(axis=(1, 3))
+        color_blocks = img_arr.reshape(h2, 2, w2, 2, 3)
+        coverage = mask_blocks.sum(axis=(1, 3)).reshape(h2, w2, 1).astype(np.float32)
+        summed = (color_blocks * mask_blocks[..., None]).sum(axis=(1, 3))
+        color_ds = np.divide(summed, coverage, out=np.zeros_like(summed, dtype=np.float32), where=coverage > 0)
+        colors.append(color_ds)
+        masks.append(mask_ds)
+        if h2 == 1 and w2 == 1:
+            break
+
+    for i in range(len(colors) - 2, -1, -1):
+        up = colors[i + 1].repeat(2, axis=0).repeat(2, axis=1)[: colors[i].shape[0], : colors[i].shape[1], :]
+        colors[i] = np.where((masks[i] == 0)[..., None], up, colors[i])
+
+    final_color = (colors[0] * 255.0).clip(0, 255).astype(np.uint8)
+    return np.concatenate([final_color, alpha[..., None]], axis=2)
+
+
+class MipFloodTests(unittest.TestCase):
+    def test_bit_identical_to_reference_on_random_masks(self):
+        rng = np.random.default_rng(14)
+        for _ in range(120):
+            h, w = (int(v) for v in rng.integers(1, 80, 2))
+            levels = int(rng.integers(-1, 9))
+            threshold = int(rng.integers(0, 255))
+            rgba = rng.integers(0, 256, (h, w, 4), dtype=np.uint8)
+            rgba[..., 3] = np.where(rng.random((h, w)) < rng.random(), rgba[..., 3], 0)
+            np.testing.assert_array_equal(mip_flood(rgba, threshold, levels), reference_mip_flood(rgba, threshold, levels))
+
+    def test_bit_identical_on_blocky_atlas(self):
+        rng = np.random.default_rng(3)
+        rgba = np.zeros((300, 517, 4), dtype=np.uint8)
+        for _ in range(12):
+            x, y = rng.integers(0, 450), rng.integers(0, 250)
+            rgba[y:y + 60, x:x + 70] = rng.integers(0, 256, 4, dtype=np.uint8)
+            rgba[y:y + 60, x:x + 70, 3] = 255
+        np.testing.assert_array_equal(mip_flood(rgba, 1, 0), reference_mip_flood(rgba, 1, 0))
+
+    def test_kept_pixels_and_alpha_are_untouched(self):
+        rgba = np.zeros((8, 8, 4), dtype=np.uint8)
+        rgba[2:4, 2:4] = (10, 200, 30, 255)
+        out = mip_flood(rgba, 1, 0)
+        np.testing.assert_array_equal(out[..., 3], rgba[..., 3])
+        np.testing.assert_array_equal(out[2:4, 2:4], rgba[2:4, 2:4])
+        np.testing.assert_array_equal(out[7, 7, :3], (10, 200, 30))
+
+    def test_level_sizes_stop_at_one_pixel(self):
+        self.assertEqual(level_sizes(5, 3, 10), [(5, 3), (3, 2), (2, 1), (1, 1)])
+        self.assertEqual(level_sizes(64, 64, 2), [(64, 64), (32, 32), (16, 16)])
+
+
+if __name__ == "__main__":
+    unittest.main()
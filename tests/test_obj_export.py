@@ -0,0 +1,76 @@
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from core.obj_export import MeshMask, generate_obj, weld_points, write_obj
+
+SQUARE = ((0, 0), (10, 0), (10, 10), (0, 10))
+
+
+def parse(text):
+    vertices = [tuple(map(float, line.split()[1:3])) for line in text.splitlines() if line.startswith("v ")]
+    uvs = [line for line in text.splitlines() if line.startswith("vt ")]
+    faces = [[int(c.split("/")[0]) - 1 for c in line.split()[1:]] for line in text.splitlines() if line.startswith("f ")]
+    objects = [line[2:] for line in text.splitlines() if line.startswith("o ")]
+    return vertices, uvs, faces, objects
+
+
+def face_area(vertices, face):
+    p = np.array([vertices[i] for i in face])
+    return 0.5 * float(np.dot(p[:, 0], np.roll(p[:, 1], -1)) - np.dot(np.roll(p[:, 0], -1), p[:, 1]))
+
+
+class ObjExportTests(unittest.TestCase):
+    def setUp(self):
+        # Two squares side by side sharing an edge, and a notched (concave) square below them
+        self.masks = [MeshMask(SQUARE, 1.0, 10.0, 0, 0, 1), MeshMask(SQUARE, 1.0, 10.0, 10, 0, 2),
+                      MeshMask(((0, 0), (10, 0), (4, 5), (10, 10), (0, 10)), 1.0, 10.0, 0, 10, 3)]
+
+    def test_default_is_one_ngon_per_mask(self):
+        text, err = generate_obj(self.masks, 100, 100, 10.0)
+        self.assertIsNone(err)
+        vertices, uvs, faces, objects = parse(text)
+        self.assertEqual(objects, ["mask_1", "mask_2", "mask_3"])
+        self.assertEqual((len(vertices), len(uvs)), (13, 13))
+        self.assertEqual(faces, [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11, 12]])
+        self.assertIn("f 1/1 2/2 3/3 4/4\n", text)
+
+    def test_weld_shares_coincident_vertices_between_masks(self):
+        vertices, uvs, faces, objects = parse(generate_obj(self.masks, 100, 100, 10.0, weld=True)[0])
+        self.assertEqual(len(objects), 3)
+        self.assertEqual(len(vertices), 9)  # 4 + 2 new for the second square + 3 new for the notched one
+        self.assertEqual(len(set(vertices)), len(vertices))
+        self.assertEqual(len(uvs), len(vertices))
+        self.assertEqual(len(set(faces[0]) & set(faces[1])), 2)
+
+    def test_triangulated_merged_mesh_covers_every_mask_facing_up(self):
+        vertices, _, faces, objects = parse(generate_obj(self.masks, 100, 100, 10.0, True, True, True)[0])
+        self.assertEqual(objects, ["atlas"])
+        self.assertTrue(all(len(face) == 3 for face in faces))
+        areas = [face_area(vertices, face) for face in faces]
+        self.assertTrue(all(area > 0 for area in areas))  # counter-clockwise with +Y up
+        self.assertAlmostEqual(sum(areas), 1 + 1 + 0.7)
+
+    def test_streamed_file_matches_generated_text(self):
+        for options in ((False, False, False), (True, True, False), (False, True, True)):
+            stream = io.StringIO()
+            self.assertIsNone(write_obj(stream, self.masks, 100, 100, 10.0, *options))
+            self.assertEqual(stream.getvalue(), generate_obj(self.masks, 100, 100, 10.0, *options)[0])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "atlas.obj")
+            self.assertEqual(write_obj(path, self.masks, 0, 100, 10.0), "Invalid atlas size.")
+            self.assertFalse(os.path.exists(path))
+            write_obj(path, self.masks, 100, 100, 10.0)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), generate_obj(self.masks, 100, 100, 10.0)[0])
+
+    def test_weld_points_uses_tolerance_across_cell_borders(self):
+        points = [(0.0, 0.0), (0.995, 0.0), (1.004, 0.0), (2.0, 0.0), (0.001, 0.0)]
+        np.testing.assert_array_equal(weld_points(points, 0.01), [0, 1, 1, 2, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from core.image_cache import DecodedImageCache
+from core.parallel_resample import ParallelResampler, ResampleJob, resample_all, resolve_worker_count, run_job
+from core.resample import resample_crop
+
+
+class ParallelResampleTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(7)
+        cls.paths = []
+        for i in range(2):
+            path = os.path.join(cls.tmp.name, f"src{i}.png")
+            Image.fromarray(rng.integers(0, 256, size=(64, 80, 4), dtype=np.uint8), "RGBA").save(path)
+            cls.paths.append(path)
+        cls.jobs = [
+            ResampleJob(cls.paths[0], (0, 0, 40, 30), (17, 13), "lanczos"),
+            ResampleJob(cls.paths[0], (5, 9, 60, 50), (31, 26), "kaiser", 4.0, 3),
+            ResampleJob(cls.paths[1], (10, 10, 20, 20), (45, 45), "nearest"),
+            ResampleJob(cls.paths[1], (0, 0, 80, 64), (20, 16), "kaiser", 3.0, 2),
+            ResampleJob(os.path.join(cls.tmp.name, "missing.png"), (0, 0, 4, 4), (2, 2)),
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def serial_results(self):
+        cache = DecodedImageCache()
+        out = []
+        for job in self.jobs:
+            try:
+                out.append(run_job(job, cache))
+            except OSError:
+                out.append(None)
+        return out
+
+    def test_pool_output_is_byte_identical_to_serial(self):
+        parallel = resample_all(self.jobs, workers=2)
+        for got, expected in zip(parallel, self.serial_results()):
+            if expected is None:
+                self.assertIsNone(got)
+            else:
+                self.assertEqual(got.tobytes(), expected.tobytes())
+
+    def test_cancel_stops_delivering_results(self):
+        resampler = ParallelResampler(workers=1)
+        delivered = []
+        finished = resampler.run(self.jobs, lambda i, arr: delivered.append(i), should_cancel=lambda: len(delivered) >= 2)
+        self.assertFalse(finished)
+        self.assertEqual(delivered, [0, 1])
+
+    def test_worker_count_auto(self):
+        self.assertEqual(resolve_worker_count(0), os.cpu_count() or 1)
+        self.assertEqual(resolve_worker_count("bad"), os.cpu_count() or 1)
+        self.assertEqual(resolve_worker_count(3), 3)
+
+
+class DraftDecodeResampleTests(unittest.TestCase):
+    def test_heavy_jpeg_downscale_stays_close_to_full_decode(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "src.jpg")
+            y, x = np.mgrid[0:1024, 0:1024].astype(np.float32)
+            rgb = np.stack([127 + 120 * np.sin(x / 41.0), 127 + 120 * np.cos(y / 29.0), x / 4.02], axis=-1)
+            Image.fromarray(rgb.astype(np.uint8)).save(path, quality=95)
+            full = Image.open(path).convert("RGBA")
+            for mode in ("lanczos", "kaiser"):
+                cache = DecodedImageCache()
+                job = ResampleJob(path, (30, 20, 960, 980), (96, 98), mode)
+                out = run_job(job, cache).astype(np.float64)
+                reference = np.asarray(resample_crop(full, job.rect, job.target_size, mode), dtype=np.float64)
+                self.assertEqual(cache.stats()["draft_decodes"], 1)
+                psnr = 10 * np.log10(255.0 ** 2 / np.mean((out - reference) ** 2))
+                self.assertGreater(psnr, 40.0, mode)
+
+
+if __name__ == "__main__":
+    unittest.main()
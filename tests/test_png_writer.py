@@ -0,0 +1,82 @@
+import io
+import unittest
+import zlib
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from core import png_writer
+from core.png_writer import FILTERS, PNG_PRESETS, PngPreset, PngStreamWriter, adler32_combine, write_png
+
+
+def photo_rows(rng, height, width):
+    """Smooth shading with grain and a few repeated rows, so every filter gets picked somewhere."""
+    y, x = np.mgrid[0:height, 0:width]
+    rgba = np.empty((height, width, 4), dtype=np.uint8)
+    for channel in range(4):
+        shade = 128 + 100 * np.sin((channel + 2) * y / height * 6) * np.cos((channel + 1) * x / width * 5)
+        rgba[..., channel] = np.clip(shade + rng.normal(0, 4, (height, width)), 0, 255)
+    rgba[height // 3:height // 2] = rgba[height // 3]
+    return rgba
+
+
+def encode(rgba, preset, workers=1, split=None):
+    out = io.BytesIO()
+    with PngStreamWriter(out, rgba.shape[1], rgba.shape[0], preset, workers) as writer:
+        for top in range(0, rgba.shape[0], split or max(1, rgba.shape[0])):
+            writer.write_rows(rgba[top:top + (split or rgba.shape[0])])
+    return out.getvalue()
+
+
+def decode(data):
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        return np.asarray(image)
+
+
+class PngWriterTests(unittest.TestCase):
+    def test_adler32_combine_matches_zlib(self):
+        rng = np.random.default_rng(0)
+        for left, right in ((0, 0), (1, 70000), (5552, 3), (100000, 65521)):
+            a, b = rng.integers(0, 256, left, dtype=np.uint8).tobytes(), rng.integers(0, 256, right, dtype=np.uint8).tobytes()
+            self.assertEqual(adler32_combine(zlib.adler32(a), zlib.adler32(b), len(b)), zlib.adler32(a + b))
+
+    def test_every_filter_and_preset_round_trips(self):
+        rgba = photo_rows(np.random.default_rng(1), 45, 37)
+        presets = [PngPreset(6, kind) for kind in FILTERS + ("adaptive",)] + list(PNG_PRESETS)
+        for preset in presets:
+            np.testing.assert_array_equal(decode(encode(rgba, preset)), rgba)
+
+    def test_bands_threads_and_splits_give_the_same_file(self):
+        rgba = photo_rows(np.random.default_rng(2), 301, 50)
+        with mock.patch.object(png_writer, "BAND_BYTES", 2000):  # ~10 rows per band, primed across bands
+            for preset in PNG_PRESETS:
+                expected = encode(rgba, preset)
+                self.assertEqual(encode(rgba, preset, workers=4), expected)
+                self.assertEqual(encode(rgba, preset, workers=3, split=17), expected)
+                self.assertEqual(encode(rgba, preset, split=1), expected)
+                data = decode(expected)
+                np.testing.assert_array_equal(data, rgba)
+
+    def test_zlib_stream_is_valid(self):
+        rgba = photo_rows(np.random.default_rng(3), 64, 64)
+        data = encode(rgba, "smallest", workers=2)
+        idat = b""
+        offset = len(png_writer.PNG_SIGNATURE)
+        while offset < len(data):
+            length = int.from_bytes(data[offset:offset + 4], "big")
+            if data[offset + 4:offset + 8] == b"IDAT":
+                idat += data[offset + 8:offset + 8 + length]
+            offset += 12 + length
+        self.assertEqual(len(zlib.decompress(idat)), 64 * (64 * 4 + 1))  # checks the combined adler32
+
+    def test_write_png_to_file(self):
+        rgba = photo_rows(np.random.default_rng(4), 9, 7)
+        out = io.BytesIO()
+        write_png(out, rgba, "fast", workers=0)
+        np.testing.assert_array_equal(decode(out.getvalue()), rgba)
+
+
+if __name__ == "__main__":
+    unittest.main()
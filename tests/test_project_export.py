@@ -0,0 +1,170 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+import cli
+from core.mip_flood import mip_flood
+from core.path_aliases import resolve_path
+from core.project_export import export_project, load_project_file, project_compositor, project_layout
+
+
+class ProjectExportTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        env = mock.patch.dict(os.environ, {"TP_TEST_ROOT": self.tmp})
+        env.start()
+        self.addCleanup(env.stop)
+        self.source = os.path.join(self.tmp, "src.png")
+        rgba = np.random.default_rng(4).integers(0, 256, (120, 160, 4), dtype=np.uint8)
+        Image.fromarray(rgba).save(self.source)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write_project(self, **settings):
+        project = {
+            "textures": {
+                "$TP_TEST_ROOT/src.png": {"masks": [
+                    {"id": 1, "points": [[5, 5], [100, 10], [90, 100], [8, 80]], "real_width": 1.0, "original_width": 95},
+                    {"id": 2, "points": [[110, 0], [160, 0], [160, 50]], "real_width": 0.25, "original_width": 50},
+                ]},
+                "/nowhere/legacy.png": {"points": [[0, 0], [10, 0], [10, 10]], "real_width": 1.0, "original_width": 10},
+            },
+            "items": [
+                {"filepath": "$TP_TEST_ROOT/src.png", "mask_id": 1, "x": 12.5, "y": 3},
+                {"filepath": "$TP_TEST_ROOT/src.png", "mask_id": 2, "x": 150, "y": 140},
+            ],
+            "atlas_size": 256,
+            "atlas_density": 64.0,
+        }
+        project.update(settings)
+        path = os.path.join(self.tmp, "project.json")
+        with open(path, "w") as f:
+            json.dump(project, f)
+        return path
+
+    def test_layout_resolves_paths_and_reports_missing_sources(self):
+        placements, meshes, missing = project_layout(load_project_file(self.write_project(resample_mode="nearest")))
+        self.assertEqual(missing, ["/nowhere/legacy.png"])
+        self.assertEqual([p.image_path for p in placements], [self.source, self.source])
+        self.assertEqual([(p.x, p.y) for p in placements], [(12, 3), (150, 140)])  # snapped in nearest mode
+        self.assertEqual([m.original_path for m in meshes], ["$TP_TEST_ROOT/src.png"] * 2)
+
+    def test_export_matches_compositor_and_writes_obj(self):
+        path = self.write_project(mip_flood=True, mip_flood_auto=False, mip_flood_levels=3)
+        png, obj = os.path.join(self.tmp, "atlas.png"), os.path.join(self.tmp, "atlas.obj")
+        report = export_project(path, png, obj)
+        self.assertEqual(report.fragments, 2)
+        self.assertEqual(list(report.timings), ["load", "png", "obj"])
+        project_data = load_project_file(path)
+        expected = mip_flood(project_compositor(project_data).composite(project_layout(project_data)[0]), 1, 3)
+        with Image.open(png) as image:
+            np.testing.assert_array_equal(np.asarray(image), expected)
+        with open(obj) as f:
+            text = f.read()
+        self.assertEqual(text.count("\no mask_"), 2)
+        self.assertIn("# atlas_size 256x256", text)
+
+    def test_unchanged_inputs_are_cache_hits(self):
+        path = self.write_project(mip_flood=True)
+        png, obj = os.path.join(self.tmp, "atlas.png"), os.path.join(self.tmp, "atlas.obj")
+        self.assertEqual(export_project(path, png, obj).cached, [])
+        self.assertEqual(export_project(path, png, obj).cached, ["png", "obj"])
+        self.assertEqual(export_project(path, png, obj, force=True).cached, [])
+        # Moving a fragment changes both outputs; touching the PNG alone only redoes the PNG
+        self.write_project(mip_flood=True, items=[{"filepath": "$TP_TEST_ROOT/src.png", "mask_id": 1, "x": 40, "y": 3}])
+        self.assertEqual(export_project(path, png, obj).cached, [])
+        os.utime(png, ns=(0, 0))
+        self.assertEqual(export_project(path, png, obj).cached, ["obj"])
+        # Settings that only affect the PNG
+        self.write_project(mip_flood=False, items=[{"filepath": "$TP_TEST_ROOT/src.png", "mask_id": 1, "x": 40, "y": 3}])
+        self.assertEqual(export_project(path, png, obj).cached, ["obj"])
+        project_data = load_project_file(path)
+        expected = project_compositor(project_data).composite(project_layout(project_data)[0])
+        with Image.open(png) as image:
+            np.testing.assert_array_equal(np.asarray(image), expected)
+        # A changed source file is a miss
+        os.utime(self.source, ns=(1, 1))
+        self.assertEqual(export_project(path, png, obj).cached, ["obj"])
+
+    def test_dds_export_and_format_override(self):
+        path = self.write_project(dds_format="bc1")
+        dds = os.path.join(self.tmp, "atlas.dds")
+        self.assertEqual(list(export_project(path, dds_path=dds).timings), ["load", "dds"])
+        with open(dds, "rb") as f:
+            self.assertEqual(f.read(88)[84:88], b"DXT1")
+        self.assertEqual(export_project(path, dds_path=dds).cached, ["dds"])
+        self.assertEqual(export_project(path, dds_path=dds, dds_format="bc7").cached, [])
+        with Image.open(dds) as image:
+            self.assertEqual(image.size, (256, 256))
+
+    def test_dds_over_budget_is_tiled_with_the_same_bytes(self):
+        path = self.write_project(mip_flood=True, dds_format="bc1")
+        whole, tiled = os.path.join(self.tmp, "whole.dds"), os.path.join(self.tmp, "tiled.dds")
+        export_project(path, dds_path=whole)
+        with mock.patch("core.project_export.write_dds", side_effect=AssertionError("composited in memory")):
+            export_project(path, dds_path=tiled, budget_bytes=64 * 1024)
+        with open(whole, "rb") as a, open(tiled, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_mip_export_writes_levels_next_to_png_and_into_dds(self):
+        path = self.write_project(mip_flood=True, mip_export=True, mip_export_levels=3, resample_mode="kaiser")
+        png, dds = os.path.join(self.tmp, "atlas.png"), os.path.join(self.tmp, "atlas.dds")
+        export_project(path, png_path=png, dds_path=dds)
+        for level, size in enumerate((128, 64, 32), 1):
+            with Image.open(os.path.join(self.tmp, f"atlas_mip{level}.png")) as image:
+                self.assertEqual(image.size, (size, size))
+        with open(dds, "rb") as f:
+            self.assertEqual(int.from_bytes(f.read(32)[28:32], "little"), 4)  # dwMipMapCount: atlas + 3 levels
+        self.assertEqual(export_project(path, png_path=png).cached, ["png"])
+        os.remove(os.path.join(self.tmp, "atlas_mip2.png"))
+        self.assertEqual(export_project(path, png_path=png).cached, [])
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, "atlas_mip2.png")))
+
+    def test_glb_export_and_merge_toggle(self):
+        glb = os.path.join(self.tmp, "atlas.glb")
+        path = self.write_project()
+        self.assertEqual(list(export_project(path, glb_path=glb).timings), ["load", "glb"])
+        with open(glb, "rb") as f:
+            self.assertEqual(f.read(4), b"glTF")
+        self.assertEqual(export_project(path, glb_path=glb).cached, ["glb"])
+        path = self.write_project(merge_meshes=True)
+        self.assertEqual(export_project(path, glb_path=glb).cached, [])
+
+    def test_obj_mesh_options(self):
+        obj = os.path.join(self.tmp, "atlas.obj")
+        export_project(self.write_project(), obj_path=obj)
+        path = self.write_project(obj_triangulate=True, obj_weld=True, merge_meshes=True)
+        self.assertEqual(export_project(path, obj_path=obj).cached, [])
+        with open(obj) as f:
+            lines = f.read().splitlines()
+        self.assertEqual([line for line in lines if line.startswith("o ")], ["o atlas"])
+        self.assertEqual(sum(line.startswith("f ") for line in lines), 3)  # quad + triangle
+        self.assertTrue(all(len(line.split()) == 4 for line in lines if line.startswith("f ")))
+        self.assertEqual(export_project(path, obj_path=obj).cached, ["obj"])
+
+    def test_alias_prefix_is_swapped_for_existing_path(self):
+        self.assertEqual(resolve_path("/stored/src.png", {"/stored": self.tmp}), self.source)
+        self.assertEqual(resolve_path("/other/src.png", {"/stored": self.tmp}), "/other/src.png")
+
+    def test_cli_exit_codes(self):
+        path = self.write_project()
+        obj = os.path.join(self.tmp, "out.obj")
+        common = ["--no-cache", "--aliases", os.path.join(self.tmp, "none.json")]
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(cli.main(["export", path, "--obj", obj] + common), cli.EXIT_MISSING_SOURCES)
+            self.assertEqual(cli.main(["export", path, "--obj", obj, "--allow-missing"] + common), cli.EXIT_OK)
+            self.assertEqual(cli.main(["export", os.path.join(self.tmp, "missing.json"), "--obj", obj] + common), cli.EXIT_FAILED)
+        self.assertTrue(os.path.exists(obj))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,24 @@ class ProjectSettingsTests(unittest.TestCase):
         self.assertEqual(settings["scale_reference_length"], 1.0)
         self.assertEqual(settings["scale_reference_unit"], "m")
 
+    def test_export_budget_has_default_and_minimum(self):
+        self.assertEqual(normalize_project_settings({})["export_budget_mb"], 1024)
+        self.assertEqual(normalize_project_settings({"export_budget_mb": 8})["export_budget_mb"], 64)
+
+    def test_decode_cache_budget_has_default_and_is_non_negative(self):
+        self.assertEqual(normalize_project_settings({})["decode_cache_mb"], 1024)
+        self.assertEqual(normalize_project_settings({"decode_cache_mb": -5})["decode_cache_mb"], 0)
+
+    def test_unknown_png_preset_falls_back_to_balanced(self):
+        self.assertEqual(normalize_project_settings({})["png_preset"], "balanced")
+        self.assertEqual(normalize_project_settings({"png_preset": "ultra"})["png_preset"], "balanced")
+        self.assertEqual(normalize_project_settings({"png_preset": "fast"})["png_preset"], "fast")
+
+    def test_mip_export_levels_are_non_negative(self):
+        self.assertEqual(normalize_project_settings({})["mip_export_levels"], 0)
+        self.assertEqual(normalize_project_settings({"mip_export_levels": -3})["mip_export_levels"], 0)
+        self.assertEqual(normalize_project_settings({"mip_export_levels": "4"})["mip_export_levels"], 4)
+
     def test_scale_reference_length_has_minimum(self):
         settings = normalize_project_settings({"scale_reference_length": 0.0})
         self.assertEqual(settings["scale_reference_length"], 0.01)
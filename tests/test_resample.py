@@ -0,0 +1,84 @@
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from core.resample import kaiser_resize
+
+
+def reference_kaiser_resize(image, target_size, radius, beta):
+    """Original per-row/per-column implementation, kept as the equivalence baseline."""
+    src = np.array(image, dtype=np.float32)
+    if src.ndim == 2:
+        src = src[:, :, None]
+    src_h, src_w, channels = src.shape
+    tgt_w, tgt_h = target_size
+
+    def kaiser_weight(dist):
+        mask = np.abs(dist) <= radius
+        out = np.zeros_like(dist, dtype=np.float32)
+        ratio = np.zeros_like(dist, dtype=np.float32)
+        ratio[mask] = dist[mask] / radius
+        window = np.zeros_like(dist, dtype=np.float32)
+        window[mask] = np.i0(beta * np.sqrt(1 - ratio[mask] ** 2)) / np.i0(beta)
+        out[mask] = np.sinc(dist[mask]) * window[mask]
+        return out
+
+    src_x = (np.arange(tgt_w) + 0.5) * src_w / tgt_w - 0.5
+    offsets = np.arange(-radius, radius + 1)
+    idx_x = np.clip(np.floor(src_x[:, None] + offsets).astype(int), 0, src_w - 1)
+    w_x = kaiser_weight(src_x[:, None] - idx_x)
+    w_x_sum = w_x.sum(axis=1, keepdims=True)
+    w_x = np.divide(w_x, w_x_sum, out=np.zeros_like(w_x), where=w_x_sum != 0)
+    tmp = np.empty((src_h, tgt_w, channels), dtype=np.float32)
+    for y in range(src_h):
+        tmp[y] = np.sum(src[y][idx_x] * w_x[:, :, None], axis=1)
+
+    src_y = (np.arange(tgt_h) + 0.5) * src_h / tgt_h - 0.5
+    idx_y = np.clip(np.floor(src_y[:, None] + offsets).astype(int), 0, src_h - 1)
+    w_y = kaiser_weight(src_y[:, None] - idx_y)
+    w_y_sum = w_y.sum(axis=1, keepdims=True)
+    w_y = np.divide(w_y, w_y_sum, out=np.zeros_like(w_y), where=w_y_sum != 0)
+    out = np.empty((tgt_h, tgt_w, channels), dtype=np.float32)
+    for x in range(tgt_w):
+        out[:, x, :] = np.sum(tmp[:, x, :][idx_y] * w_y[:, :, None], axis=1)
+
+    out = np.clip(out, 0, 255).astype(np.uint8)
+    if channels == 1:
+        out = out[:, :, 0]
+    return out
+
+
+class KaiserResizeTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1234)
+        self.rgba = Image.fromarray(rng.integers(0, 256, size=(37, 53, 4), dtype=np.uint8), "RGBA")
+
+    def assert_matches_reference(self, image, target_size, radius, beta):
+        got = np.asarray(kaiser_resize(image, target_size, radius, beta))
+        expected = reference_kaiser_resize(image, target_size, radius, beta)
+        self.assertEqual(got.shape, expected.shape)
+        diff = np.abs(got.astype(np.int16) - expected.astype(np.int16))
+        # Only float summation order differs, so at most one step of truncation
+        self.assertLessEqual(int(diff.max()), 1)
+        self.assertLess(np.count_nonzero(diff) / diff.size, 0.01)
+
+    def test_downscale_matches_reference(self):
+        self.assert_matches_reference(self.rgba, (19, 11), 2, 3.0)
+
+    def test_upscale_matches_reference(self):
+        self.assert_matches_reference(self.rgba, (80, 61), 3, 5.5)
+
+    def test_single_axis_change_matches_reference(self):
+        self.assert_matches_reference(self.rgba, (53, 20), 1, 0.5)
+
+    def test_grayscale_matches_reference(self):
+        gray = self.rgba.convert("L")
+        self.assert_matches_reference(gray, (26, 18), 2, 3.0)
+
+    def test_same_size_returns_input(self):
+        self.assertIs(kaiser_resize(self.rgba, self.rgba.size, 2, 3.0), self.rgba)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from core.image_cache import DecodedImageCache
+from core.resample import resample_crop
+from core import source_pyramid
+from core.source_pyramid import SourcePyramidCache, build_levels, resample_from_levels, select_level
+
+
+def psnr(a, b):
+    diff = np.asarray(a, dtype=np.float64) - np.asarray(b, dtype=np.float64)
+    mse = np.mean(diff ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def smooth_texture(width, height):
+    """Band-limited test pattern, so pre-filtering loses little real detail."""
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    rgba = np.empty((height, width, 4), dtype=np.uint8)
+    rgba[..., 0] = 127 + 120 * np.sin(x / 37.0) * np.cos(y / 53.0)
+    rgba[..., 1] = 127 + 120 * np.sin((x + y) / 71.0)
+    rgba[..., 2] = (x * 255 / width).astype(np.uint8)
+    rgba[..., 3] = 255
+    return Image.fromarray(rgba, mode="RGBA")
+
+
+class SelectLevelTests(unittest.TestCase):
+    def test_picks_smallest_level_still_above_target(self):
+        self.assertEqual(select_level((1000, 1000), (1000, 1000), 6), 0)
+        self.assertEqual(select_level((1000, 1000), (600, 600), 6), 0)
+        self.assertEqual(select_level((1000, 1000), (500, 500), 6), 1)
+        self.assertEqual(select_level((1000, 1000), (300, 300), 6), 1)
+        self.assertEqual(select_level((1000, 1000), (100, 100), 6), 3)
+
+    def test_limited_by_tighter_axis_and_level_count(self):
+        self.assertEqual(select_level((4000, 1000), (100, 250), 6), 2)
+        self.assertEqual(select_level((4096, 4096), (4, 4), 3), 3)
+
+    def test_upscale_uses_source(self):
+        self.assertEqual(select_level((50, 50), (200, 200), 6), 0)
+
+
+class BuildLevelsTests(unittest.TestCase):
+    def test_levels_halve_until_min_size(self):
+        levels = build_levels(Image.new("RGBA", (200, 130)), min_size=16)
+        self.assertEqual([lv.size for lv in levels], [(100, 65), (50, 33), (25, 17)])
+
+
+class PyramidQualityTests(unittest.TestCase):
+    def setUp(self):
+        self.source = smooth_texture(1536, 1024)
+        self.levels = [self.source] + build_levels(self.source)
+
+    def test_lanczos_matches_direct_path(self):
+        rect = (100, 60, 1200, 900)
+        direct = resample_crop(self.source, rect, (150, 112), "lanczos")
+        pyramid = resample_from_levels(self.levels, rect, (150, 112), "lanczos")
+        self.assertEqual(pyramid.size, direct.size)
+        self.assertGreater(psnr(pyramid, direct), 45.0)
+
+    def test_kaiser_matches_direct_path(self):
+        rect = (33, 17, 1400, 1000)
+        direct = resample_crop(self.source, rect, (170, 120), "kaiser", beta=3.0, radius=2)
+        pyramid = resample_from_levels(self.levels, rect, (170, 120), "kaiser", beta=3.0, radius=2)
+        self.assertEqual(pyramid.size, direct.size)
+        self.assertGreater(psnr(pyramid, direct), 45.0)
+
+
+class SourcePyramidCacheTests(unittest.TestCase):
+    def test_levels_are_built_once_per_source(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "src.png")
+        Image.new("RGB", (128, 64), (10, 20, 30)).save(path)
+        cache = SourcePyramidCache(decode_cache=DecodedImageCache())
+        first = cache.levels(path)
+        second = cache.levels(path)
+        self.assertEqual([lv.size for lv in first], [(128, 64), (64, 32), (32, 16)])
+        self.assertIs(first[1], second[1])
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["bytes"], (64 * 32 + 32 * 16) * 4)
+
+
+    def test_concurrent_misses_store_one_entry(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "src.png")
+        Image.new("RGB", (128, 64), (10, 20, 30)).save(path)
+        cache = SourcePyramidCache(decode_cache=DecodedImageCache())
+        both_missed = threading.Barrier(2, timeout=10)
+
+        def build_after_both_missed(source):
+            both_missed.wait()
+            return build_levels(source)
+
+        results = []
+        with mock.patch.object(source_pyramid, "build_levels", build_after_both_missed):
+            threads = [threading.Thread(target=lambda: results.append(cache.levels(path))) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertIs(results[0][1], results[1][1])
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["misses"]), (1, 2))
+        self.assertEqual(stats["bytes"], (64 * 32 + 32 * 16) * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from core.compositor import AtlasCompositor, FragmentPlacement
+from core.dds_export import write_dds
+from core.dilation import dilate
+from core.mip_export import mip_filter, mip_levels
+from core.mip_flood import mip_flood
+from core.png_writer import PngStreamWriter, write_png
+from core.tiled_export import RowFile, band_rows, export_dds_tiled, export_png_tiled, needs_tiling, tiled_mip_flood
+
+
+def sparse_atlas(rng, height, width, coverage=0.3):
+    rgba = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    rgba[..., 3] = np.where(rng.random((height, width)) < coverage, rgba[..., 3], 0)
+    return rgba
+
+
+def gradient_crop(job):
+    width, height = job.target_size
+    crop = np.empty((height, width, 4), dtype=np.uint8)
+    crop[..., 0] = (np.arange(width) % 251)[None, :]
+    crop[..., 1] = (np.arange(height) % 241)[:, None]
+    crop[..., 2] = 77
+    crop[..., 3] = 200
+    return crop
+
+
+class TiledExportTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_band_rows_are_even_and_bounded(self):
+        self.assertEqual(band_rows(1000, 1), 2)
+        rows = band_rows(1000, 10 ** 6)
+        self.assertEqual(rows % 2, 0)
+        self.assertLessEqual(rows * 1000 * 64, 10 ** 6)
+        self.assertTrue(needs_tiling(16384, 16384))
+        self.assertFalse(needs_tiling(2048, 2048))
+
+    def test_tiled_mip_flood_is_bit_identical(self):
+        rng = np.random.default_rng(9)
+        for height, width, levels in ((37, 53, 4), (64, 64, 0), (101, 17, 6), (1, 1, 0), (5, 3, 10)):
+            rgba = sparse_atlas(rng, height, width)
+            atlas = RowFile(self.tmp, rgba.shape, np.uint8)
+            atlas.rows(0, height)[...] = rgba
+            tiled_mip_flood(atlas, 1, levels, budget_bytes=1, work_dir=self.tmp)
+            np.testing.assert_array_equal(np.array(atlas.rows(0, height)), mip_flood(rgba, 1, levels))
+
+    def test_png_stream_round_trips(self):
+        rgba = sparse_atlas(np.random.default_rng(2), 23, 31)
+        path = os.path.join(self.tmp, "bands.png")
+        with PngStreamWriter(path, 31, 23) as writer:
+            for top in range(0, 23, 5):
+                writer.write_rows(rgba[top:top + 5])
+        with Image.open(path) as image:
+            self.assertEqual(image.mode, "RGBA")
+            np.testing.assert_array_equal(np.asarray(image), rgba)
+
+    def test_png_stream_rejects_missing_rows(self):
+        writer = PngStreamWriter(os.path.join(self.tmp, "short.png"), 4, 4)
+        writer.write_rows(np.zeros((2, 4, 4), dtype=np.uint8))
+        with self.assertRaises(ValueError):
+            writer.close()
+
+    def test_tiled_export_matches_in_memory_export(self):
+        points = ((0.5, 0.0), (100.0, 10.0), (90.0, 100.0), (5.0, 80.0))
+        placements = [FragmentPlacement("src.png", points, 1.0, 100.0, x, y) for x, y in ((0, 0), (60.0, 20.0), (130.5, 90.25))]
+        compositor = AtlasCompositor((256, 200), 100.0, fetch_crop=gradient_crop)
+        path = os.path.join(self.tmp, "atlas.png")
+        export_png_tiled(compositor, placements, path, budget_bytes=64 * 1024, mip_flood=(1, 0), work_dir=self.tmp)
+        expected = mip_flood(compositor.composite(placements), 1, 0)
+        with Image.open(path) as image:
+            np.testing.assert_array_equal(np.asarray(image), expected)
+        # Bands are compressed at fixed rows, so the file matches an in-memory encode byte for byte
+        in_memory = os.path.join(self.tmp, "in_memory.png")
+        write_png(in_memory, expected)
+        with open(path, "rb") as tiled, open(in_memory, "rb") as whole:
+            self.assertEqual(tiled.read(), whole.read())
+
+    def test_tiled_dilation_matches_in_memory_dilation(self):
+        points = ((0.0, 0.0), (40.0, 0.0), (40.0, 30.0), (0.0, 30.0))
+        placements = [FragmentPlacement("src.png", points, 0.4, 40.0, x, y) for x, y in ((3, 5), (150, 120))]
+        compositor = AtlasCompositor((200, 180), 100.0, fetch_crop=gradient_crop)
+        path = os.path.join(self.tmp, "dilated.png")
+        export_png_tiled(compositor, placements, path, budget_bytes=64 * 1024, dilation=(1, 24), work_dir=self.tmp)
+        expected = dilate(compositor.composite(placements), 1, 24)
+        with Image.open(path) as image:
+            np.testing.assert_array_equal(np.asarray(image), expected)
+
+    def test_tiled_dds_matches_in_memory_dds(self):
+        points = ((0.5, 0.0), (100.0, 10.0), (90.0, 100.0), (5.0, 80.0))
+        placements = [FragmentPlacement("src.png", points, 1.0, 100.0, x, y) for x, y in ((0, 0), (60.0, 20.0), (130.5, 90.25))]
+        compositor = AtlasCompositor((250, 198), 100.0, fetch_crop=gradient_crop)  # odd levels and partial blocks
+        atlas = mip_flood(compositor.composite(placements), 1, 0)
+        chain = (1, 0, mip_filter("lanczos"))
+        for fmt, mips, mip_chain, levels in (("bc3", True, None, None), ("bc1", True, chain, mip_levels(atlas, chain)),
+                                             ("bc7", False, None, None)):
+            path = os.path.join(self.tmp, f"atlas_{fmt}.dds")
+            export_dds_tiled(compositor, placements, path, 32 * 1024, fmt, mip_flood=(1, 0), mips=mips, mip_chain=mip_chain,
+                             work_dir=self.tmp)
+            expected = os.path.join(self.tmp, f"expected_{fmt}.dds")
+            write_dds(expected, atlas, fmt, mips, levels=levels)
+            with open(path, "rb") as tiled, open(expected, "rb") as whole:
+                self.assertEqual(tiled.read(), whole.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from core.triangulate import signed_area, triangulate_polygon
+
+
+def triangle_areas(points, triangles):
+    p = np.asarray(points, dtype=np.float64)
+    a, b, c = p[triangles[:, 0]], p[triangles[:, 1]], p[triangles[:, 2]]
+    return 0.5 * ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]))
+
+
+class TriangulateTests(unittest.TestCase):
+    def assert_covers(self, points):
+        triangles = triangulate_polygon(points)
+        areas = triangle_areas(points, triangles)
+        self.assertAlmostEqual(areas.sum(), signed_area(points), places=9)
+        self.assertTrue((np.sign(areas) == np.sign(signed_area(points))).all())  # same winding, none degenerate
+        return triangles
+
+    def test_concave_outlines_in_both_windings(self):
+        ell = [(0, 0), (4, 0), (4, 1), (1, 1), (1, 4), (0, 4)]
+        comb = [(0, 0), (5, 0), (5, 3), (4, 1), (3, 3), (2, 1), (1, 3), (0, 3)]
+        for outline in (ell, ell[::-1], comb, comb[::-1]):
+            self.assertEqual(len(self.assert_covers(outline)), len(outline) - 2)
+
+    def test_repeated_and_collinear_points_give_no_degenerate_triangles(self):
+        self.assert_covers([(0, 0), (2, 0), (2, 0), (4, 0), (4, 4), (0, 4)])
+        self.assert_covers([(0, 0), (4, 0), (4, 4), (4, 4), (2, 4), (0, 4), (0, 0)])
+
+    def test_star_with_many_reflex_vertices(self):
+        angles = np.linspace(0, 2 * np.pi, 400, endpoint=False)
+        radius = 1 + 0.5 * np.sin(angles * 37)
+        self.assert_covers(np.column_stack((radius * np.cos(angles), radius * np.sin(angles))))
+
+    def test_large_outlines_with_spikes_noise_and_collinear_runs(self):
+        angles = np.linspace(0, 2 * np.pi, 10000, endpoint=False)
+        circle = np.column_stack((np.cos(angles), np.sin(angles)))
+        self.assert_covers(circle * (1 + 0.5 * np.sin(angles * 401))[:, None])
+        self.assert_covers(circle * (1 + 0.3 * np.random.default_rng(1).random(10000))[:, None])
+        comb = [(0, 0)]
+        for x in range(0, 4000, 4):
+            comb += [(x + 1, 0), (x + 1, 10), (x + 2, 10), (x + 2, 5), (x + 3, 5), (x + 3, 0), (x + 4, 0)]
+        self.assert_covers(comb + [(4000, -3), (2000, -3), (0, -3)])
+
+    def test_degenerate_input_gives_no_triangles(self):
+        self.assertEqual(triangulate_polygon([(0, 0), (1, 1)]).shape, (0, 3))
+        self.assertEqual(triangulate_polygon([(0, 0), (1, 1), (2, 2)]).shape, (0, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,33 @@
 from collections import OrderedDict
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 import math
 import numpy as np
 import sys
 from pathlib import Path
 from PySide6.QtWidgets import QGraphicsView, QGraphicsScene, QWidget, QVBoxLayout, QGraphicsPixmapItem, QGraphicsItem, QProgressDialog, QApplication, QSizePolicy, QLabel, QMenu, QFileDialog, QMessageBox
-from PySide6.QtGui import QPixmap, QPainter, QPainterPath, QPolygonF, QColor, QBrush, QImage, QPen
-from PySide6.QtCore import Qt, QPointF, QRectF, Signal
-from PIL import Image, ImageChops
-from PIL.ImageQt import ImageQt
+from PySide6.QtGui import QPixmap, QPainter, QPolygonF, QColor, QBrush, QImage, QPen
+from PySide6.QtCore import Qt, QPointF, QRect, QRectF, QTimer, Signal
+from PIL import Image
+from core.compositor import AtlasCompositor, FragmentPlacement, fragment_geometry
+from core.coverage import masked_fragment, shared_coverage_cache
+from core.disk_cache import ResampleDiskCache
+from core.filter_tables import shared_filter_tables
+from core.fragment_store import FragmentStore
+from core.glb_export import build_glb_mesh
+from core.image_cache import shared_decode_cache, source_identity
+from core.incremental_export import TILE as EXPORT_TILE
+from core.mip_export import mip_filter
+from core.mip_flood import mip_flood
+from core.obj_export import MeshMask, generate_obj, write_obj
+from core.parallel_resample import ParallelResampler, ResampleJob, run_job
+from core.png_writer import DEFAULT_PNG_PRESET
+from core.resample import kaiser_resize
+from core.project_export import write_atlas_dds, write_atlas_png
+from core.tiled_export import DEFAULT_EXPORT_BUDGET, needs_tiling
+
+logger = logging.getLogger(__name__)
+
 try:
     from .view_utils import ZoomPanView
 except Exception:
@@ -30,6 +50,9 @@ class AtlasItem(QGraphicsPixmapItem):
         self.original_width = None
         self.mask_id = None
         self.locked = False
+        self.pending = False # Placeholder shown while the final pixmap is generated
+        self.failed = False # Background resample raised; the placeholder stays, outlined in dark red
+        self.fragment_key = None # Render inputs of the shared pixmap, None for placeholders
 
     def set_locked(self, locked: bool):
         """Lock/unlock item movement on the canvas."""
@@ -73,7 +96,31 @@ class AtlasItem(QGraphicsPixmapItem):
             self.export_to_png()
         event.accept()
 
+    def _mark_dirty(self, hidden_too=False):
+        scene = self.scene()
+        if hasattr(scene, "mark_dirty") and (hidden_too or self.isVisible()):
+            scene.mark_dirty(self.sceneBoundingRect())
+
+    def setPixmap(self, pixmap):
+        # Old and new footprint both change the exported atlas
+        self._mark_dirty()
+        super().setPixmap(pixmap)
+        self._mark_dirty()
+
     def itemChange(self, change, value):
+        if change in (QGraphicsItem.ItemSceneChange, QGraphicsItem.ItemSceneHasChanged,
+                      QGraphicsItem.ItemPositionChange, QGraphicsItem.ItemPositionHasChanged):
+            self._mark_dirty() # Footprint before and after the change
+        elif change == QGraphicsItem.ItemVisibleHasChanged:
+            self._mark_dirty(hidden_too=True)
+        if change == QGraphicsItem.ItemSceneChange and self.fragment_key is not None:
+            # Only items on a scene hold a reference to their shared pixmap
+            old_store = getattr(self.scene(), "fragment_store", None)
+            new_store = getattr(value, "fragment_store", None)
+            if old_store is not None:
+                old_store.release(self.fragment_key)
+            if new_store is not None:
+                self.setPixmap(new_store.acquire(self.fragment_key, self.pixmap()))
         if change == QGraphicsItem.ItemPositionChange:
             scene = self.scene()
             if scene and getattr(scene, "snap_items_to_pixel", False):
@@ -89,8 +136,13 @@ class AtlasItem(QGraphicsPixmapItem):
         if scene and getattr(scene, "exporting", False):
             return
 
-        # Draw border in editor view (locked items are black, otherwise blue)
-        border_color = Qt.black if self.locked else Qt.blue
+        # Draw border in editor view (locked items are black, pending placeholders gray, failed ones dark red, otherwise blue)
+        if self.locked:
+            border_color = Qt.black
+        elif self.failed:
+            border_color = Qt.darkRed
+        else:
+            border_color = Qt.gray if self.pending else Qt.blue
         pen = QPen(border_color, 0, Qt.DashLine) # Width 0 = Cosmetic (1px on screen)
         painter.setPen(pen)
         painter.drawRect(self.boundingRect())
@@ -106,6 +158,33 @@ class CanvasScene(QGraphicsScene):
         self.grid_enabled = False
         self.grid_step = 512.0 # Default density
         self.exporting = False
+        self.fragment_store = FragmentStore() # Pixmaps shared by items with identical render inputs
+        self.dirty_tiles = set() # (row, col) export tiles touched by item edits since the last export
+
+    def clear(self):
+        # Deleting items directly skips itemChange, so drop every reference at once
+        for item in self.items():
+            if isinstance(item, AtlasItem):
+                self.mark_dirty(item.sceneBoundingRect())
+        super().clear()
+        self.fragment_store.clear()
+
+    def mark_dirty(self, rect):
+        """Record the export tiles under a scene rect (+1 px for subpixel placement)."""
+        if rect.isEmpty():
+            return
+        top, left = max(0, math.floor(rect.top())), max(0, math.floor(rect.left()))
+        bottom, right = math.ceil(rect.bottom()) + 1, math.ceil(rect.right()) + 1
+        for row in range(top // EXPORT_TILE, (bottom - 1) // EXPORT_TILE + 1):
+            for col in range(left // EXPORT_TILE, (right - 1) // EXPORT_TILE + 1):
+                self.dirty_tiles.add((row, col))
+
+    def take_dirty_boxes(self):
+        """Dirty tiles as atlas boxes (left, top, right, bottom); tracking starts over."""
+        boxes = [(col * EXPORT_TILE, row * EXPORT_TILE, (col + 1) * EXPORT_TILE, (row + 1) * EXPORT_TILE)
+                 for row, col in sorted(self.dirty_tiles)]
+        self.dirty_tiles.clear()
+        return boxes
 
     def drawForeground(self, painter, rect):
         super().drawForeground(painter, rect)
@@ -163,6 +242,7 @@ class CanvasScene(QGraphicsScene):
 class CanvasWidget(QWidget):
     item_edit_requested = Signal(object) # AtlasItem
     hover_changed = Signal(float, float, float) # x, y, zoom
+    resample_failed = Signal(str, str) # image path, error
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -179,15 +259,33 @@ class CanvasWidget(QWidget):
         
         self.atlas_density = 512.0
         self.scene.grid_step = self.atlas_density
-        self._lanczos_cache = OrderedDict() # (path, rect, target_size) -> QImage
+        self._lanczos_cache = OrderedDict() # (path, rect, target_size) -> read-only RGBA array
         self._cache_limit = 32
+        self._decode_cache = shared_decode_cache() # decoded sources shared below _lanczos_cache
+        self._disk_cache = ResampleDiskCache() # resampled crops persisted across sessions
         self.resample_mode = "lanczos" # "lanczos", "kaiser", "nearest"
         self.kaiser_beta = 3.0
         self.kaiser_radius = 2
+        self.use_source_pyramid = False # Large downscales start from the nearest pre-filtered mip
+        self.resample_workers = 0 # 0 = one process per CPU, 1 = serial
+        self._parallel = ParallelResampler(self.resample_workers)
+        # Interactive edits resample on background threads; only the newest request per item is kept
+        self._background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="fragment")
+        self._background_jobs = {} # AtlasItem -> (future, job, points, geometry)
+        self._background_timer = QTimer(self)
+        self._background_timer.setInterval(30)
+        self._background_timer.timeout.connect(self._poll_background_jobs)
         self.scene.snap_items_to_pixel = False
         self.enable_mip_flood = False
         self.mip_flood_threshold = 1
         self.mip_flood_levels = 6
+        self.enable_dilation = False # Nearest-texel edge padding instead of mip flood
+        self.dilation_radius = 0 # px, 0 = fill the whole atlas
+        self.export_memory_budget = DEFAULT_EXPORT_BUDGET # bytes; larger atlases export in bands
+        self.incremental_export = False # Keep <file>.png.cache next to the PNG and redo only dirty tiles
+        self.png_preset = DEFAULT_PNG_PRESET # PNG_PRESETS name: compression level/filters of exported PNGs
+        self.enable_mip_export = False # Also write the filtered mip chain (<file>_mip<k>.png, DDS mip levels)
+        self.mip_export_levels = 0 # 0 = down to 1x1
         
         self.scene.selectionChanged.connect(self.on_selection_changed)
         self.view.viewport().setMouseTracking(True)
@@ -199,16 +297,19 @@ class CanvasWidget(QWidget):
         self.scene.grid_step = density
         self.scene.update() # Redraw grid
         if show_progress:
-            self.rebuild_items_with_progress("Updating density...")
-        else:
+            # Interactive density edit: rebuild in the background, superseding older requests
             for item in self.scene.items():
-                if isinstance(item, AtlasItem):
-                    self.regenerate_item_pixmap(item)
+                if isinstance(item, AtlasItem) and item.filepath and item.points and item.real_width and item.original_width:
+                    self._request_item_pixmap(item, item.filepath, item.points, item.real_width, item.original_width)
+        else:
+            self.rebuild_items_with_progress(None)
 
-    def set_resample_settings(self, mode, beta=None, radius=None):
+    def set_resample_settings(self, mode, beta=None, radius=None, use_pyramid=None):
         if mode not in ("lanczos", "kaiser", "nearest"):
             return
         self.resample_mode = mode
+        if use_pyramid is not None:
+            self.use_source_pyramid = bool(use_pyramid)
         # Toggle view smoothing for pixel art
         if self.view:
             self.view.setRenderHint(QPainter.SmoothPixmapTransform, mode != "nearest")
@@ -223,6 +324,10 @@ class CanvasWidget(QWidget):
         if self.scene.snap_items_to_pixel:
             self.snap_items_to_pixel()
 
+    def set_resample_workers(self, workers):
+        self.resample_workers = max(0, int(workers))
+        self._parallel.set_workers(self.resample_workers)
+
     def set_canvas_size(self, size):
         self.scene.setSceneRect(0, 0, size, size)
         self.scene.update() # Redraw border
@@ -250,13 +355,135 @@ class CanvasWidget(QWidget):
         if item.filepath and item.points and item.real_width and item.original_width:
             pixmap = self.create_masked_pixmap(item.filepath, item.points, item.real_width, item.original_width)
             if pixmap:
-                item.setPixmap(pixmap)
-                item.setScale(1.0)
-                # Respect pixel mode transform
-                if self.resample_mode == "nearest":
-                    item.setTransformationMode(Qt.FastTransformation)
-                else:
-                    item.setTransformationMode(Qt.SmoothTransformation)
+                self._apply_item_pixmap(item, pixmap, self._item_fragment_key(item.filepath, item.points, item.real_width, item.original_width))
+
+    def _apply_item_pixmap(self, item, pixmap, fragment_key=None):
+        """Show pixmap on item; with a fragment_key it is shared with every item rendered from the same inputs."""
+        # A synchronous result supersedes any background request for the item
+        self._cancel_background_job(item)
+        item.pending = False
+        item.failed = False
+        item.setToolTip("")
+        store = self.scene.fragment_store
+        on_scene = item.scene() is self.scene
+        if on_scene and item.fragment_key is not None:
+            store.release(item.fragment_key)
+        item.fragment_key = fragment_key
+        if on_scene and fragment_key is not None:
+            pixmap = store.acquire(fragment_key, pixmap)
+        item.setPixmap(pixmap)
+        item.setScale(1.0)
+        # Respect pixel mode transform
+        if self.resample_mode == "nearest":
+            item.setTransformationMode(Qt.FastTransformation)
+        else:
+            item.setTransformationMode(Qt.SmoothTransformation)
+
+    def _request_item_pixmap(self, item, image_path, points, real_width, original_width):
+        """Show a placeholder on item now and swap in the final pixmap when the background job ends.
+
+        Returns False if the fragment cannot be built (degenerate mask or unreadable source).
+        """
+        geometry = self._fragment_geometry(points, real_width, original_width)
+        if geometry is None:
+            return False
+        bounding_rect, scale_factor, target_size = geometry
+        fragment_key = self._fragment_key(image_path, points, geometry)
+        shared = self.scene.fragment_store.get(fragment_key)
+        if shared is not None:
+            self._apply_item_pixmap(item, shared, fragment_key)
+            return True
+        crop = self._cached_resampled_crop(image_path, bounding_rect, target_size)
+        if crop is not None:
+            self._apply_item_pixmap(item, self._compose_masked_pixmap(crop, points, target_size), fragment_key)
+            return True
+        try:
+            source_identity(image_path)
+        except OSError:
+            return False
+
+        self._apply_item_pixmap(item, self._placeholder_pixmap(image_path, points, geometry))
+        item.pending = True
+        job = self._resample_job(image_path, bounding_rect, target_size)
+        # Items waiting on the same crop (e.g. duplicates) share one background job
+        future = next((entry[0] for entry in self._background_jobs.values() if entry[1] == job), None)
+        if future is None:
+            future = self._background.submit(run_job, job, self._decode_cache)
+        self._background_jobs[item] = (future, job, points, geometry)
+        if not self._background_timer.isActive():
+            self._background_timer.start()
+        return True
+
+    def _cancel_background_job(self, item):
+        entry = self._background_jobs.pop(item, None)
+        if entry and not any(other[0] is entry[0] for other in self._background_jobs.values()):
+            entry[0].cancel() # Started jobs finish, but their result is dropped
+
+    def _poll_background_jobs(self):
+        stored = {} # future -> QImage, so a job shared by several items is stored once
+        for item, (future, job, points, geometry) in list(self._background_jobs.items()):
+            if not future.done():
+                continue
+            del self._background_jobs[item]
+            try:
+                arr = future.result()
+            except Exception as e:
+                # Keep the placeholder but mark it, so it is not mistaken for the final pixmap
+                message = f"{type(e).__name__}: {e}"
+                item.pending = False
+                item.failed = True
+                item.setToolTip(f"Resample failed: {message}")
+                item.update()
+                if future not in stored:
+                    stored[future] = None
+                    logger.exception("Background resample of %s failed", job.image_path)
+                    self.resample_failed.emit(job.image_path, message)
+                continue
+            if future not in stored:
+                stored[future] = self._store_resampled_crop(job, arr)
+            if item.scene() is self.scene:
+                fragment_key = self._fragment_key(job.image_path, points, geometry)
+                pixmap = self.scene.fragment_store.get(fragment_key)
+                if pixmap is None:
+                    pixmap = self._compose_masked_pixmap(stored[future], points, geometry[2])
+                self._apply_item_pixmap(item, pixmap, fragment_key)
+        if not self._background_jobs:
+            self._background_timer.stop()
+
+    def finish_background_jobs(self):
+        """Block until every pending placeholder has its final pixmap (used before export)."""
+        while self._background_jobs:
+            wait([entry[0] for entry in self._background_jobs.values()])
+            self._poll_background_jobs()
+
+    def shutdown_workers(self):
+        for item in list(self._background_jobs):
+            self._cancel_background_job(item)
+        self._background_timer.stop()
+        self._background.shutdown(wait=False, cancel_futures=True)
+        self._parallel.shutdown()
+
+    def _placeholder_pixmap(self, image_path, points, geometry):
+        """Cheap stand-in: nearest-neighbour preview if the source is already decoded, else an outline."""
+        bounding_rect, scale_factor, target_size = geometry
+        source = self._decode_cache.peek(image_path)
+        if source is not None:
+            box = (bounding_rect.left(), bounding_rect.top(), bounding_rect.left() + bounding_rect.width(), bounding_rect.top() + bounding_rect.height())
+            preview = np.asarray(source.crop(box).resize(target_size, Image.NEAREST))
+            return self._compose_masked_pixmap(preview, points, target_size)
+
+        target_image = QImage(target_size[0], target_size[1], QImage.Format_ARGB32)
+        target_image.fill(Qt.transparent)
+        painter = QPainter(target_image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(QColor(220, 220, 220, 200), 1, Qt.DashLine))
+        painter.setBrush(QColor(128, 128, 128, 60))
+        painter.drawPolygon(QPolygonF([
+            QPointF((x - bounding_rect.left()) * scale_factor, (y - bounding_rect.top()) * scale_factor)
+            for x, y in points
+        ]))
+        painter.end()
+        return QPixmap.fromImage(target_image)
 
     def _run_single_with_progress(self, title, func):
         dlg = QProgressDialog(title, None, 0, 0, self)
@@ -269,30 +496,96 @@ class CanvasWidget(QWidget):
         dlg.close()
 
     def rebuild_items_with_progress(self, title):
+        """Regenerate every item's pixmap; title=None rebuilds without a progress dialog."""
         items = [i for i in self.scene.items() if isinstance(i, AtlasItem)]
-        total = len(items)
-        if total == 0:
+        if not items:
             return
-        dlg = QProgressDialog(title, None, 0, total, self)
-        dlg.setWindowModality(Qt.ApplicationModal)
-        dlg.setMinimumDuration(0)
-        dlg.setStyleSheet("QProgressDialog { background: #2a2c32; color: #f0f0f2; } QProgressBar { background: #22242a; border: 1px solid #3f414a; }")
-        dlg.show()
-        for idx, item in enumerate(items, start=1):
+        requests = [(i.filepath, i.points, i.real_width, i.original_width) for i in items]
+        pixmaps = self.build_pixmaps(requests, title)
+        for item, request, pixmap in zip(items, requests, pixmaps):
+            if pixmap:
+                self._apply_item_pixmap(item, pixmap, self._item_fragment_key(*request))
+
+    def build_pixmaps(self, requests, title=None):
+        """Build masked pixmaps for (image_path, points, real_width, original_width) requests.
+
+        Cache misses are resampled in the process pool; pixmaps are composed here on the
+        GUI thread as results arrive. Returns a list aligned with requests, None where a
+        fragment failed or the progress dialog was cancelled.
+        """
+        results = [None] * len(requests)
+        jobs = []
+        job_owners = []
+        job_index = {}
+        built = {} # fragment key -> pixmap, so duplicate requests are composed once
+        for idx, (image_path, points, real_width, original_width) in enumerate(requests):
+            if not (image_path and points and real_width and original_width):
+                continue
+            geometry = self._fragment_geometry(points, real_width, original_width)
+            if geometry is None:
+                continue
+            bounding_rect, scale_factor, target_size = geometry
+            fragment_key = self._fragment_key(image_path, points, geometry)
+            if fragment_key in built:
+                results[idx] = built[fragment_key] # Identical fragment earlier in requests
+                continue
+            shared = self.scene.fragment_store.get(fragment_key)
+            if shared is not None:
+                results[idx] = built[fragment_key] = shared
+                continue
+            crop = self._cached_resampled_crop(image_path, bounding_rect, target_size)
+            if crop is not None:
+                results[idx] = built[fragment_key] = self._compose_masked_pixmap(crop, points, target_size)
+                continue
+            job = self._resample_job(image_path, bounding_rect, target_size)
+            if job not in job_index:
+                job_index[job] = len(jobs)
+                jobs.append(job)
+                job_owners.append([])
+            job_owners[job_index[job]].append((idx, geometry))
+        if not jobs:
+            return results
+
+        dlg = None
+        if title:
+            dlg = QProgressDialog(title, "Cancel", 0, len(jobs), self)
+            dlg.setWindowModality(Qt.ApplicationModal)
+            dlg.setMinimumDuration(0)
+            dlg.setStyleSheet("QProgressDialog { background: #2a2c32; color: #f0f0f2; } QProgressBar { background: #22242a; border: 1px solid #3f414a; }")
+            dlg.show()
             QApplication.processEvents()
-            self.regenerate_item_pixmap(item)
-            dlg.setValue(idx)
-            if dlg.wasCanceled():
-                break
-        dlg.close()
+        done = [0]
+
+        def on_result(job_idx, arr):
+            done[0] += 1
+            if dlg:
+                dlg.setValue(done[0])
+            if arr is None:
+                return
+            crop = self._store_resampled_crop(jobs[job_idx], arr)
+            for idx, geometry in job_owners[job_idx]:
+                image_path, points = requests[idx][:2]
+                fragment_key = self._fragment_key(image_path, points, geometry)
+                if fragment_key not in built:
+                    built[fragment_key] = self._compose_masked_pixmap(crop, points, geometry[2])
+                results[idx] = built[fragment_key]
+
+        def should_cancel():
+            QApplication.processEvents()
+            return bool(dlg and dlg.wasCanceled())
+
+        self._parallel.run(jobs, on_result, should_cancel)
+        if dlg:
+            dlg.close()
+        return results
 
     def on_selection_changed(self):
         selected = self.scene.selectedItems()
         if len(selected) == 1 and isinstance(selected[0], AtlasItem):
             self.item_edit_requested.emit(selected[0])
 
-    def _get_resampled_crop(self, image_path, rect, target_size):
-        key = (
+    def _resample_key(self, image_path, rect, target_size):
+        return (
             image_path,
             rect.left(),
             rect.top(),
@@ -303,149 +596,159 @@ class CanvasWidget(QWidget):
             self.resample_mode,
             round(self.kaiser_beta, 3),
             int(self.kaiser_radius),
+            self.use_source_pyramid,
+        )
+
+    def _fragment_key(self, image_path, points, geometry):
+        """Every input that shapes a masked fragment pixmap; equal keys render identical pixels."""
+        bounding_rect, scale_factor, target_size = geometry
+        return (
+            self._resample_key(image_path, bounding_rect, target_size),
+            tuple((float(x), float(y)) for x, y in points),
+            round(scale_factor, 9),
         )
+
+    def _item_fragment_key(self, image_path, points, real_width, original_width):
+        geometry = self._fragment_geometry(points, real_width, original_width)
+        return self._fragment_key(image_path, points, geometry) if geometry else None
+
+    def _resample_job(self, image_path, rect, target_size):
+        return ResampleJob(
+            image_path,
+            (rect.left(), rect.top(), rect.width(), rect.height()),
+            tuple(target_size),
+            self.resample_mode,
+            self.kaiser_beta,
+            int(self.kaiser_radius),
+            self.use_source_pyramid,
+        )
+
+    def _cached_resampled_crop(self, image_path, rect, target_size):
+        """Memory or disk cache lookup only; returns None when the crop must be resampled."""
+        key = self._resample_key(image_path, rect, target_size)
         if key in self._lanczos_cache:
             self._lanczos_cache.move_to_end(key)
             return self._lanczos_cache[key]
-        
         try:
-            img = Image.open(image_path).convert("RGBA")
-            box = (rect.left(), rect.top(), rect.left() + rect.width(), rect.top() + rect.height())
-            cropped = img.crop(box)
-            if self.resample_mode == "kaiser":
-                resized = self._kaiser_resize(cropped, target_size, self.kaiser_radius, self.kaiser_beta)
-            elif self.resample_mode == "nearest":
-                resized = cropped.resize(target_size, Image.NEAREST)
-            else:
-                resized = cropped.resize(target_size, Image.LANCZOS)
-            qimg = ImageQt(resized).copy() # Detach from PIL buffer
-        except Exception:
+            job = self._resample_job(image_path, rect, target_size)
+            cached = self._disk_cache.get(job.cache_key())
+        except OSError:
+            return None
+        if cached is None:
             return None
+        crop = np.array(cached) # Detach from the memory-mapped file so it can be pruned
+        self._remember_crop(key, crop)
+        return crop
 
-        self._lanczos_cache[key] = qimg
+    def _store_resampled_crop(self, job, arr):
+        """Persist a freshly resampled crop and keep it in the memory cache."""
+        try:
+            self._disk_cache.put(job.cache_key(), arr)
+        except OSError:
+            pass
+        rect = QRect(*job.rect)
+        self._remember_crop(self._resample_key(job.image_path, rect, job.target_size), arr)
+        return arr
+
+    def _remember_crop(self, key, crop):
+        crop.setflags(write=False) # Shared by every fragment cut from it
+        self._lanczos_cache[key] = crop
+        self._lanczos_cache.move_to_end(key)
         if len(self._lanczos_cache) > self._cache_limit:
             self._lanczos_cache.popitem(last=False)
-        return qimg
+
+    def _get_resampled_crop(self, image_path, rect, target_size):
+        crop = self._cached_resampled_crop(image_path, rect, target_size)
+        if crop is not None:
+            return crop
+        job = self._resample_job(image_path, rect, target_size)
+        try:
+            arr = run_job(job, self._decode_cache)
+        except Exception:
+            return None
+        return self._store_resampled_crop(job, arr)
+
+    def set_decode_cache_budget(self, budget_bytes):
+        self._decode_cache.set_budget(budget_bytes)
+
+    def decode_cache_stats(self):
+        return self._decode_cache.stats()
+
+    def set_disk_cache(self, cache_dir=None, max_bytes=None, enabled=True):
+        if cache_dir is not None:
+            self._disk_cache = ResampleDiskCache(cache_dir)
+        if max_bytes is not None:
+            self._disk_cache.max_bytes = max(0, int(max_bytes))
+        self._disk_cache.enabled = enabled
+
+    def disk_cache_stats(self):
+        return self._disk_cache.stats()
+
+    def filter_table_stats(self):
+        return shared_filter_tables().stats()
+
+    def coverage_cache_stats(self):
+        return shared_coverage_cache().stats()
+
+    def fragment_store_stats(self):
+        return self.scene.fragment_store.stats()
+
+    def _fragment_geometry(self, points, real_width, original_width):
+        """Source bbox, scale and target size of a mask on the atlas, or None if degenerate."""
+        geometry = fragment_geometry(points, real_width, original_width, self.atlas_density)
+        if geometry is None:
+            return None
+        bbox, scale_factor, target_size = geometry
+        return QRect(*bbox), scale_factor, target_size
 
     def create_masked_pixmap(self, image_path, points, real_width, original_width):
-        poly = QPolygonF([QPointF(x, y) for x, y in points])
-        bounding_rect = poly.boundingRect().toAlignedRect()
-        
-        if bounding_rect.width() <= 0 or bounding_rect.height() <= 0:
+        geometry = self._fragment_geometry(points, real_width, original_width)
+        if geometry is None:
             return None
-        
-        # Compute target size on atlas using density
-        scale_factor = (self.atlas_density * real_width) / original_width
-        target_w = max(1, int(round(bounding_rect.width() * scale_factor)))
-        target_h = max(1, int(round(bounding_rect.height() * scale_factor)))
+        bounding_rect, scale_factor, target_size = geometry
+        shared = self.scene.fragment_store.get(self._fragment_key(image_path, points, geometry))
+        if shared is not None:
+            return shared # Same inputs as an item already on the canvas
         
         # Get resampled crop (Lanczos or Kaiser)
-        src_qimage = self._get_resampled_crop(image_path, bounding_rect, (target_w, target_h))
-        if src_qimage is None:
+        crop = self._get_resampled_crop(image_path, bounding_rect, target_size)
+        if crop is None:
             return None
+        return self._compose_masked_pixmap(crop, points, target_size)
 
-        src_pixmap = QPixmap.fromImage(src_qimage)
-        target_image = QImage(target_w, target_h, QImage.Format_ARGB32)
-        target_image.fill(Qt.transparent)
-        
-        painter = QPainter(target_image)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        path = QPainterPath()
-        # Scale polygon to the target size
-        scaled_points = [
-            QPointF((x - bounding_rect.left()) * scale_factor, (y - bounding_rect.top()) * scale_factor)
-            for x, y in points
-        ]
-        path.addPolygon(QPolygonF(scaled_points))
-        
-        painter.setClipPath(path)
-        painter.drawPixmap(0, 0, src_pixmap)
-        painter.end()
-
-        return QPixmap.fromImage(target_image)
+    def _compose_masked_pixmap(self, crop, points, target_size):
+        """Mask an RGBA crop array straight into a QImage buffer; QPixmap.fromImage is the only conversion."""
+        height, width = crop.shape[:2]
+        image = QImage(width, height, QImage.Format_RGBA8888)
+        bits = np.frombuffer(image.bits(), dtype=np.uint8).reshape(height, image.bytesPerLine())
+        masked_fragment(crop, points, target_size, out=bits[:, :width * 4].reshape(height, width, 4))
+        return QPixmap.fromImage(image)
 
     def _kaiser_resize(self, image: Image.Image, target_size, radius: int, beta: float) -> Image.Image:
         """Resize using separable Kaiser-windowed sinc filter."""
-        src = np.array(image, dtype=np.float32)
-        if src.ndim == 2:
-            src = src[:, :, None]
-        src_h, src_w, channels = src.shape
-        tgt_w, tgt_h = target_size
-        if tgt_w <= 0 or tgt_h <= 0:
-            return image
-        if tgt_w == src_w and tgt_h == src_h:
-            return image
-
-        taps = 2 * radius + 1
-
-        def kaiser_weight(dist):
-            """dist: array, |dist| <= radius."""
-            mask = np.abs(dist) <= radius
-            out = np.zeros_like(dist, dtype=np.float32)
-            # Kaiser window
-            ratio = np.zeros_like(dist, dtype=np.float32)
-            ratio[mask] = dist[mask] / radius
-            window = np.zeros_like(dist, dtype=np.float32)
-            window[mask] = np.i0(beta * np.sqrt(1 - ratio[mask] ** 2)) / np.i0(beta)
-            out[mask] = np.sinc(dist[mask]) * window[mask]
-            return out
-
-        # Horizontal weights/indices
-        src_x = (np.arange(tgt_w) + 0.5) * src_w / tgt_w - 0.5
-        offsets = np.arange(-radius, radius + 1)
-        idx_x = np.floor(src_x[:, None] + offsets).astype(int)
-        idx_x = np.clip(idx_x, 0, src_w - 1)
-        dist_x = src_x[:, None] - idx_x
-        w_x = kaiser_weight(dist_x)
-        w_x_sum = w_x.sum(axis=1, keepdims=True)
-        w_x = np.divide(w_x, w_x_sum, out=np.zeros_like(w_x), where=w_x_sum != 0)
-
-        # Horizontal resample
-        tmp = np.empty((src_h, tgt_w, channels), dtype=np.float32)
-        for y in range(src_h):
-            row = src[y]  # (src_w, ch)
-            gathered = row[idx_x]  # (tgt_w, taps, ch)
-            tmp[y] = np.sum(gathered * w_x[:, :, None], axis=1)
-
-        # Vertical weights/indices
-        src_y = (np.arange(tgt_h) + 0.5) * src_h / tgt_h - 0.5
-        idx_y = np.floor(src_y[:, None] + offsets).astype(int)
-        idx_y = np.clip(idx_y, 0, src_h - 1)
-        dist_y = src_y[:, None] - idx_y
-        w_y = kaiser_weight(dist_y)
-        w_y_sum = w_y.sum(axis=1, keepdims=True)
-        w_y = np.divide(w_y, w_y_sum, out=np.zeros_like(w_y), where=w_y_sum != 0)
-
-        # Vertical resample
-        out = np.empty((tgt_h, tgt_w, channels), dtype=np.float32)
-        for x in range(tgt_w):
-            col = tmp[:, x, :]  # (src_h, ch)
-            gathered = col[idx_y]  # (tgt_h, taps, ch)
-            out[:, x, :] = np.sum(gathered * w_y[:, :, None], axis=1)
-
-        out = np.clip(out, 0, 255).astype(np.uint8)
-        if channels == 1:
-            out = out[:, :, 0]
-        return Image.fromarray(out, mode=image.mode)
-
-    def add_fragment(self, image_path, points, real_width, original_width, mask_id=None, show_progress=False, original_path=None):
+        return kaiser_resize(image, target_size, radius, beta)
+
+    def add_fragment(self, image_path, points, real_width, original_width, mask_id=None, show_progress=False, original_path=None, pixmap=None, background=False):
+        """Add an AtlasItem; with background=True it appears at once with a placeholder pixmap."""
         def build():
             return self.create_masked_pixmap(image_path, points, real_width, original_width)
 
-        if show_progress:
-            container = {}
-            def work():
-                container['pixmap'] = build()
-            self._run_single_with_progress("Resampling fragment...", work)
-            pixmap = container.get('pixmap')
-        else:
-            pixmap = build()
+        if background and pixmap is None:
+            pixmap = QPixmap() # Replaced by _request_item_pixmap below
+        elif pixmap is None: # Not prebuilt by build_pixmaps
+            if show_progress:
+                container = {}
+                def work():
+                    container['pixmap'] = build()
+                self._run_single_with_progress("Resampling fragment...", work)
+                pixmap = container.get('pixmap')
+            else:
+                pixmap = build()
 
-        if not pixmap:
+        if pixmap is None or (pixmap.isNull() and not background):
             return
 
-        item = AtlasItem(pixmap)
+        item = AtlasItem(QPixmap())
         item.setPos(0, 0) 
         if self.scene.snap_items_to_pixel:
             pos = item.pos()
@@ -465,6 +768,12 @@ class CanvasWidget(QWidget):
         item.setData(Qt.UserRole + 2, original_width)
         
         self.scene.addItem(item)
+        if background:
+            if not self._request_item_pixmap(item, image_path, points, real_width, original_width):
+                self.scene.removeItem(item)
+                return
+        else:
+            self._apply_item_pixmap(item, pixmap, self._item_fragment_key(image_path, points, real_width, original_width))
         item.setScale(1.0)
         if self.resample_mode == "nearest":
             item.setTransformationMode(Qt.FastTransformation)
@@ -472,11 +781,15 @@ class CanvasWidget(QWidget):
             item.setTransformationMode(Qt.SmoothTransformation)
         return item
 
-    def update_item(self, item, points, real_width, original_width, mask_id=None, show_progress=False):
+    def update_item(self, item, points, real_width, original_width, mask_id=None, show_progress=False, background=False):
         def build():
             return self.create_masked_pixmap(item.filepath, points, real_width, original_width)
 
-        if show_progress:
+        if background:
+            if not self._request_item_pixmap(item, item.filepath, points, real_width, original_width):
+                return
+            pixmap = item.pixmap() # Placeholder or cached final pixmap
+        elif show_progress:
             container = {}
             def work():
                 container['pixmap'] = build()
@@ -488,7 +801,8 @@ class CanvasWidget(QWidget):
         if not pixmap:
             return
         
-        item.setPixmap(pixmap)
+        if not background:
+            self._apply_item_pixmap(item, pixmap, self._item_fragment_key(item.filepath, points, real_width, original_width))
         item.points = points
         item.real_width = real_width
         item.original_width = original_width
@@ -509,177 +823,113 @@ class CanvasWidget(QWidget):
         
         item.setScale(1.0)
 
-    def generate_obj(self):
-        """Generate an OBJ string with one object per mask (AtlasItem)."""
-        items = [it for it in self.scene.items() if isinstance(it, AtlasItem)]
-        if not items:
-            return None, "No items on atlas to export."
+    def mesh_masks(self):
+        """MeshMask of every AtlasItem, the input of the mesh exporters."""
+        masks = []
+        for item in self.scene.items():
+            if isinstance(item, AtlasItem):
+                pos = item.pos()
+                masks.append(MeshMask(item.points, item.real_width, item.original_width, pos.x(), pos.y(),
+                                      getattr(item, "mask_id", None), getattr(item, "original_filepath", "")))
+        return masks
 
+    def generate_obj(self, triangulate=False, weld=False, merged=False):
+        """Generate an OBJ string with one object per mask (AtlasItem), or one merged object."""
         atlas_rect = self.scene.sceneRect()
-        atlas_w = atlas_rect.width()
-        atlas_h = atlas_rect.height()
-        if atlas_w <= 0 or atlas_h <= 0:
-            return None, "Invalid atlas size."
-
-        # Sort for determinism: mask_id, original path, position
-        items.sort(key=lambda it: (
-            getattr(it, "mask_id", 0) or 0,
-            getattr(it, "original_filepath", "") or "",
-            it.pos().x(),
-            it.pos().y(),
-        ))
-
-        lines = [
-            "# Texture Atlas Editor OBJ export",
-            f"# atlas_size {int(atlas_w)}x{int(atlas_h)}",
-            f"# atlas_density_px_per_m {self.atlas_density}",
-            "# coordinate system: origin at atlas top-left, exported with +Y up (Blender-friendly)",
-        ]
-
-        v_idx = 1
-        vt_idx = 1
-
-        for idx, item in enumerate(items, start=1):
-            if not item.points or not item.real_width or not item.original_width:
-                continue
+        return generate_obj(self.mesh_masks(), atlas_rect.width(), atlas_rect.height(), self.atlas_density,
+                            triangulate, weld, merged)
 
-            poly = QPolygonF([QPointF(x, y) for x, y in item.points])
-            bbox = poly.boundingRect().toAlignedRect()
-            if bbox.width() <= 0 or bbox.height() <= 0:
-                continue
+    def write_obj(self, path, triangulate=False, weld=False, merged=False):
+        """Stream the OBJ of generate_obj into path; returns an error string or None."""
+        atlas_rect = self.scene.sceneRect()
+        return write_obj(path, self.mesh_masks(), atlas_rect.width(), atlas_rect.height(), self.atlas_density,
+                         triangulate, weld, merged)
+
+    def generate_glb(self, merged=False):
+        """Triangulated GlbMesh of the masks (one mesh per mask, or one merged mesh); (mesh, error) like generate_obj."""
+        atlas_rect = self.scene.sceneRect()
+        return build_glb_mesh(self.mesh_masks(), atlas_rect.width(), atlas_rect.height(), self.atlas_density, merged)
 
-            scale = (self.atlas_density * item.real_width) / item.original_width
-            # Points on atlas in pixels (top-left origin, +Y down)
-            scaled_points = []
-            for x, y in item.points:
-                local_x = (x - bbox.left()) * scale
-                local_y = (y - bbox.top()) * scale
-                atlas_x = item.pos().x() + local_x
-                atlas_y = item.pos().y() + local_y
-                scaled_points.append((atlas_x, atlas_y))
-
-            # Flip Y to Blender's +Y up; reverse order to keep normal winding
-            flipped_points = [(ax, atlas_h - ay) for ax, ay in scaled_points]
-            flipped_points = list(reversed(flipped_points))
-            uv_points = list(reversed(scaled_points))
-
-            mask_id = getattr(item, "mask_id", None) or idx
-            lines.append(f"o mask_{mask_id}")
-
-            # Vertex positions in meters, Z=0
-            for ax, ay in flipped_points:
-                mx = ax / self.atlas_density
-                my = ay / self.atlas_density
-                lines.append(f"v {mx:.6f} {my:.6f} 0.000000")
-
-            # UVs normalized to atlas size, V flipped to bottom-left origin (Blender-friendly), order matches face
-            for ax, ay in uv_points:
-                u = ax / atlas_w
-                v = 1.0 - (ay / atlas_h)
-                lines.append(f"vt {u:.6f} {v:.6f}")
-
-            # One face per mask (n-gon), matching vertex/uv order
-            face = " ".join(f"{v_idx + i}/{vt_idx + i}" for i in range(len(flipped_points)))
-            lines.append(f"f {face}")
-
-            v_idx += len(flipped_points)
-            vt_idx += len(flipped_points)
-
-        return "\n".join(lines) + "\n", None
+    def export_padding(self):
+        """(mip_flood, dilation) arguments of the export writers from the toolbar toggles."""
+        flood = (self.mip_flood_threshold, self.mip_flood_levels) if self.enable_mip_flood else None
+        dilation = (self.mip_flood_threshold, self.dilation_radius) if self.enable_dilation else None
+        return flood, dilation
+
+    def export_mip_chain(self):
+        """mip_chain argument of the export writers: reduced with the canvas resampler, or None when off."""
+        if not self.enable_mip_export:
+            return None
+        return (self.mip_flood_threshold, self.mip_export_levels,
+                mip_filter(self.resample_mode, self.kaiser_beta, int(self.kaiser_radius)))
 
     def export_atlas(self, filename):
+        self.finish_background_jobs()
         rect = self.scene.sceneRect()
-        image = QImage(int(rect.width()), int(rect.height()), QImage.Format_ARGB32)
-        image.fill(Qt.transparent)
-        
-        # Hide background, selection, and grid
-        old_bg = self.scene.backgroundBrush()
-        self.scene.setBackgroundBrush(Qt.NoBrush)
-        old_grid = self.scene.grid_enabled
-        self.scene.grid_enabled = False
-        # Hide overlays while exporting
-        old_exporting = self.scene.exporting
-        self.scene.exporting = True
-        
-        selected_items = self.scene.selectedItems()
-        for item in selected_items:
-            item.setSelected(False)
-            
-        painter = QPainter(image)
-        self.scene.render(painter)
-        painter.end()
+        flood, dilation = self.export_padding()
+        # Tiled exports keep crops out of the canvas caches so they do not grow the resident set
+        tiled = needs_tiling(int(rect.width()), int(rect.height()), self.export_memory_budget)
+        compositor = self.atlas_compositor(in_memory_crops=not tiled)
+        write_atlas_png(compositor, self.atlas_placements(), filename, self.export_memory_budget, flood, dilation,
+                        incremental=self.incremental_export, dirty_boxes=self.scene.take_dirty_boxes(),
+                        png_preset=self.png_preset, mip_chain=self.export_mip_chain())
+
+    def export_dds(self, filename, dds_format, mips=True):
+        self.finish_background_jobs()
+        rect = self.scene.sceneRect()
+        flood, dilation = self.export_padding()
+        tiled = needs_tiling(int(rect.width()), int(rect.height()), self.export_memory_budget)
+        write_atlas_dds(self.atlas_compositor(in_memory_crops=not tiled), self.atlas_placements(), filename, dds_format, flood,
+                        dilation, mips, self.export_mip_chain() if mips else None, self.export_memory_budget)
+
+    def atlas_placements(self):
+        """Fragment placements of the canvas items in paint order (bottom first)."""
+        placements = []
+        for item in self.scene.items(Qt.AscendingOrder):
+            if not isinstance(item, AtlasItem) or item.points is None or not item.isVisible():
+                continue
+            pos = item.pos()
+            placements.append(FragmentPlacement(
+                item.filepath,
+                tuple((float(x), float(y)) for x, y in item.points),
+                item.real_width,
+                item.original_width,
+                pos.x(),
+                pos.y(),
+            ))
+        return placements
+
+    def atlas_compositor(self, in_memory_crops=True):
+        """AtlasCompositor for the current atlas settings.
+
+        With in_memory_crops the crops come from (and stay in) the canvas caches; otherwise
+        they only go through the disk cache so an export does not grow the resident set.
+        """
+        rect = self.scene.sceneRect()
+        fetch_crop = None
+        if in_memory_crops:
+            fetch_crop = lambda job: self._get_resampled_crop(job.image_path, QRect(*job.rect), job.target_size)
+        return AtlasCompositor(
+            (int(rect.width()), int(rect.height())),
+            self.atlas_density,
+            self.resample_mode,
+            self.kaiser_beta,
+            int(self.kaiser_radius),
+            self.use_source_pyramid,
+            fetch_crop=fetch_crop,
+            disk_cache=self._disk_cache,
+        )
 
-        # Optional mip flood (color only, alpha untouched)
-        if self.enable_mip_flood:
-            image = self.apply_mip_flood(image, self.mip_flood_threshold, self.mip_flood_levels)
-        
-        # Restore
-        self.scene.setBackgroundBrush(old_bg)
-        self.scene.grid_enabled = old_grid
-        self.scene.exporting = old_exporting
-        for item in selected_items:
-            item.setSelected(True)
-            
-        image.save(filename)
+    def composite_atlas(self):
+        """Export-resolution straight-alpha RGBA array of the canvas, built without rendering the scene."""
+        return self.atlas_compositor().composite(self.atlas_placements())
 
     def apply_mip_flood(self, qimage, alpha_threshold=1, levels=4):
         """Apply mip flooding based on alpha mask (color channels only, alpha untouched)."""
         rgba_img = qimage.convertToFormat(QImage.Format_RGBA8888)
-        buffer = rgba_img.bits().tobytes()
         w, h = rgba_img.width(), rgba_img.height()
         if w == 0 or h == 0:
             return qimage
-
-        # Convert to numpy
-        arr = np.frombuffer(buffer, dtype=np.uint8).reshape((h, w, 4))
-        alpha = arr[..., 3]
-        mask = (alpha > alpha_threshold).astype(np.uint8)
-        color = arr[..., :3].astype(np.float32) / 255.0
-
-        def pad_even(img_arr, mask_arr):
-            h, w = img_arr.shape[:2]
-            pad_h = h % 2
-            pad_w = w % 2
-            if pad_h or pad_w:
-                img_arr = np.pad(img_arr, ((0, pad_h), (0, pad_w), (0, 0)), mode='edge')
-                mask_arr = np.pad(mask_arr, ((0, pad_h), (0, pad_w)), mode='edge')
-            return img_arr, mask_arr
-
-        # Auto levels to reach 1x1
-        if levels is None or levels <= 0:
-            levels = int(math.ceil(math.log2(max(w, h)))) if max(w, h) > 0 else 1
-
-        colors = [color]
-        masks = [mask]
-        for _ in range(levels):
-            img_arr, mask_arr = pad_even(colors[-1], masks[-1])
-            h2, w2 = img_arr.shape[0] // 2, img_arr.shape[1] // 2
-            # Downscale mask by OR
-            mask_blocks = mask_arr.reshape(h2, 2, w2, 2)
-            mask_ds = mask_blocks.max(axis=(1, 3))
-            # Downscale color weighted by coverage
-            color_blocks = img_arr.reshape(h2, 2, w2, 2, 3)
-            coverage = mask_blocks.sum(axis=(1, 3)).reshape(h2, w2, 1).astype(np.float32)
-            summed = (color_blocks * mask_blocks[..., None]).sum(axis=(1, 3))
-            color_ds = np.divide(summed, coverage, out=np.zeros_like(summed, dtype=np.float32), where=coverage > 0)
-            colors.append(color_ds)
-            masks.append(mask_ds)
-            if h2 == 1 and w2 == 1:
-                break
-
-        # Flood from smallest to largest
-        for i in range(len(colors) - 2, -1, -1):
-            small_c = colors[i + 1]
-            big_c = colors[i]
-            big_mask = masks[i]
-            # Upscale small to big via nearest
-            up = small_c.repeat(2, axis=0).repeat(2, axis=1)
-            up = up[: big_c.shape[0], : big_c.shape[1], :]
-            # Fill only where mask==0
-            fill_mask = (big_mask == 0)[..., None]
-            colors[i] = np.where(fill_mask, up, big_c)
-
-        final_color = (colors[0] * 255.0).clip(0, 255).astype(np.uint8)
-        out_arr = np.concatenate([final_color, alpha[..., None]], axis=2)
-        out = QImage(out_arr.data, out_arr.shape[1], out_arr.shape[0], QImage.Format_RGBA8888).copy()
-        return out
+        arr = np.frombuffer(rgba_img.bits().tobytes(), dtype=np.uint8).reshape((h, w, 4))
+        out_arr = mip_flood(arr, alpha_threshold, levels)
+        return QImage(out_arr.data, out_arr.shape[1], out_arr.shape[0], QImage.Format_RGBA8888).copy()
@@ -1,7 +1,6 @@
 import json
 import os
 import shutil
-from pathlib import Path
 from PySide6.QtWidgets import QMainWindow, QSplitter, QWidget, QVBoxLayout, QToolBar, QFileDialog, QDoubleSpinBox, QCheckBox, QComboBox, QSizePolicy, QListWidget, QListWidgetItem, QPushButton, QLineEdit, QMessageBox
 from PySide6.QtGui import QAction, QActionGroup, QColor
 from PySide6.QtCore import Qt, QPointF
@@ -10,8 +9,11 @@ from .browser_widget import BrowserWidget
 from .editor_widget import EditorWidget
 from .canvas_widget import CanvasWidget, AtlasItem
 from core.project_settings import normalize_project_settings
-from core.project_store import normalize_loaded_project, prepare_for_save
+from core.path_aliases import default_alias_file, load_aliases, resolve_path, save_aliases
+from core.project_store import normalize_loaded_project, prepare_for_save, upgrade_legacy_masks
 from core.mask_service import remove_mask_entry, upsert_mask_entry
+from core.glb_export import write_glb
+from core.png_writer import PNG_PRESETS
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -52,7 +54,7 @@ class MainWindow(QMainWindow):
         self.toolbar.addWidget(self.density_input)
         
         self.size_combo = QComboBox()
-        self.size_combo.addItems(["1024", "2048", "3072", "4096"])
+        self.size_combo.addItems(["1024", "2048", "3072", "4096", "8192", "16384"])
         self.size_combo.setCurrentText("2048")
         self.size_combo.currentTextChanged.connect(self.on_size_changed)
         self.size_combo.setFixedWidth(90)
@@ -81,9 +83,35 @@ class MainWindow(QMainWindow):
         export_action.triggered.connect(self.export_atlas)
         self.toolbar.addAction(export_action)
 
+        export_dds_action = QAction("Export DDS", self)
+        export_dds_action.setToolTip("Block-compressed DDS (BC1/BC3/BC7) with a full mip chain")
+        export_dds_action.triggered.connect(self.export_dds)
+        self.toolbar.addAction(export_dds_action)
+        self.dds_mips_chk = QCheckBox("DDS Mips")
+        self.dds_mips_chk.setToolTip("Write the mip chain into exported DDS files")
+        self.dds_mips_chk.setChecked(True)
+        self.dds_mips_chk.stateChanged.connect(self.on_dds_mips_toggled)
+        self.toolbar.addWidget(self.dds_mips_chk)
+
         export_obj_action = QAction("Export OBJ", self)
         export_obj_action.triggered.connect(self.export_obj_meshes)
         self.toolbar.addAction(export_obj_action)
+        self.obj_triangulate_chk = QCheckBox("Triangulate")
+        self.obj_triangulate_chk.setToolTip("Export OBJ masks as triangles instead of one n-gon face each")
+        self.obj_triangulate_chk.stateChanged.connect(self.on_obj_triangulate_toggled)
+        self.toolbar.addWidget(self.obj_triangulate_chk)
+        self.obj_weld_chk = QCheckBox("Weld")
+        self.obj_weld_chk.setToolTip("Share coincident OBJ vertices between faces and masks")
+        self.obj_weld_chk.stateChanged.connect(self.on_obj_weld_toggled)
+        self.toolbar.addWidget(self.obj_weld_chk)
+        export_glb_action = QAction("Export GLB", self)
+        export_glb_action.setToolTip("Binary glTF: triangulated mask meshes with atlas UVs")
+        export_glb_action.triggered.connect(self.export_glb_meshes)
+        self.toolbar.addAction(export_glb_action)
+        self.merge_meshes_chk = QCheckBox("Merge Meshes")
+        self.merge_meshes_chk.setToolTip("Export all masks as one mesh (GLB and OBJ) instead of one mesh per mask")
+        self.merge_meshes_chk.stateChanged.connect(self.on_merge_meshes_toggled)
+        self.toolbar.addWidget(self.merge_meshes_chk)
         self.toolbar.addSeparator()
         aliases_action = QAction("Path Aliases", self)
         aliases_action.triggered.connect(self.edit_aliases)
@@ -104,6 +132,32 @@ class MainWindow(QMainWindow):
         self.mip_levels_auto.setToolTip("Auto levels until 1x1")
         self.mip_levels_auto.stateChanged.connect(self.on_mip_auto_toggled)
         self.toolbar.addWidget(self.mip_levels_auto)
+        # Edge dilation: alternative padding, exclusive with Mip Flood
+        self.dilate_chk = QCheckBox("Dilate")
+        self.dilate_chk.setToolTip("Pad color outside masks with the nearest opaque texel on export (instead of mip flood)")
+        self.dilate_chk.stateChanged.connect(self.on_dilate_toggled)
+        self.toolbar.addWidget(self.dilate_chk)
+        self.dilate_radius_spin = QSpinBox()
+        self.dilate_radius_spin.setRange(0, 4096)
+        self.dilate_radius_spin.setValue(0)
+        self.dilate_radius_spin.setPrefix("Max px ")
+        self.dilate_radius_spin.setSpecialValueText("Max px: all")
+        self.dilate_radius_spin.setToolTip("Dilation reach in pixels (0 = fill the whole atlas)")
+        self.dilate_radius_spin.valueChanged.connect(self.on_dilate_radius_changed)
+        self.toolbar.addWidget(self.dilate_radius_spin)
+        # Pre-filtered mip chain written next to the exported atlas
+        self.mip_export_chk = QCheckBox("Export Mips")
+        self.mip_export_chk.setToolTip("Also write the mip chain (<name>_mip1.png..., DDS mip levels), reduced with the resample filter")
+        self.mip_export_chk.stateChanged.connect(self.on_mip_export_toggled)
+        self.toolbar.addWidget(self.mip_export_chk)
+        self.mip_export_spin = QSpinBox()
+        self.mip_export_spin.setRange(0, 16)
+        self.mip_export_spin.setValue(0)
+        self.mip_export_spin.setPrefix("Mips ")
+        self.mip_export_spin.setSpecialValueText("Mips: all")
+        self.mip_export_spin.setToolTip("Exported mip levels below the atlas (0 = down to 1x1)")
+        self.mip_export_spin.valueChanged.connect(self.on_mip_export_levels_changed)
+        self.toolbar.addWidget(self.mip_export_spin)
         self.toolbar.addSeparator()
         # Fit/Center actions will be wired after canvas is created
         self.fit_action = QAction("Fit", self)
@@ -158,21 +212,41 @@ class MainWindow(QMainWindow):
             'resample_mode': 'lanczos',
             'kaiser_beta': 3.0,
             'kaiser_radius': 2,
+            'resample_workers': 0,
+            'source_pyramid': False,
+            'export_budget_mb': 1024,
+            'decode_cache_mb': 1024,
+            'incremental_export': False,
+            'png_preset': 'balanced',
+            'dds_format': 'bc3',
+            'dds_mips': True,
             'atlas_density': 512.0,
             'atlas_size': 2048,
             'scale_reference_length': 1.0,
             'scale_reference_unit': 'm',
             'mip_flood': False,
             'mip_flood_levels': 6,
-            'mip_flood_auto': True
+            'mip_flood_auto': True,
+            'merge_meshes': False,
+            'obj_triangulate': False,
+            'obj_weld': False,
+            'mip_export': False,
+            'mip_export_levels': 0,
+            'dilate': False,
+            'dilate_radius': 0
         }
         self.apply_dark_theme()
         self.statusBar().showMessage("Ready")
         self.canvas.hover_changed.connect(self.update_status)
-        self.alias_file = os.path.join(str(Path.home()), ".texture_processor_aliases.json")
+        self.canvas.resample_failed.connect(self.on_resample_failed)
+        self.alias_file = default_alias_file()
         self.path_aliases = self.load_aliases()
         self.mip_flood_chk.setChecked(False)
 
+    def closeEvent(self, event):
+        self.canvas.shutdown_workers()
+        super().closeEvent(event)
+
     def generate_mask_color(self, mask_id):
         hue = ((mask_id or 1) * 73) % 360
         c = QColor()
@@ -285,6 +359,44 @@ class MainWindow(QMainWindow):
         self.canvas.enable_mip_flood = enabled
         self.canvas.mip_flood_levels = 0 if self.mip_levels_auto.isChecked() else self.mip_levels_spin.value()
         self.project_data['mip_flood'] = enabled
+        if enabled:
+            self.dilate_chk.setChecked(False)
+
+    def on_dilate_toggled(self, state):
+        enabled = Qt.CheckState(state) == Qt.CheckState.Checked
+        self.canvas.enable_dilation = enabled
+        self.canvas.dilation_radius = self.dilate_radius_spin.value()
+        self.project_data['dilate'] = enabled
+        if enabled:
+            self.mip_flood_chk.setChecked(False)
+
+    def on_dilate_radius_changed(self, value):
+        self.canvas.dilation_radius = value
+        self.project_data['dilate_radius'] = value
+
+    def on_resample_failed(self, image_path, error):
+        self.statusBar().showMessage(f"Resample failed for {os.path.basename(image_path)}: {error}", 10000)
+
+    def on_dds_mips_toggled(self, state):
+        self.project_data['dds_mips'] = Qt.CheckState(state) == Qt.CheckState.Checked
+
+    def on_merge_meshes_toggled(self, state):
+        self.project_data['merge_meshes'] = Qt.CheckState(state) == Qt.CheckState.Checked
+
+    def on_obj_triangulate_toggled(self, state):
+        self.project_data['obj_triangulate'] = Qt.CheckState(state) == Qt.CheckState.Checked
+
+    def on_obj_weld_toggled(self, state):
+        self.project_data['obj_weld'] = Qt.CheckState(state) == Qt.CheckState.Checked
+
+    def on_mip_export_toggled(self, state):
+        enabled = Qt.CheckState(state) == Qt.CheckState.Checked
+        self.canvas.enable_mip_export = enabled
+        self.project_data['mip_export'] = enabled
+
+    def on_mip_export_levels_changed(self, value):
+        self.canvas.mip_export_levels = value
+        self.project_data['mip_export_levels'] = value
 
     def on_mip_levels_changed(self, value):
         if not self.mip_levels_auto.isChecked():
@@ -383,10 +495,10 @@ class MainWindow(QMainWindow):
 
         if target_item:
             target_item.mask_id = mask_id
-            self.canvas.update_item(target_item, points, real_width, original_width, mask_id=mask_id, show_progress=True)
+            self.canvas.update_item(target_item, points, real_width, original_width, mask_id=mask_id, background=True)
         else:
-            # Add new item
-            self.canvas.add_fragment(filepath, points, real_width, original_width, mask_id=mask_id, show_progress=True)
+            # Add new item (placeholder now, final pixmap from a background job)
+            self.canvas.add_fragment(filepath, points, real_width, original_width, mask_id=mask_id, background=True)
 
         # Refresh editor overlays/selection
         self.editor.refresh_masks_view(filepath, tex_entry.get('masks', []), mask_id)
@@ -409,7 +521,7 @@ class MainWindow(QMainWindow):
                 'original_width': it.original_width,
                 'color': self.generate_mask_color(next_id)
             })
-            new_item = self.canvas.add_fragment(it.filepath, it.points, it.real_width, it.original_width, mask_id=next_id, show_progress=True)
+            new_item = self.canvas.add_fragment(it.filepath, it.points, it.real_width, it.original_width, mask_id=next_id, background=True)
             if new_item:
                 new_item.setPos(it.pos() + offset)
                 if self.canvas.scene.snap_items_to_pixel:
@@ -439,6 +551,14 @@ class MainWindow(QMainWindow):
             self.project_data['mip_flood'] = self.mip_flood_chk.isChecked()
             self.project_data['mip_flood_levels'] = self.mip_levels_spin.value()
             self.project_data['mip_flood_auto'] = self.mip_levels_auto.isChecked()
+            self.project_data['mip_export'] = self.mip_export_chk.isChecked()
+            self.project_data['dds_mips'] = self.dds_mips_chk.isChecked()
+            self.project_data['merge_meshes'] = self.merge_meshes_chk.isChecked()
+            self.project_data['obj_triangulate'] = self.obj_triangulate_chk.isChecked()
+            self.project_data['obj_weld'] = self.obj_weld_chk.isChecked()
+            self.project_data['mip_export_levels'] = self.mip_export_spin.value()
+            self.project_data['dilate'] = self.dilate_chk.isChecked()
+            self.project_data['dilate_radius'] = self.dilate_radius_spin.value()
             self.project_data['scale_reference_length'] = self.normalize_scale_reference_length(
                 self.editor.scale_length_input.value()
             )
@@ -501,18 +621,8 @@ class MainWindow(QMainWindow):
                 self.project_data = normalize_loaded_project(json.load(f))
 
             # Normalize legacy texture data to new masks list
-            textures = self.project_data.get('textures', {})
-            for tex_path, data in list(textures.items()):
-                if 'masks' not in data:
-                    textures[tex_path] = {
-                        'px_per_meter': data.get('px_per_meter'),
-                        'masks': [{
-                            'id': 1,
-                            'points': data.get('points'),
-                            'real_width': data.get('real_width'),
-                            'original_width': data.get('original_width')
-                        }]
-                    }
+            textures = upgrade_legacy_masks(self.project_data).get('textures', {})
+            for tex_path in textures:
                 self.ensure_mask_colors(textures[tex_path].get('masks', []))
                 textures[tex_path].setdefault('guides_h', [])
                 textures[tex_path].setdefault('guides_v', [])
@@ -524,6 +634,9 @@ class MainWindow(QMainWindow):
                     self.project_data['base_path'] = resolved_base
                     self.browser.load_images(resolved_base)
             
+            # Clear the canvas before restoring settings so the old project's items are not resampled again
+            self.canvas.scene.clear()
+
             # Restore settings
             self.density_input.setValue(self.project_data.get('atlas_density', 512.0))
 
@@ -551,57 +664,50 @@ class MainWindow(QMainWindow):
             # Reapply levels based on auto flag
             if self.mip_levels_auto.isChecked():
                 self.canvas.mip_flood_levels = 0
+            self.dilate_radius_spin.setValue(int(self.project_data.get('dilate_radius', 0)))
+            self.dilate_chk.setChecked(bool(self.project_data.get('dilate', False)))
+            self.mip_export_spin.setValue(int(self.project_data.get('mip_export_levels', 0)))
+            self.mip_export_chk.setChecked(bool(self.project_data.get('mip_export', False)))
+            self.dds_mips_chk.setChecked(bool(self.project_data.get('dds_mips', True)))
+            self.merge_meshes_chk.setChecked(bool(self.project_data.get('merge_meshes', False)))
+            self.obj_triangulate_chk.setChecked(bool(self.project_data.get('obj_triangulate', False)))
+            self.obj_weld_chk.setChecked(bool(self.project_data.get('obj_weld', False)))
 
             # Resample settings
             mode = self.project_data.get('resample_mode', 'lanczos')
             beta = self.project_data.get('kaiser_beta', 3.0)
             radius = self.project_data.get('kaiser_radius', 2)
-            self.canvas.set_resample_settings(mode, beta, radius)
+            self.canvas.set_resample_workers(self.project_data.get('resample_workers', 0))
+            self.canvas.export_memory_budget = int(self.project_data.get('export_budget_mb', 1024)) * 1024 * 1024
+            self.canvas.set_decode_cache_budget(int(self.project_data.get('decode_cache_mb', 1024)) * 1024 * 1024)
+            self.canvas.incremental_export = bool(self.project_data.get('incremental_export', False))
+            self.canvas.png_preset = self.project_data.get('png_preset', 'balanced')
+            self.canvas.set_resample_settings(mode, beta, radius, use_pyramid=self.project_data.get('source_pyramid', False))
             # Ensure density applied (valueChanged will fire, but be explicit)
             self.canvas.set_atlas_density(self.density_input.value(), show_progress=False)
             self.canvas.set_grid_visible(self.project_data.get('show_grid', False))
-            # Restore canvas
-            self.canvas.scene.clear()
-            tex_items = list(self.project_data.get('textures', {}).items())
-            use_progress = len(tex_items) > 0
-            dlg = None
-            if use_progress:
-                dlg = QProgressDialog("Resampling textures...", None, 0, len(tex_items), self)
-                dlg.setWindowModality(Qt.ApplicationModal)
-                dlg.setMinimumDuration(0)
-                dlg.show()
-            item_map = {}
-            for idx, (filepath, data) in enumerate(tex_items, start=1):
+            fragments = [] # (file_for_io, points, real_width, original_width, mask_id, orig_path)
+            for filepath, data in self.project_data.get('textures', {}).items():
                 orig_path = filepath
                 resolved_path = self.resolve_path(filepath)
                 file_for_io = resolved_path if resolved_path and os.path.exists(resolved_path) else orig_path
                 masks = data.get('masks')
                 if masks:
                     for m in masks:
-                        points = m.get('points')
-                        real_width = m.get('real_width')
-                        original_width = m.get('original_width')
-                        mask_id = m.get('id')
-                        if points:
-                            item = self.canvas.add_fragment(file_for_io, points, real_width, original_width, mask_id=mask_id, show_progress=True, original_path=orig_path)
-                            if item:
-                                item_map[(orig_path, mask_id)] = item
-                else:
+                        if m.get('points'):
+                            fragments.append((file_for_io, m.get('points'), m.get('real_width'), m.get('original_width'), m.get('id'), orig_path))
+                elif data.get('points'):
                     # Legacy single mask structure
-                    points = data.get('points')
-                    real_width = data.get('real_width')
-                    original_width = data.get('original_width')
-                    if points:
-                        item = self.canvas.add_fragment(file_for_io, points, real_width, original_width, mask_id=1, show_progress=True, original_path=orig_path)
-                        if item:
-                            item_map[(orig_path, 1)] = item
-                if dlg:
-                    dlg.setValue(idx)
-                    QApplication.processEvents()
-                    if dlg.wasCanceled():
-                        break
-            if dlg:
-                dlg.close()
+                    fragments.append((file_for_io, data.get('points'), data.get('real_width'), data.get('original_width'), 1, orig_path))
+            # Resample everything in parallel, then create items here on the GUI thread
+            pixmaps = self.canvas.build_pixmaps([f[:4] for f in fragments], "Resampling textures...")
+            item_map = {}
+            for (file_for_io, points, real_width, original_width, mask_id, orig_path), pixmap in zip(fragments, pixmaps):
+                if not pixmap:
+                    continue
+                item = self.canvas.add_fragment(file_for_io, points, real_width, original_width, mask_id=mask_id, original_path=orig_path, pixmap=pixmap)
+                if item:
+                    item_map[(orig_path, mask_id)] = item
 
             # Restore positions
             for entry in self.project_data.get('items', []):
@@ -631,6 +737,30 @@ class MainWindow(QMainWindow):
             finally:
                 dlg.close()
 
+    def export_dds(self):
+        filters = {"BC3 / DXT5, RGBA (*.dds)": 'bc3', "BC1 / DXT1, RGB (*.dds)": 'bc1', "BC7, RGBA (*.dds)": 'bc7'}
+        current = next((name for name, fmt in filters.items() if fmt == self.project_data.get('dds_format', 'bc3')), None)
+        filepath, selected = QFileDialog.getSaveFileName(self, "Export DDS", "", ";;".join(filters), current)
+        if not filepath:
+            return
+        if not filepath.lower().endswith(".dds"):
+            filepath += ".dds"
+        dds_format = filters.get(selected, 'bc3')
+        self.project_data['dds_format'] = dds_format
+        dlg = QProgressDialog(f"Exporting DDS ({dds_format.upper()})...", None, 0, 0, self)
+        dlg.setWindowModality(Qt.ApplicationModal)
+        dlg.setCancelButton(None)
+        dlg.setMinimumDuration(0)
+        dlg.show()
+        QApplication.processEvents()
+        try:
+            self.canvas.export_dds(filepath, dds_format, bool(self.project_data.get('dds_mips', True)))
+            self.statusBar().showMessage(f"DDS exported: {filepath}", 3000)
+        except Exception as e:
+            QMessageBox.critical(self, "Export Failed", str(e))
+        finally:
+            dlg.close()
+
     def export_obj_meshes(self):
         filepath, _ = QFileDialog.getSaveFileName(self, "Export Meshes", "", "OBJ Files (*.obj)")
         if not filepath:
@@ -645,18 +775,42 @@ class MainWindow(QMainWindow):
         dlg.show()
         QApplication.processEvents()
         try:
-            obj_text, err = self.canvas.generate_obj()
+            err = self.canvas.write_obj(filepath, self.obj_triangulate_chk.isChecked(), self.obj_weld_chk.isChecked(),
+                                        self.merge_meshes_chk.isChecked())
             if err:
                 QMessageBox.warning(self, "Export Failed", err)
                 return
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(obj_text)
             self.statusBar().showMessage(f"OBJ exported: {filepath}", 3000)
         except Exception as e:
             QMessageBox.critical(self, "Export Failed", str(e))
         finally:
             dlg.close()
 
+    def export_glb_meshes(self):
+        filepath, _ = QFileDialog.getSaveFileName(self, "Export Meshes", "", "glTF Binary (*.glb)")
+        if not filepath:
+            return
+        if not filepath.lower().endswith(".glb"):
+            filepath += ".glb"
+
+        dlg = QProgressDialog("Exporting GLB...", None, 0, 0, self)
+        dlg.setWindowModality(Qt.ApplicationModal)
+        dlg.setCancelButton(None)
+        dlg.setMinimumDuration(0)
+        dlg.show()
+        QApplication.processEvents()
+        try:
+            mesh, err = self.canvas.generate_glb(self.merge_meshes_chk.isChecked())
+            if err:
+                QMessageBox.warning(self, "Export Failed", err)
+                return
+            write_glb(filepath, mesh)
+            self.statusBar().showMessage(f"GLB exported: {filepath}", 3000)
+        except Exception as e:
+            QMessageBox.critical(self, "Export Failed", str(e))
+        finally:
+            dlg.close()
+
     def open_resample_settings(self):
         dialog = QDialog(self)
         dialog.setWindowTitle("Resample Settings")
@@ -688,13 +842,54 @@ class MainWindow(QMainWindow):
         radius_spin.setRange(1, 8)
         radius_spin.setValue(int(self.project_data.get('kaiser_radius', 2)))
         form.addRow("Kaiser radius", radius_spin)
+
+        workers_spin = QSpinBox()
+        workers_spin.setRange(0, 64)
+        workers_spin.setSpecialValueText("Auto")
+        workers_spin.setToolTip("Processes used to resample fragments (Auto = one per CPU, 1 = serial)")
+        workers_spin.setValue(int(self.project_data.get('resample_workers', 0)))
+        form.addRow("Workers", workers_spin)
+
+        budget_spin = QSpinBox()
+        budget_spin.setRange(64, 65536)
+        budget_spin.setSingleStep(256)
+        budget_spin.setSuffix(" MB")
+        budget_spin.setToolTip("Memory for PNG and DDS export; larger atlases are composited, flooded and encoded in bands")
+        budget_spin.setValue(int(self.project_data.get('export_budget_mb', 1024)))
+        form.addRow("Export memory", budget_spin)
+
+        decode_spin = QSpinBox()
+        decode_spin.setRange(0, 65536)
+        decode_spin.setSingleStep(256)
+        decode_spin.setSuffix(" MB")
+        decode_spin.setToolTip("Memory for decoded source images kept between resamples (0 = decode every time)")
+        decode_spin.setValue(int(self.project_data.get('decode_cache_mb', 1024)))
+        form.addRow("Decode cache", decode_spin)
+
+        png_combo = QComboBox()
+        png_combo.addItems(list(PNG_PRESETS))
+        png_combo.setToolTip("fast: quick, larger files; balanced: like common image editors; smallest: slowest, tries more strategies")
+        png_combo.setCurrentText(self.project_data.get('png_preset', 'balanced'))
+        form.addRow("PNG compression", png_combo)
         layout.addLayout(form)
 
+        incremental_chk = QCheckBox("Incremental PNG export")
+        incremental_chk.setToolTip("Keep <name>.png.cache next to the exported PNG and redo only the tiles changed since the last export")
+        incremental_chk.setChecked(bool(self.project_data.get('incremental_export', False)))
+        layout.addWidget(incremental_chk)
+
+        pyramid_chk = QCheckBox("Use source mip pyramid")
+        pyramid_chk.setToolTip("Large downscales resample from the nearest pre-filtered power-of-two level (faster, slightly softer)")
+        pyramid_chk.setChecked(bool(self.project_data.get('source_pyramid', False)))
+        layout.addWidget(pyramid_chk)
+
         def update_enabled():
             enabled = kaiser_radio.isChecked()
             beta_spin.setEnabled(enabled)
             radius_spin.setEnabled(enabled)
+            pyramid_chk.setEnabled(not nearest_radio.isChecked())
         kaiser_radio.toggled.connect(update_enabled)
+        nearest_radio.toggled.connect(update_enabled)
         update_enabled()
 
         buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -712,7 +907,18 @@ class MainWindow(QMainWindow):
             self.project_data['resample_mode'] = mode
             self.project_data['kaiser_beta'] = beta
             self.project_data['kaiser_radius'] = radius
-            self.canvas.set_resample_settings(mode, beta, radius)
+            self.project_data['resample_workers'] = workers_spin.value()
+            self.project_data['source_pyramid'] = pyramid_chk.isChecked()
+            self.project_data['export_budget_mb'] = budget_spin.value()
+            self.project_data['decode_cache_mb'] = decode_spin.value()
+            self.project_data['incremental_export'] = incremental_chk.isChecked()
+            self.canvas.incremental_export = incremental_chk.isChecked()
+            self.project_data['png_preset'] = png_combo.currentText()
+            self.canvas.png_preset = png_combo.currentText()
+            self.canvas.set_resample_workers(workers_spin.value())
+            self.canvas.export_memory_budget = budget_spin.value() * 1024 * 1024
+            self.canvas.set_decode_cache_budget(decode_spin.value() * 1024 * 1024)
+            self.canvas.set_resample_settings(mode, beta, radius, use_pyramid=pyramid_chk.isChecked())
             dialog.accept()
 
         buttons.accepted.connect(accept)
@@ -724,39 +930,13 @@ class MainWindow(QMainWindow):
         self.statusBar().showMessage(f"Pos: ({x:.1f}, {y:.1f}) | Zoom: {zoom:.2f} | Density: {self.density_input.value():.0f} px/m")
 
     def load_aliases(self):
-        try:
-            if os.path.exists(self.alias_file):
-                with open(self.alias_file, 'r') as f:
-                    data = json.load(f)
-                    if isinstance(data, dict):
-                        return data
-        except Exception:
-            pass
-        return {}
+        return load_aliases(self.alias_file)
 
     def save_aliases(self):
-        try:
-            with open(self.alias_file, 'w') as f:
-                json.dump(self.path_aliases, f, indent=2)
-        except Exception:
-            pass
+        save_aliases(self.path_aliases, self.alias_file)
 
     def resolve_path(self, path_str):
-        if not path_str:
-            return path_str
-        path_str = os.path.expandvars(path_str)
-        if os.path.exists(path_str):
-            return path_str
-        # Try replace known prefixes (longest first)
-        best = path_str
-        prefixes = sorted(self.path_aliases.keys(), key=lambda p: len(p), reverse=True)
-        for src in prefixes:
-            if path_str.startswith(src):
-                candidate = path_str.replace(src, self.path_aliases[src], 1)
-                if os.path.exists(candidate):
-                    return candidate
-                best = candidate
-        return best
+        return resolve_path(path_str, self.path_aliases)
 
     def edit_aliases(self):
         dialog = QDialog(self)